@@ -115,22 +115,40 @@ attributes::
     >>> engine.deco_table[-1]
     DecoStop(depth=3.0, time=24.0)
 
+Series of repetitive dives can be planned with ``Engine.plan_series``
+method. Each dive is described with surface interval before the dive,
+maximum depth and bottom time. The tissues gas loading at the end of
+a dive is carried through the surface interval into the next dive, so
+a repetitive dive requires longer decompression::
+
+    >>> engine = decotengu.create()
+    >>> engine.add_gas(0, 21)
+    >>> plans = engine.plan_series([(0, 30, 25), (60, 30, 25)])
+    >>> [p.deco_table.total for p in plans]
+    [9.0, 12.0]
+
 """
 
 from .engine import Engine, DecoTable
 from .model import ZH_L16B_GF, ZH_L16C_GF, DecoModelValidator
 from .flow import sender
 from .conveyor import Conveyor
+from .kernel import set_kernel, select_kernel
 
 __version__ = '0.14.0'
 
 
-def create(time_delta=None, validate=True):
+def create(time_delta=None, validate=True, kernel=None):
     """
     Create decompression engine .
 
     The decompression model validation is enabled by default.
 
+    The numeric kernel of decompression model can be specified with its
+    name (see :py:mod:`decotengu.kernel`). If kernel is `auto`, then the
+    fastest numeric kernel is selected, see
+    :py:func:`decotengu.kernel.select_kernel`.
+
     Usage
 
     >>> import decotengu
@@ -143,8 +161,13 @@ def create(time_delta=None, validate=True):
     :param time_delta: Time between dive steps.
     :param validate: Validate decompression data with decompression model
                      validator.
+    :param kernel: Name of numeric kernel or `auto`.
     """
     engine = Engine()
+    if kernel == 'auto':
+        select_kernel(engine)
+    elif kernel:
+        set_kernel(engine.model, kernel)
 
     pipeline = []
     if validate:
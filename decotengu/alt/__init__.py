@@ -33,10 +33,23 @@ The `decotengu.alt` module provides some of such alternatives
 - tabular calculator - calculate tissues saturation using precomputed
   values of exponential function (useful when exponential function is too
   expensive on a given hardware)
+- vectorized calculator - calculate tissues saturation for all tissue
+  compartments at once using array operations (requires NumPy)
 - deco stop stepper - naive algorithm to find length of decompression stop
   using 1 minute intervals
 - decompression calculations using fixed point arithmetic
 - first decompression stop binary search algorithm
+- batched first decompression stop search - calculate tissues gas loading
+  of all first decompression stop candidates at once
+- decompression stop solver - calculate length of decompression stop by
+  solving Buhlmann equation with gradient factors for time
+- decompression stop galloping search - find length of decompression
+  stop by doubling the search time step
+- ascent cache - reuse dive ascents calculated for the same tissues gas
+  loading, depth, gas mixes and engine configuration
+
+The tissues saturation calculations can be also replaced by setting
+numeric kernel of decompression model (see :py:mod:`decotengu.kernel`).
 
 .. - ascent jump - go to next depth, then calculate tissue saturation for time
 ..  which would take to get from previous to next depth (used by those who
@@ -0,0 +1,204 @@
+#
+# DecoTengu - dive decompression library.
+#
+# Copyright (C) 2013-2014 by Artur Wroblewski <wrobell@pld-linux.org>
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+
+"""
+.. _algo-batch:
+
+Batched First Decompression Stop Search
+---------------------------------------
+The default algorithm finding first decompression stop (see
+:py:meth:`decotengu.engine.Engine._find_first_stop`) alternates between
+ascent to adjusted ascent ceiling limit and calculation of new ascent
+ceiling limit. Each ascent loads tissue compartments with inert gas, so
+the calculations cannot be performed at once.
+
+The first decompression stop candidates are at depths divisible by 3
+between current depth and target depth. For a deep dive there are about
+30 candidates. The batched algorithm calculates tissues gas loading after
+ascent from starting dive step to every candidate with one call of
+:py:meth:`decotengu.model.ZH_L16_GF.load_many` method and then performs
+the steps of the default algorithm using the precalculated tissues gas
+loading. Ascent ceiling limit is calculated only for the candidates
+visited by the default algorithm, therefore the batched algorithm finds
+the same first decompression stop.
+
+The algorithm is
+
+#. Let :math:`p` be current depth and :math:`p_t` be target depth.
+#. Let :math:`p_l` be depth of current ceiling limit adjusted as in the
+   default algorithm.
+#. If :math:`p <= p_l`, then return current depth.
+#. Let `candidates` be depths divisible by 3 between :math:`p_l`
+   (inclusive) and :math:`p_t` (inclusive).
+#. Calculate tissues gas loading after ascent from :math:`p` to each
+   depth of `candidates` at once.
+#. Perform the default algorithm starting from :math:`p_l` using the
+   calculated tissues gas loading.
+
+The batched algorithm performs at most the same number of ascent ceiling
+limit calculations as the default algorithm, but it loads tissue compartments
+with inert gas for all candidates, which is performed with one array
+operation by vectorized numeric kernel (see :ref:`vector-calc`). Use
+``dt-perf`` script to compare the algorithms for its dive profiles.
+
+The algorithm is implemented by
+:py:class:`decotengu.alt.batch.BatchFindFirstStop` class.
+
+Example
+~~~~~~~
+To use the batched algorithm, override decompression engine object with
+:py:func:`decotengu.alt.batch.batch_engine` function
+
+    >>> import decotengu
+    >>> from decotengu.alt.batch import batch_engine
+    >>> engine = decotengu.create()
+    >>> engine.add_gas(0, 21)
+    >>> batch_engine(engine)
+    >>> profile = list(engine.calculate(40, 35))
+    >>> engine.deco_table.total
+    51.0
+"""
+
+import logging
+
+from ..engine import Phase, Step
+from .. import const, trace
+
+logger = logging.getLogger(__name__)
+
+
+class BatchFindFirstStop(object):
+    """
+    Find first decompression stop using tissues gas loading of all first
+    decompression stop candidates calculated at once.
+
+    :var engine: DecoTengu decompression engine.
+
+    .. seealso:: :py:meth:`decotengu.Engine._find_first_stop`
+    """
+    def __init__(self, engine):
+        """
+        Create the callable overriding
+        :py:meth:`decotengu.engine.Engine._find_first_stop`.
+
+        :param engine: DecoTengu decompression engine.
+        """
+        self.engine = engine
+
+
+    def __call__(self, start, abs_p, gas):
+        """
+        Find first decompression stop.
+
+        :param start: Starting dive step indicating current depth.
+        :param abs_p: Absolute pressure of target depth - surface or gas
+            switch depth.
+        :param gas: Gas mix configuration.
+
+        .. seealso:: :py:meth:`decotengu.Engine._find_first_stop`
+        """
+        engine = self.engine
+        model = engine.model
+
+        assert start.abs_p > abs_p, '{} vs. {}'.format(start.abs_p, abs_p)
+        assert engine._to_depth(abs_p) % 3 == 0, engine._to_depth(abs_p)
+
+        def ceiling(p, data):
+            limit = model.ceiling_limit(data, data.gf)
+            if trace.subscribers:
+                trace.emit(trace.CeilingCheck(p, limit, data.gf))
+            return max(abs_p, engine._ceil_pressure_3m(limit))
+
+        limit = ceiling(start.abs_p, start.data)
+        if start.abs_p <= limit:
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug('find first stop: at first deco stop already')
+            return start
+
+        # candidates from adjusted ceiling limit to target depth; index
+        # of a candidate is its number of 3m steps from the ceiling limit;
+        # pressure of a candidate is calculated in the same way as
+        # adjusted ceiling limit
+        v = engine._n_stops(limit)
+        n = engine._n_stops(limit, abs_p) + 1
+        pressures = [
+            max(abs_p, (v - k) * engine._p3m + engine.surface_pressure)
+            for k in range(n)
+        ]
+        times = [
+            engine._pressure_to_time(start.abs_p - p, engine.ascent_rate)
+            for p in pressures
+        ]
+        rate = -engine.ascent_rate * engine._meter_to_bar
+        candidates = model.load_many(
+            [start.abs_p] * n, times, [gas] * n, [rate] * n,
+            [start.data] * n
+        )
+
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug(
+                'find first stop: {} candidates between {}bar and {}bar'
+                .format(n, limit, abs_p)
+            )
+
+        # ascend from candidate to candidate like the default algorithm;
+        # pressure and time of a dive step are accumulated in the same way
+        # as by the default algorithm, so the same first decompression stop
+        # is found
+        k = 0
+        p = start.abs_p
+        time = start.time
+        limit = pressures[0]
+        while p > limit and p > abs_p:
+            t = engine._pressure_to_time(p - limit, engine.ascent_rate)
+            p -= engine._time_to_pressure(t, engine.ascent_rate)
+            time += t
+            k = max(k, engine._n_stops(pressures[0], limit))
+            limit = ceiling(p, candidates[k])
+
+        stop = Step(Phase.ASCENT, p, time, gas, candidates[k])
+
+        assert engine._to_depth(stop.abs_p) % 3 == 0, \
+            'Invalid first stop depth pressure {}bar'.format(stop.abs_p)
+
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug(
+                'find first stop: found at {}m ({}bar), ascent time={}'
+                .format(
+                    engine._to_depth(stop.abs_p), stop.abs_p,
+                    stop.time - start.time
+                )
+            )
+
+        assert stop.abs_p - abs_p > -const.EPSILON, stop
+        return stop
+
+
+
+def batch_engine(engine):
+    """
+    Override DecoTengu engine object, so first decompression stop is found
+    using tissues gas loading of all candidates calculated at once.
+
+    :param engine: DecoTengu engine object.
+    """
+    engine._find_first_stop = BatchFindFirstStop(engine)
+
+
+# vim: sw=4:et:ai
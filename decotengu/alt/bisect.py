@@ -129,7 +129,7 @@ class BisectFindFirstStop(object):
         dt = t % ts_3m
 
         n = t // ts_3m
-        if __debug__:
+        if logger.isEnabledFor(logging.DEBUG):
             logger.debug(
                 'find first stop: {}bar -> {}bar, {}min, n={}, dt={}min'
                 .format(start.abs_p, abs_p, start.time, n, dt)
@@ -148,7 +148,7 @@ class BisectFindFirstStop(object):
 
         if k == 0:
             stop = start
-            if __debug__:
+            if logger.isEnabledFor(logging.DEBUG):
                 logger.debug('first stop find: already at deco zone')
         else:
             time = k * ts_3m + dt
@@ -0,0 +1,239 @@
+#
+# DecoTengu - dive decompression library.
+#
+# Copyright (C) 2013-2014 by Artur Wroblewski <wrobell@pld-linux.org>
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+
+"""
+.. _ascent-cache:
+
+Ascent Cache
+------------
+The ascent of a dive (see :py:meth:`decotengu.engine.Engine._dive_ascent`)
+depends only on the dive step at which the ascent starts, gas mix list and
+configuration of decompression engine. Two dives, which reach the same
+tissues gas loading at the same depth with the same gas mixes, have the
+same ascent, i.e.
+
+- the same dive calculated with different time delta of the conveyor
+- repeated dive planner queries
+
+The ascent cache keeps dive steps and decompression stops of recently
+calculated ascents. The key of an ascent is
+
+- inert gas pressure values of tissue compartments quantized with
+  configurable quantum
+- absolute pressure, gas mix and gradient factor of starting dive step
+- gas mix list
+- configuration of decompression engine and its decompression model,
+  i.e. gradient factors, water vapour pressure, ascent rate, surface
+  pressure, numeric kernel
+
+When ascent is found in the cache, then its dive steps are returned (with
+time shifted by time difference of starting dive steps) and its
+decompression stops are added to decompression table of the engine.
+
+The cache is bounded and least recently used ascents are removed first.
+The cache keeps hits and misses statistics.
+
+With default quantum, only tissues gas loading of the same value (with
+floating point number precision) is matched. Larger quantum allows to
+match similar ascents at the cost of accuracy.
+
+Example
+~~~~~~~
+To use the ascent cache, override decompression engine object with
+:py:func:`decotengu.alt.cache.cache_engine` function
+
+    >>> import decotengu
+    >>> from decotengu.alt.cache import cache_engine
+    >>> engine = decotengu.create()
+    >>> engine.add_gas(0, 21)
+    >>> cache_engine(engine)
+    >>> profile = list(engine.calculate(40, 35))
+    >>> profile = list(engine.calculate(40, 35))
+    >>> engine._dive_ascent.hits, engine._dive_ascent.misses
+    (1, 1)
+    >>> engine.deco_table.total
+    51.0
+"""
+
+from collections import OrderedDict
+import logging
+
+logger = logging.getLogger(__name__)
+
+# maximum number of ascents kept by the cache
+ASCENT_CACHE_SIZE = 1024
+
+# quantum of inert gas pressure values of the cache key [bar]
+ASCENT_CACHE_QUANTUM = 1e-12
+
+
+class AscentCache(object):
+    """
+    Cache of dive ascents calculated by decompression engine.
+
+    :var engine: DecoTengu decompression engine.
+    :var size: Maximum number of ascents kept by the cache.
+    :var quantum: Quantum of inert gas pressure values of the cache key
+        [bar].
+    :var hits: Number of cache hits.
+    :var misses: Number of cache misses.
+    :var _ascent: Dive ascent function of decompression engine.
+    :var _cache: Ordered dictionary of cached ascents.
+    """
+    def __init__(
+            self, engine, size=ASCENT_CACHE_SIZE,
+            quantum=ASCENT_CACHE_QUANTUM):
+        """
+        Create ascent cache.
+
+        :param engine: DecoTengu decompression engine.
+        :param size: Maximum number of ascents kept by the cache.
+        :param quantum: Quantum of inert gas pressure values of the cache
+            key [bar].
+        """
+        super().__init__()
+        self.engine = engine
+        self.size = size
+        self.quantum = quantum
+        self.hits = 0
+        self.misses = 0
+        self._ascent = engine._dive_ascent
+        self._cache = OrderedDict()
+
+
+    def __call__(self, start, gas_list):
+        """
+        Calculate dive ascent or get it from the cache.
+
+        .. seealso:: :py:meth:`decotengu.engine.Engine._dive_ascent`
+        """
+        key = self.key(start, gas_list)
+        value = self._cache.get(key)
+        if value is None:
+            self.misses += 1
+            return self._calculate(key, start, gas_list)
+        else:
+            self.hits += 1
+            self._cache.move_to_end(key)
+            return self._replay(start, *value)
+
+
+    def key(self, start, gas_list):
+        """
+        Create cache key of dive ascent.
+
+        :param start: Starting dive step.
+        :param gas_list: List of gas mixes.
+        """
+        engine = self.engine
+        model = engine.model
+        q = self.quantum
+        tissues = tuple(round(float(v) / q) for v in start.data._tissues)
+        config = (
+            type(model), model.kernel, model.gf_low, model.gf_high,
+            model.water_vapour_pressure,
+            engine.surface_pressure, engine.ascent_rate,
+            engine.last_stop_6m, engine._meter_to_bar,
+        )
+        return (
+            tissues, start.abs_p, start.gas, start.data.gf, tuple(gas_list),
+            config
+        )
+
+
+    @property
+    def hit_rate(self):
+        """
+        Ratio of cache hits to all cache lookups.
+        """
+        n = self.hits + self.misses
+        return self.hits / n if n else 0
+
+
+    def __len__(self):
+        """
+        Get number of ascents kept by the cache.
+        """
+        return len(self._cache)
+
+
+    def clear(self):
+        """
+        Remove all ascents from the cache and reset cache statistics.
+        """
+        self._cache.clear()
+        self.hits = 0
+        self.misses = 0
+
+
+    def _calculate(self, key, start, gas_list):
+        """
+        Calculate dive ascent and put it into the cache.
+
+        The ascent is cached only when all its dive steps are calculated.
+
+        :param key: Cache key of the ascent.
+        :param start: Starting dive step.
+        :param gas_list: List of gas mixes.
+        """
+        deco_table = self.engine.deco_table
+        n = len(deco_table)
+        steps = []
+        for step in self._ascent(start, gas_list):
+            steps.append(step)
+            yield step
+
+        cache = self._cache
+        cache[key] = start.time, tuple(steps), tuple(deco_table[n:])
+        if len(cache) > self.size:
+            cache.popitem(last=False)
+
+
+    def _replay(self, start, time, steps, stops):
+        """
+        Replay cached dive ascent.
+
+        :param start: Starting dive step.
+        :param time: Time of starting dive step of cached ascent.
+        :param steps: Cached dive steps.
+        :param stops: Cached decompression stops.
+        """
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug('ascent cache: hit at {}'.format(start))
+
+        dt = start.time - time
+        for step in steps:
+            yield step._replace(time=step.time + dt) if dt else step
+        self.engine.deco_table.extend(stops)
+
+
+
+def cache_engine(engine, size=ASCENT_CACHE_SIZE, quantum=ASCENT_CACHE_QUANTUM):
+    """
+    Override DecoTengu engine object, so dive ascents are cached.
+
+    :param engine: DecoTengu engine object.
+    :param size: Maximum number of ascents kept by the cache.
+    :param quantum: Quantum of inert gas pressure values of the cache key
+        [bar].
+    """
+    engine._dive_ascent = AscentCache(engine, size, quantum)
+
+
+# vim: sw=4:et:ai
@@ -87,10 +87,28 @@ the surface
     >>> round(max_error, 10)
     1.06134e-05
 
+Decimal Kernel
+~~~~~~~~~~~~~~
+The decimal numeric kernel (see :py:mod:`decotengu.kernel`) allows to
+perform tissue compartments loading and ascent ceiling calculations with
+decimal numbers of high precision, while all other calculations are
+performed using float type. The results of the calculations are converted
+to float type.
+
+    >>> engine = create(kernel='decimal')
+    >>> engine.model.load     # doctest:+ELLIPSIS
+    <bound method DecimalKernel.load of <decotengu.alt.decimal.DecimalKernel object at ...>>
+
 """
 
+from array import array
 from decimal import Decimal, localcontext
 
+from ..model import Data, _buffer
+
+# precision of decimal kernel calculations
+DECIMAL_KERNEL_PREC = 28
+
 class DecimalContext(object):
     """
     Context manager for float type override with decimal type.
@@ -209,4 +227,127 @@ class DecimalContext(object):
             setattr(obj, attr, data[attr])
 
 
+
+class DecimalKernel(object):
+    """
+    Decimal numeric kernel.
+
+    Load tissue compartments with inert gas and calculate ascent ceiling
+    limit using decimal numbers of specified precision.
+
+    Float values are converted to decimal numbers without loss of
+    precision and the results are converted to float values. If decimal
+    numbers are used by decompression model data, then the results are
+    decimal numbers.
+
+    :var model: Decompression model.
+    :var prec: Precision of decimal numbers.
+    """
+    def __init__(self, model, prec=DECIMAL_KERNEL_PREC):
+        """
+        Create decimal numeric kernel.
+
+        :param model: Decompression model.
+        :param prec: Precision of decimal numbers.
+        """
+        super().__init__()
+        self.model = model
+        self.prec = prec
+
+
+    def load(self, abs_p, time, gas, rate, data):
+        """
+        Calculate gas loading for all tissue compartments.
+
+        :param abs_p: Absolute pressure [bar] (current depth).
+        :param time: Time of exposure [min] (i.e. time of ascent).
+        :param gas: Gas mix configuration.
+        :param rate: Pressure rate change [bar/min].
+        :param data: Decompression model data.
+
+        .. seealso:: :py:meth:`decotengu.model.ZH_L16_GF.load`
+        """
+        assert time > 0
+        model = self.model
+        tp = data._tissues
+        with localcontext() as ctx:
+            ctx.prec = self.prec
+            time = Decimal(time)
+            rate = Decimal(rate)
+            p = Decimal(abs_p) - Decimal(model.water_vapour_pressure)
+            f_gas = (Decimal(gas.n2) / 100, Decimal(gas.he) / 100)
+
+            values = []
+            for i, (p_i, k) in enumerate(zip(tp, model._k_flat)):
+                k = Decimal(k)
+                f = f_gas[i % 2]
+                p_alv = f * p
+                r = f * rate
+                v = p_alv + r * (time - 1 / k) \
+                    - (p_alv - Decimal(p_i) - r / k) * (-k * time).exp()
+                values.append(v)
+
+        return Data._from_buffer(_buffer(self._result(values, tp), tp), data.gf)
+
+
+    def gf_limit(self, gf, data):
+        """
+        Calculate pressure of ascent ceiling for each tissue compartment.
+
+        :param gf: Gradient factor, `gf_low` by default.
+        :param data: Decompression model data.
+
+        .. seealso:: :py:meth:`decotengu.model.ZH_L16_GF.gf_limit`
+        """
+        model = self.model
+        if gf is None:
+            gf = model.gf_low
+        assert gf > 0 and gf <= 1.5
+
+        tp = data._tissues
+        with localcontext() as ctx:
+            ctx.prec = self.prec
+            gf = Decimal(gf)
+            items = zip(tp[::2], tp[1::2], model._gf_coeff)
+            limits = []
+            for p_n2, p_he, coeff in items:
+                p_n2, p_he = Decimal(p_n2), Decimal(p_he)
+                n2_a, n2_b, he_a, he_b = (Decimal(v) for v in coeff)
+                p = p_n2 + p_he
+                a = (n2_a * p_n2 + he_a * p_he) / p
+                b = (n2_b * p_n2 + he_b * p_he) / p
+                limits.append((p - a * gf) / (gf / b + 1 - gf))
+
+        return tuple(self._result(limits, tp))
+
+
+    def _result(self, values, tp):
+        """
+        Convert results of calculations to float values, unless decimal
+        numbers are used by decompression model data.
+
+        :param values: Results of calculations.
+        :param tp: Flat buffer of decompression model data.
+        """
+        if isinstance(tp, array):
+            return [float(v) for v in values]
+        else:
+            return [+v for v in values]
+
+
+
+def decimal_kernel(model):
+    """
+    Override decompression model methods, so it is possible to use
+    decimal numeric kernel.
+
+    :param model: Decompression model.
+
+    .. seealso:: :py:mod:`decotengu.kernel`
+    """
+    kernel = DecimalKernel(model)
+    model.load = kernel.load
+    model.gf_limit = kernel.gf_limit
+
+
 # vim: sw=4:et:ai
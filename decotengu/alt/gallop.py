@@ -0,0 +1,199 @@
+#
+# DecoTengu - dive decompression library.
+#
+# Copyright (C) 2013-2014 by Artur Wroblewski <wrobell@pld-linux.org>
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+
+"""
+.. _algo-gallop:
+
+Decompression Stop Galloping Search
+-----------------------------------
+The default algorithm calculating length of a decompression stop (see
+:py:meth:`decotengu.engine.Engine._deco_stop`) searches for the length
+linearly with fixed time step (see `const.DECO_STOP_SEARCH_TIME`) and then
+performs binary search within the last time step. The number of linear
+search steps grows with the length of decompression stop.
+
+The galloping search (also known as exponential search) doubles the time
+step of the search until ascent to next decompression stop is allowed.
+Then binary search is performed within the last time step. The number of
+search steps grows with logarithm of the length of decompression stop.
+
+The algorithm is
+
+#. If predicted length of decompression stop :math:`t_p` is given (the
+   length of previous decompression stop), then check ascent at
+   :math:`t_p` and :math:`t_p - 1` like the default algorithm. Return
+   :math:`t_p` if ascent is possible at :math:`t_p` only. If ascent is
+   possible at both, then find the length in range :math:`(0, t_p - 1]`
+   using binary search. Otherwise, let :math:`t_{lo} = t_p` and continue
+   with galloping step.
+#. If ascent is possible after 1 minute, then return 1 minute.
+#. Let :math:`t_{lo} = 1` and :math:`dt` be initial time step.
+#. Load tissue compartments with inert gas for :math:`dt` minutes. If
+   ascent is not possible at :math:`t_{lo} + dt`, then let
+   :math:`t_{lo} = t_{lo} + dt`, :math:`dt = 2 * dt` and repeat this step.
+#. Find the shortest decompression stop length in range
+   :math:`(t_{lo}, t_{lo} + dt]` using binary search.
+
+Every step of the search loads tissue compartments with inert gas and
+calculates ascent ceiling. The number of the calculations depends on the
+length of decompression stops of a dive profile. The galloping search
+performs less calculations for decompression stops of few minutes (most
+of decompression stops of a dive) and for very long decompression stops.
+The default algorithm is better for decompression stops of length close
+to the multiplies of its time step. Use ``--calls`` option of ``dt-perf``
+script to compare the number of calculations for its dive profiles.
+
+The algorithm is implemented by
+:py:class:`decotengu.alt.gallop.DecoStopGallop` class.
+
+Example
+~~~~~~~
+To use the galloping search, override decompression engine object with
+:py:func:`decotengu.alt.gallop.gallop_engine` function
+
+    >>> import decotengu
+    >>> from decotengu.alt.gallop import gallop_engine
+    >>> engine = decotengu.create()
+    >>> engine.add_gas(0, 21)
+    >>> gallop_engine(engine)
+    >>> profile = list(engine.calculate(40, 35))
+    >>> engine.deco_table.total
+    51.0
+"""
+
+import logging
+
+from ..engine import Phase, Step
+from ..ft import bisect_find
+from .. import const, trace
+
+logger = logging.getLogger(__name__)
+
+# initial time step of decompression stop galloping search [min]
+GALLOP_START = 1
+
+
+class DecoStopGallop(object):
+    """
+    Calculate length of decompression stop using galloping search.
+
+    :var engine: DecoTengu decompression engine.
+    :var start: Initial time step of the search [min].
+
+    .. seealso:: :py:meth:`decotengu.Engine._deco_stop`
+    """
+    def __init__(self, engine, start=GALLOP_START):
+        """
+        Create decompression stop galloping search object.
+
+        :param engine: DecoTengu decompression engine.
+        :param start: Initial time step of the search [min].
+        """
+        self.engine = engine
+        self.start = start
+
+
+    def __call__(self, step, next_time, gas, gf, hint=None):
+        """
+        Calculate decompression stop.
+
+        .. seealso:: :py:meth:`decotengu.Engine._deco_stop`
+        """
+        engine = self.engine
+        if __debug__:
+            depth = engine._to_depth(step.abs_p)
+            assert depth % 3 == 0 and depth > 0, depth
+
+        minute = const.MINUTE
+        load = lambda time, data: engine._tissue_pressure_const(
+            step.abs_p, time * minute, gas, data
+        )
+        can_ascend = lambda data: engine._can_ascend(
+            step.abs_p, next_time, data, gf
+        )
+
+        # ascent is not possible at t_lo; ascent is possible at t_hi
+        t_lo, data = 0, step.data
+        t_hi = None
+
+        # check predicted length of decompression stop first, like
+        # `Engine._deco_stop`
+        if hint is not None and hint > 1:
+            hint_data = load(hint, step.data)
+            if not can_ascend(hint_data):
+                t_lo, data = hint, hint_data
+            else:
+                prev = load(hint - 1, step.data)
+                if not can_ascend(prev):
+                    return Step(
+                        Phase.DECO_STOP, step.abs_p, step.time + hint * minute,
+                        gas, hint_data
+                    )
+                t_hi = hint - 1
+
+        if t_hi is None:
+            if t_lo == 0:
+                next_data = load(1, data)
+                if can_ascend(next_data):
+                    return Step(
+                        Phase.DECO_STOP, step.abs_p, step.time + minute,
+                        gas, next_data
+                    )
+                t_lo, data = 1, next_data
+
+            # double the time step until ascent is possible at t_lo + dt
+            dt = self.start
+            while True:
+                next_data = load(dt, data)
+                if can_ascend(next_data):
+                    break
+                t_lo += dt
+                data = next_data
+                dt *= 2
+            t_hi = t_lo + dt
+
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug(
+                'deco stop gallop: ascent possible within ({}, {}]min'
+                .format(t_lo, t_hi)
+            )
+
+        # ascent is possible at t_hi, so check until t_hi - 1
+        exec_deco_stop = lambda k: not can_ascend(load(k, data))
+        k = bisect_find(t_hi - t_lo - 1, exec_deco_stop)
+        time = (t_lo + k + 1) * minute
+        if trace.subscribers:
+            trace.emit(trace.StopSearch(step.abs_p, time, gas, gf))
+
+        return engine._step_next(step, time, gas, phase=Phase.DECO_STOP)
+
+
+
+def gallop_engine(engine, start=GALLOP_START):
+    """
+    Override DecoTengu engine object, so decompression stop length is
+    calculated with galloping search.
+
+    :param engine: DecoTengu engine object.
+    :param start: Initial time step of the search [min].
+    """
+    engine._deco_stop = DecoStopGallop(engine, start)
+
+
+# vim: sw=4:et:ai
@@ -96,10 +96,11 @@ class AscentJumper(object):
 
         t = engine._pressure_to_time(start.abs_p - abs_p, ascent_rate)
         end_time = int(start.time + t)
-        logger.debug(
-            'ascent from {0.abs_p}bar ({0.time}min) to {1}bar ({2}min))'
-            .format(start, abs_p, end_time)
-        )
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug(
+                'ascent from {0.abs_p}bar ({0.time}min) to {1}bar ({2}min))'
+                .format(start, abs_p, end_time)
+            )
 
         step = start
         minute = const.MINUTE
@@ -133,7 +134,7 @@ class DecoStopStepper(object):
         self.engine = engine
 
 
-    def __call__(self, start, time, gas, gf):
+    def __call__(self, start, time, gas, gf, hint=None):
         """
         Execute dive decompression stop using 1min intervals.
 
@@ -153,7 +154,7 @@ class DecoStopStepper(object):
         while not engine._can_ascend(abs_p, time, data, gf):
             data = engine._tissue_pressure_const(abs_p, minute, gas, data)
             deco_time += minute
-            if __debug__:
+            if logger.isEnabledFor(logging.DEBUG):
                 logger.debug('deco stepper: time {}min'.format(deco_time))
 
         step = start._replace(
@@ -0,0 +1,337 @@
+#
+# DecoTengu - dive decompression library.
+#
+# Copyright (C) 2013-2014 by Artur Wroblewski <wrobell@pld-linux.org>
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+
+"""
+.. _algo-solver:
+
+Decompression Stop Solver
+-------------------------
+The default algorithm calculating length of a decompression stop (see
+:py:meth:`decotengu.engine.Engine._deco_stop`) searches for the length of
+the stop. Each step of the search loads all tissue compartments with inert
+gas and calculates ascent ceiling.
+
+At decompression stop, the depth is constant and Schreiner equation (see
+:ref:`eq-schreiner`) reduces to exponential decay
+
+    .. math::
+
+        P(t) = P_{alv} + (P_{i} - P_{alv}) * e^{-k * t}
+
+It is allowed to ascend to next decompression stop, when ascent ceiling
+limit of each tissue compartment is not deeper than absolute pressure of
+next decompression stop :math:`P_{next}`. Using Buhlmann equation with
+gradient factors (see :ref:`model-equations`), the time of decompression
+stop can be calculated for each tissue compartment separately.
+
+When tissue compartment contains nitrogen only (i.e. nitrox gas mix is
+breathed and there is no helium in the tissue compartment), Buhlmann
+coefficients :math:`A` and :math:`B` are constant and ascent is allowed
+when
+
+    .. math::
+
+        P(t) \\le P_{max} = P_{next} * (gf / B + 1 - gf) + A * gf
+
+which gives the time of decompression stop for the tissue compartment
+
+    .. math::
+
+        t = \\frac{1}{k} * ln(\\frac{P_{i} - P_{alv}}{P_{max} - P_{alv}})
+
+When tissue compartment contains nitrogen and helium, then Buhlmann
+coefficients depend on inert gas pressure values, which decay at
+different rates. The time of decompression stop is the root of function
+
+    .. math::
+
+        g(t) = P^2 * B' - gf * A' * B' - P_{next} * (gf * P^2 + (1 - gf) * P * B')
+
+where :math:`P = P_{N_2} + P_{He}`, :math:`A' = A_{N_2} * P_{N_2} + A_{He} * P_{He}`
+and :math:`B' = B_{N_2} * P_{N_2} + B_{He} * P_{He}`. The root is found
+with Newton method. The function is usually convex and decreasing, so
+Newton method started at the beginning of decompression stop converges
+from the left of the root. Otherwise, the method is guarded with bisection
+within a bracket of the root.
+
+The length of decompression stop is the maximum of the times calculated
+for all tissue compartments rounded up to full minute. As the calculation
+is performed with floating point numbers, the length is verified by
+loading tissue compartments with inert gas for the stop length and the
+stop length minus one minute. The verification ensures the same results as
+the default algorithm, while usually only two tissue compartments loadings
+are performed (one loading for 1 minute decompression stops).
+
+The algorithm is implemented by :py:class:`decotengu.alt.solver.DecoStopSolver`
+class.
+
+Example
+~~~~~~~
+To use the solver, override decompression engine object with
+:py:func:`decotengu.alt.solver.solver_engine` function
+
+    >>> import decotengu
+    >>> from decotengu.alt.solver import solver_engine
+    >>> engine = decotengu.create()
+    >>> engine.add_gas(0, 21)
+    >>> solver_engine(engine)
+    >>> profile = list(engine.calculate(40, 35))
+    >>> engine.deco_table.total
+    51.0
+"""
+
+import math
+import logging
+
+from ..engine import Engine, Phase, Step
+from .. import const, trace
+
+logger = logging.getLogger(__name__)
+
+# maximum number of iterations of Newton method
+SOLVER_MAX_ITER = 64
+
+# the time of decompression stop is searched up to this value [min]
+SOLVER_MAX_TIME = 2 ** 16
+
+# tolerance of time of decompression stop found with Newton method [min]
+SOLVER_TOLERANCE = 1e-4
+
+INF = float('inf')
+
+
+class DecoStopSolver(object):
+    """
+    Calculate length of decompression stop by solving Buhlmann equation
+    with gradient factors for time of decompression stop.
+
+    :var engine: DecoTengu decompression engine.
+
+    .. seealso:: :py:meth:`decotengu.Engine._deco_stop`
+    """
+    def __init__(self, engine):
+        """
+        Create decompression stop solver object.
+
+        :param engine: DecoTengu decompression engine.
+        """
+        self.engine = engine
+
+
+    def __call__(self, step, next_time, gas, gf, hint=None):
+        """
+        Calculate decompression stop.
+
+        .. seealso:: :py:meth:`decotengu.Engine._deco_stop`
+        """
+        engine = self.engine
+        if __debug__:
+            depth = engine._to_depth(step.abs_p)
+            assert depth % 3 == 0 and depth > 0, depth
+
+        p_next = step.abs_p - engine._time_to_pressure(
+            next_time, engine.ascent_rate
+        )
+        t = self.stop_time(step.abs_p, p_next, gas, gf, step.data)
+        if t > SOLVER_MAX_TIME:
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug('deco stop solver: no solution, using engine')
+            return Engine._deco_stop(engine, step, next_time, gas, gf)
+
+        minute = const.MINUTE
+        load = lambda n: engine._tissue_pressure_const(
+            step.abs_p, n * minute, gas, step.data
+        )
+        can_ascend = lambda data: engine._can_ascend(
+            step.abs_p, next_time, data, gf
+        )
+
+        # verify the estimate; keep decompression model data of the
+        # shortest stop length allowing to ascend
+        n = max(1, math.ceil(t))
+        data = load(n)
+        if can_ascend(data):
+            while n > 1:
+                prev = load(n - 1)
+                if not can_ascend(prev):
+                    break
+                n -= 1
+                data = prev
+        else:
+            while not can_ascend(data):
+                n += 1
+                data = load(n)
+
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug(
+                'deco stop solver: estimate {:.4f}min, found {}min'
+                .format(t, n)
+            )
+        if trace.subscribers:
+            trace.emit(trace.StopSearch(step.abs_p, n * minute, gas, gf))
+
+        return Step(
+            Phase.DECO_STOP, step.abs_p, step.time + n * minute, gas, data
+        )
+
+
+    def stop_time(self, abs_p, p_next, gas, gf, data):
+        """
+        Calculate time of decompression stop after which ascent to next
+        decompression stop is possible.
+
+        The time is a float value, which is zero if ascent is possible
+        immediately and infinity if ascent is never possible.
+
+        :param abs_p: Absolute pressure of decompression stop [bar].
+        :param p_next: Absolute pressure of next decompression stop [bar].
+        :param gas: Gas mix configuration.
+        :param gf: Gradient factor value of next decompression stop.
+        :param data: Decompression model data.
+        """
+        model = self.engine.model
+        gf = float(gf)
+        p_next = float(p_next)
+        p = float(abs_p - model.water_vapour_pressure)
+        n2_alv = float(gas.n2) / 100 * p
+        he_alv = float(gas.he) / 100 * p
+
+        tp = data._tissues
+        items = zip(
+            tp[::2], tp[1::2], model.n2_k_const, model.he_k_const,
+            model._gf_coeff
+        )
+        t = 0.0
+        for n2_p, he_p, n2_k, he_k, coeff in items:
+            n2_p, he_p = float(n2_p), float(he_p)
+            if he_p == 0 and he_alv == 0:
+                v = self._nitrox_time(
+                    p_next, gf, n2_p, n2_alv, float(n2_k), coeff
+                )
+            else:
+                v = self._trimix_time(
+                    p_next, gf, (n2_p, he_p), (n2_alv, he_alv),
+                    (float(n2_k), float(he_k)), coeff, t
+                )
+            t = max(t, v)
+        return t
+
+
+    def _nitrox_time(self, p_next, gf, p_i, p_alv, k, coeff):
+        """
+        Calculate time of decompression stop for a tissue compartment
+        containing nitrogen only.
+
+        :param p_next: Absolute pressure of next decompression stop [bar].
+        :param gf: Gradient factor value.
+        :param p_i: Initial pressure of nitrogen in tissue compartment.
+        :param p_alv: Pressure of inspired nitrogen.
+        :param k: Nitrogen gas decay constant.
+        :param coeff: Buhlmann coefficients of tissue compartment.
+        """
+        a, b = float(coeff[0]), float(coeff[1])
+        p_max = p_next * (gf / b + 1 - gf) + a * gf
+        if p_i <= p_max:
+            return 0.0
+        if p_alv >= p_max:
+            return INF
+        return math.log((p_i - p_alv) / (p_max - p_alv)) / k
+
+
+    def _trimix_time(self, p_next, gf, p_i, p_alv, k, coeff, t_min=0.0):
+        """
+        Calculate time of decompression stop for a tissue compartment
+        containing nitrogen and helium.
+
+        The time is searched from `t_min` value - if ascent is possible
+        after `t_min` minutes, then `t_min` is returned. This allows to
+        skip tissue compartments, which do not control the length of
+        decompression stop.
+
+        :param p_next: Absolute pressure of next decompression stop [bar].
+        :param gf: Gradient factor value.
+        :param p_i: Initial pressure of nitrogen and helium in tissue
+            compartment.
+        :param p_alv: Pressure of inspired nitrogen and helium.
+        :param k: Nitrogen and helium gas decay constants.
+        :param coeff: Buhlmann coefficients of tissue compartment.
+        :param t_min: Minimal time of decompression stop.
+        """
+        n2_a, n2_b, he_a, he_b = (float(v) for v in coeff)
+
+        def f(t):
+            # value of g(t) and its derivative
+            n2_e, he_e = math.exp(-k[0] * t), math.exp(-k[1] * t)
+            n2_p = p_alv[0] + (p_i[0] - p_alv[0]) * n2_e
+            he_p = p_alv[1] + (p_i[1] - p_alv[1]) * he_e
+            n2_d = -k[0] * (p_i[0] - p_alv[0]) * n2_e
+            he_d = -k[1] * (p_i[1] - p_alv[1]) * he_e
+
+            p, p_d = n2_p + he_p, n2_d + he_d
+            a, a_d = n2_a * n2_p + he_a * he_p, n2_a * n2_d + he_a * he_d
+            b, b_d = n2_b * n2_p + he_b * he_p, n2_b * n2_d + he_b * he_d
+
+            v = p * p * b - gf * a * b - p_next * (gf * p * p + (1 - gf) * p * b)
+            d = 2 * p * p_d * b + p * p * b_d - gf * (a_d * b + a * b_d) \
+                - p_next * (2 * gf * p * p_d + (1 - gf) * (p_d * b + p * b_d))
+            return v, d
+
+        v, d = f(t_min)
+        if v <= 0:
+            return t_min
+
+        # Newton method starting at the left of the root; usually the
+        # function is convex and decreasing, so the method converges
+        # from the left; otherwise it is guarded by bisection within
+        # bracket of the root
+        lo, hi = t_min, INF
+        t = t_min
+        for i in range(SOLVER_MAX_ITER):
+            if d < 0:
+                t_next = t - v / d
+            else:
+                t_next = t + max(1.0, t)
+            if hi < INF and not lo < t_next < hi:
+                t_next = (lo + hi) / 2
+            if t_next > SOLVER_MAX_TIME:
+                return INF
+
+            v, d = f(t_next)
+            if v > 0:
+                lo = t_next
+            else:
+                hi = t_next
+            if abs(t_next - t) < SOLVER_TOLERANCE:
+                break
+            t = t_next
+        return t_next
+
+
+
+def solver_engine(engine):
+    """
+    Override DecoTengu engine object, so decompression stop length is
+    calculated with decompression stop solver.
+
+    :param engine: DecoTengu engine object.
+    """
+    engine._deco_stop = DecoStopSolver(engine)
+
+
+# vim: sw=4:et:ai
@@ -140,7 +140,7 @@ Perform calculations
 import math
 import logging
 
-from .. import const
+from .. import const, trace
 
 logger = logging.getLogger(__name__)
 
@@ -199,24 +199,32 @@ class TabExp(object):
         :param time: Time of exposure [min].
         :param k: Gas decay constant :math:`k` for a tissue compartment.
         """
-        if __debug__:
-            logger.debug(
-                'tab exp: time to split {}min ({}s)'.format(time, time * 60)
-            )
-
         kt_exp = self._kt_exp[k]
         n1 = round(time // 1)
         n2 = round(time % 1 * 10)
         result = kt_exp[60] ** n1 * kt_exp[6] ** n2
 
-        if __debug__:
-            logger.debug('tab exp: n1={}, n2={}'.format(n1, n2))
-            assert abs(n1 * 60 + n2 * 6 - time * 60) < const.EPSILON
+        assert abs(n1 * 60 + n2 * 6 - time * 60) < const.EPSILON
+        if trace.subscribers:
+            trace.emit(trace.ExpSplit(time, n1, n2))
 
         return result
 
 
 
+def tab_kernel(model):
+    """
+    Override decompression model attributes and methods, so it is possible
+    to use tabular tissue calculator.
+
+    :param model: Decompression model.
+
+    .. seealso:: :py:mod:`decotengu.kernel`
+    """
+    model._exp = TabExp(model.n2_k_const, model.he_k_const)
+    model._exp_cache.clear()
+
+
 def tab_engine(engine):
     """
     Override DecoTengu engine object attributes and methods, so it is
@@ -224,8 +232,7 @@ def tab_engine(engine):
 
     :param engine: DecoTengu engine object.
     """
-    model = engine.model
-    model._exp = TabExp(model.n2_k_const, model.he_k_const)
+    tab_kernel(engine.model)
 
     logger.warning('overriding descent rate and ascent rate to 10m/min')
     engine.descent_rate = 10
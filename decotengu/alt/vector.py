@@ -0,0 +1,354 @@
+#
+# DecoTengu - dive decompression library.
+#
+# Copyright (C) 2013-2014 by Artur Wroblewski <wrobell@pld-linux.org>
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+
+"""
+.. _vector-calc:
+
+Vectorized Calculations
+-----------------------
+The decompression model calculates inert gas pressure in each tissue
+compartment separately, which means 32 evaluations of Schreiner equation
+(16 tissue compartments, nitrogen and helium) for each tissue loading
+step.
+
+The Schreiner equation (see :ref:`eq-schreiner`) can be evaluated for all
+tissue compartments and both inert gases at once using array operations.
+DecoTengu allows to perform such vectorized calculations with `NumPy
+<http://www.numpy.org/>`_ library. NumPy is not required by DecoTengu and
+has to be installed separately to use vectorized calculator.
+
+The vectorized calculator keeps gas decay constants :math:`k` in an array
+of shape `(16, 2)` - a row for each tissue compartment, a column for each
+inert gas. The inert gas pressure of tissue compartments is converted to
+array of the same shape and Schreiner equation is evaluated for the whole
+array.
+
+The vectorized calculator also allows to load tissue compartments of
+multiple, independent dives with inert gas at once, see
+:py:meth:`decotengu.alt.vector.VectorCalculator.load_many` method. The
+conversion of decompression model data to and from arrays is costly, so
+the method is faster than pure Python kernel only for batches of tens of
+decompression model data, i.e. about twice as fast per decompression
+model data for 30 or more of them and slower for less than 10 of them.
+Only batched first decompression stop search (see :ref:`algo-batch`) uses
+the method; decompression tables generator does not.
+
+Ascent ceiling limit is calculated with Buhlmann coefficients kept in
+arrays of the same shape, which are prepared once on calculator
+initialization.
+
+The results of vectorized calculations are the same as results of default
+decompression model calculations (the difference is below
+:math:`10^{-10}`).
+
+Example
+~~~~~~~
+To calculate dive decompression information using vectorized calculator
+override decompression engine object with
+:py:func:`decotengu.alt.vector.vector_engine` function.
+
+Create the decompression engine and override it with vectorized
+calculator::
+
+    import decotengu
+    from decotengu.alt.vector import vector_engine
+
+    engine = decotengu.create()
+    engine.add_gas(0, 21)
+    vector_engine(engine)
+
+Perform calculations::
+
+    profile = list(engine.calculate(35, 40))
+    print(engine.deco_table.total)
+"""
+
+import logging
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+from ..model import Data, _buffer
+from ..error import ConfigError
+
+logger = logging.getLogger(__name__)
+
+
+class VectorCalculator(object):
+    """
+    Vectorized tissue calculator.
+
+    Calculate inert gas pressure in all tissue compartments using array
+    operations.
+
+    :var model: Decompression model.
+    :var dtype: Data type of arrays used for calculations.
+    :var _k_const: Array of gas decay constants :math:`k` - a row for each
+        tissue compartment, a column for each inert gas.
+    :var _gf_a: Array of Buhlmann coefficients A - a row for each tissue
+        compartment, a column for each inert gas.
+    :var _gf_b: Array of Buhlmann coefficients B - a row for each tissue
+        compartment, a column for each inert gas.
+    """
+    def __init__(self, model, dtype=float):
+        """
+        Create instance of vectorized calculator.
+
+        :param model: Decompression model.
+        :param dtype: Data type of arrays used for calculations, i.e.
+            `numpy.float32` for single precision floats.
+        """
+        if np is None:
+            raise ConfigError('NumPy is required by vectorized calculator')
+
+        super().__init__()
+        self.model = model
+        self.dtype = dtype
+        self._k_const = np.array(
+            (model.n2_k_const, model.he_k_const), dtype=dtype
+        ).T
+        self._gf_a = np.array((model.N2_A, model.HE_A), dtype=dtype).T
+        self._gf_b = np.array((model.N2_B, model.HE_B), dtype=dtype).T
+
+
+    def load(self, abs_p, time, gas, rate, data):
+        """
+        Calculate gas loading for all tissue compartments.
+
+        The method returns decompression data model information.
+
+        :param abs_p: Absolute pressure [bar] (current depth).
+        :param time: Time of exposure [min] (i.e. time of ascent).
+        :param gas: Gas mix configuration.
+        :param rate: Pressure rate change [bar/min].
+        :param data: Decompression model data.
+
+        .. seealso:: :py:meth:`decotengu.model.ZH_L16_GF.load`
+        """
+        assert time > 0
+        k = self._k_const
+        dtype = self.dtype
+        f_gas = np.array((gas.n2, gas.he), dtype=dtype) / 100
+        p_alv = f_gas * dtype(abs_p - self.model.water_vapour_pressure)
+        r = f_gas * dtype(rate)
+        time = dtype(time)
+        tp = data._tissues
+        p_i = np.asarray(tp, dtype=dtype).reshape(k.shape)
+
+        p = p_alv + r * (time - 1 / k) - (p_alv - p_i - r / k) \
+            * np.exp(-k * time)
+
+        return Data._from_buffer(_buffer(p.ravel().tolist(), tp), data.gf)
+
+
+    def load_many(self, abs_p, time, gas, rate, data):
+        """
+        Calculate gas loading for all tissue compartments of multiple,
+        independent decompression model data.
+
+        All decompression model data are loaded with inert gas with one
+        call of :py:meth:`VectorCalculator.load_stack` method.
+
+        :param abs_p: Absolute pressure [bar] values (current depth).
+        :param time: Time of exposure [min] values (i.e. time of ascent).
+        :param gas: Gas mix configurations.
+        :param rate: Pressure rate change [bar/min] values.
+        :param data: Collection of decompression model data.
+
+        .. seealso:: :py:meth:`decotengu.model.ZH_L16_GF.load_many`
+        """
+        assert len(abs_p) == len(time) == len(gas) == len(rate) == len(data)
+        if not data:
+            return []
+
+        stack = np.array([d._tissues for d in data], dtype=self.dtype)
+        f_gas = np.array([(m.n2, m.he) for m in gas], dtype=self.dtype) / 100
+        stack = self.load_stack(abs_p, time, f_gas, rate, stack)
+
+        return [
+            Data._from_buffer(_buffer(tp, d._tissues), d.gf)
+            for tp, d in zip(stack.tolist(), data)
+        ]
+
+
+    def load_stack(self, abs_p, time, f_gas, rate, stack):
+        """
+        Calculate gas loading for all tissue compartments for a stack of
+        tissues gas loading.
+
+        The stack is an array of shape `(n, 32)`. Each row of the stack is
+        flat buffer of inert gas pressure values (see
+        :py:class:`decotengu.model.Data`). Each row is loaded with inert
+        gas using its own absolute pressure, time of exposure, inert gas
+        fractions and pressure rate change.
+
+        The method returns new stack of tissues gas loading.
+
+        :param abs_p: Absolute pressure [bar] values (current depth).
+        :param time: Time of exposure [min] values (i.e. time of ascent).
+        :param f_gas: Array of shape `(n, 2)` with nitrogen and helium
+            fractions, i.e. `(0.79, 0)` for air.
+        :param rate: Pressure rate change [bar/min] values.
+        :param stack: Stack of tissues gas loading.
+        """
+        k = self._k_const
+        dtype = self.dtype
+        n = len(stack)
+        abs_p = np.asarray(abs_p, dtype=dtype).reshape(n, 1, 1)
+        time = np.asarray(time, dtype=dtype).reshape(n, 1, 1)
+        rate = np.asarray(rate, dtype=dtype).reshape(n, 1, 1)
+        f_gas = np.asarray(f_gas, dtype=dtype).reshape(n, 1, 2)
+        assert np.all(time > 0)
+
+        wvp = dtype(self.model.water_vapour_pressure)
+        p_alv = f_gas * (abs_p - wvp)
+        r = f_gas * rate
+        p_i = np.asarray(stack, dtype=dtype).reshape((n,) + k.shape)
+
+        p = p_alv + r * (time - 1 / k) - (p_alv - p_i - r / k) \
+            * np.exp(-k * time)
+        return p.reshape(n, -1)
+
+
+    def gf_limit(self, gf, data):
+        """
+        Calculate pressure of ascent ceiling for each tissue compartment.
+
+        The method returns a tuple of values - a pressure value for each
+        tissue compartment.
+
+        :param gf: Gradient factor, `gf_low` by default.
+        :param data: Decompression model data.
+
+        .. seealso:: :py:meth:`decotengu.model.ZH_L16_GF.gf_limit`
+        """
+        if gf is None:
+            gf = self.model.gf_low
+        limit = self.ceiling_stack(gf, np.asarray(data._tissues)[None])
+        return tuple(limit[0].tolist())
+
+
+    def ceiling_limit(self, data, gf=None):
+        """
+        Calculate pressure of ascent ceiling limit using decompression
+        model data.
+
+        :param data: Decompression model data.
+        :param gf: Gradient factor value, `gf_low` by default.
+
+        .. seealso:: :py:meth:`decotengu.model.ZH_L16_GF.ceiling_limit`
+        """
+        return self.leading_tissue(data, gf)[0]
+
+
+    def leading_tissue(self, data, gf=None):
+        """
+        Calculate pressure of ascent ceiling limit and find the leading
+        tissue compartment.
+
+        :param data: Decompression model data.
+        :param gf: Gradient factor value, `gf_low` by default.
+
+        .. seealso:: :py:meth:`decotengu.model.ZH_L16_GF.leading_tissue`
+        """
+        if gf is None:
+            gf = self.model.gf_low
+        limit = self.ceiling_stack(gf, np.asarray(data._tissues)[None])[0]
+        no = int(limit.argmax())
+        return float(limit[no]), no
+
+
+    def ceiling_stack(self, gf, stack):
+        """
+        Calculate pressure of ascent ceiling for each tissue compartment
+        for a stack of tissues gas loading.
+
+        The method returns array of shape `(n, 16)` with a pressure value
+        for each tissue compartment of each row of the stack. Use
+        `argmax` and `max` methods of the array to find leading tissue
+        compartments and ceiling limits of the rows.
+
+        :param gf: Gradient factor value or array of values - one per row
+            of the stack.
+        :param stack: Stack of tissues gas loading, see
+            :py:meth:`VectorCalculator.load_stack`.
+        """
+        n = len(stack)
+        gf = np.asarray(gf, dtype=self.dtype)
+        gf = gf.reshape(n, 1) if gf.ndim else gf
+        assert np.all(gf > 0) and np.all(gf <= 1.5)
+
+        shape = (n,) + self._gf_a.shape
+        tp = np.asarray(stack, dtype=self.dtype).reshape(shape)
+        p = tp[:, :, 0] + tp[:, :, 1]
+        a = (self._gf_a * tp).sum(axis=2) / p
+        b = (self._gf_b * tp).sum(axis=2) / p
+        return (p - a * gf) / (gf / b + 1 - gf)
+
+
+
+def vector_kernel(model, dtype=float):
+    """
+    Override decompression model methods, so it is possible to use
+    vectorized tissue calculator.
+
+    :param model: Decompression model.
+    :param dtype: Data type of arrays used for calculations.
+
+    .. seealso:: :py:mod:`decotengu.kernel`
+    """
+    calc = VectorCalculator(model, dtype)
+    model.load = calc.load
+    model.load_many = calc.load_many
+    model.gf_limit = calc.gf_limit
+    model.ceiling_limit = calc.ceiling_limit
+    model.leading_tissue = calc.leading_tissue
+
+
+def vector32_kernel(model):
+    """
+    Override decompression model methods, so it is possible to use
+    vectorized tissue calculator with single precision floats.
+
+    The tissues gas loading is stored with single precision floats as
+    well.
+
+    :param model: Decompression model.
+
+    .. seealso:: :py:mod:`decotengu.kernel`
+    """
+    if np is None:
+        raise ConfigError('NumPy is required by vectorized calculator')
+    vector_kernel(model, np.float32)
+    model.typecode = 'f'
+
+
+def vector_engine(engine):
+    """
+    Override DecoTengu engine object attributes and methods, so it is
+    possible to use vectorized tissue calculator.
+
+    :param engine: DecoTengu engine object.
+    """
+    vector_kernel(engine.model)
+
+
+# vim: sw=4:et:ai
@@ -0,0 +1,173 @@
+#
+# DecoTengu - dive decompression library.
+#
+# Copyright (C) 2013-2014 by Artur Wroblewski <wrobell@pld-linux.org>
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+
+"""
+Contingency Plans
+-----------------
+Dive briefing contains nominal dive plan and its contingency variants
+
+nominal
+    Nominal dive plan.
+deeper
+    Dive deeper than planned, i.e. by 5m.
+longer
+    Dive with bottom time longer than planned, i.e. by 5 minutes.
+lost gas
+    Ascent on bottom gas mix only, all decompression gas mixes are lost.
+    Calculated only if there are decompression gas mixes.
+bailout
+    Ascent on bailout gas mixes. Calculated only if bailout gas mix
+    configuration is specified.
+
+The descent and bottom part of the nominal dive are calculated once. The
+variants are forked from dive step at the end of descent (deeper variant)
+or from dive step at the end of bottom time (other variants), so only the
+rest of each variant dive is calculated. The variants can be calculated
+with a pool of processes.
+
+The decompression engine used to calculate the contingency plans is the
+template of the engines calculating the variants. See
+:py:mod:`decotengu.table` module documentation for the list of template
+engine parameters used to create the engines.
+
+Example
+~~~~~~~
+Calculate contingency plans of 40m dive on air with EAN50 decompression
+gas mix and EAN32 bailout
+
+    >>> import decotengu
+    >>> from decotengu.contingency import contingency
+    >>> engine = decotengu.create()
+    >>> engine.add_gas(0, 21)
+    >>> engine.add_gas(21, 50)
+    >>> plans = contingency(engine, 40, 25, bailout=((0, 32),))
+    >>> list(plans)
+    ['nominal', 'deeper', 'longer', 'lost gas', 'bailout']
+    >>> [plans[k].deco_table.total for k in plans]
+    [14.0, 21.0, 22.0, 25.0, 19.0]
+"""
+
+from collections import OrderedDict
+from multiprocessing import Pool
+
+from .engine import DecoTable, DivePlan
+from .error import EngineError
+from .table import engine_config, create_engine
+
+
+def contingency(
+        engine, depth, time, deeper=5, longer=5, bailout=None,
+        processes=1, setup=None):
+    """
+    Calculate nominal dive plan and its contingency variants.
+
+    The method returns ordered dictionary of dive plan summaries (see
+    :py:class:`decotengu.engine.DivePlan`) with variant names as keys.
+
+    The bailout gas mix configuration is a tuple of arguments of
+    :py:meth:`decotengu.Engine.add_gas` method calls, i.e.
+    `((0, 32), (21, 50))`.
+
+    If number of processes is one, then the calculation is performed in
+    current process.
+
+    :param engine: Template decompression engine.
+    :param depth: Maximum depth [m].
+    :param time: Dive bottom time [min].
+    :param deeper: Depth added to maximum depth by deeper variant [m].
+    :param longer: Time added to bottom time by longer variant [min].
+    :param bailout: Bailout gas mix configuration.
+    :param processes: Number of processes.
+    :param setup: Function called with each decompression engine
+        calculating a variant, i.e. to override engine methods.
+    """
+    engine._validate_gas_list(depth)
+    descent_gas_list, gas_list = engine._dive_gas_lists()
+
+    abs_p = engine._to_pressure(depth)
+    *_, descent = engine._dive_descent(abs_p, descent_gas_list)
+    if time <= descent.time:
+        raise EngineError('Bottom time shorter than descent time')
+    bottom = engine._step_next(descent, time - descent.time, gas_list[0])
+
+    config = engine_config(engine, setup)
+    gas = config.gas
+
+    variants = [
+        ('nominal', gas, bottom, 0, 0),
+        ('deeper', gas, descent, deeper, time),
+        ('longer', gas, bottom, 0, longer),
+    ]
+    if len(gas_list) > 1:
+        lost = tuple(m for m in gas if len(m) > 3)
+        lost += ((gas_list[0].depth, gas_list[0].o2, gas_list[0].he),)
+        variants.append(('lost gas', lost, bottom, 0, 0))
+    if bailout:
+        bailout = tuple(tuple(m) for m in bailout)
+        variants.append(('bailout', bailout, bottom, 0, 0))
+
+    units = [(name, config, mixes, step, d, t)
+        for name, mixes, step, d, t in variants]
+    if processes == 1:
+        results = map(_calculate_variant, units)
+        plans = OrderedDict(results)
+    else:
+        with Pool(processes=processes) as pool:
+            results = pool.map(_calculate_variant, units)
+        plans = OrderedDict(results)
+    return plans
+
+
+def _calculate_variant(unit):
+    """
+    Calculate contingency variant of a dive.
+
+    The variant is calculated from the forked dive step. If depth is
+    specified, then descent is continued by the depth and the dive step
+    is extended until the time. Otherwise, the dive step is extended by
+    the time.
+
+    Pair of variant name and dive plan summary is returned.
+
+    :param unit: Contingency variant to calculate.
+    """
+    name, config, gas, step, depth, time = unit
+    engine = create_engine(config, gas)
+
+    if depth:
+        abs_p = step.abs_p + engine._to_pressure(depth) \
+            - engine.surface_pressure
+        t = engine._pressure_to_time(abs_p - step.abs_p, engine.descent_rate)
+        step = engine._step_next_descent(step, t, step.gas)
+        time -= step.time
+        if time <= 0:
+            raise EngineError('Bottom time shorter than descent time')
+
+    bottom_gas = engine._gas_list[0]
+    if step.gas != bottom_gas:
+        step = engine._switch_gas(step, bottom_gas)
+
+    for step in engine.extend(step, time):
+        pass
+
+    plan = DivePlan(DecoTable(engine.deco_table), step.time, step.data)
+    return name, plan
+
+
+# vim: sw=4:et:ai
@@ -114,7 +114,7 @@ class Conveyor(object):
         """
         Execute original `Engine.calculate` method and expand dive steps.
         """
-        if __debug__:
+        if logger.isEnabledFor(logging.DEBUG):
             logger.debug('conveyor time delta {}'.format(self.time_delta))
 
         data = self.f_calc(*args, **kw)
@@ -139,11 +139,13 @@ class Conveyor(object):
                 f_step = self.engine._step_next_descent
 
             k, tr = self.trays(prev.time, end.time)
-            logger.debug(
-                'conveyor time {}min -> {}min, {}bar -> {}bar, steps {},' \
-                'rest {}'.format(
-                    prev.time, end.time, prev.abs_p, end.abs_p, k, tr
-                ))
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug(
+                    'conveyor time {}min -> {}min, {}bar -> {}bar, steps {},'
+                    ' rest {}'.format(
+                        prev.time, end.time, prev.abs_p, end.abs_p, k, tr
+                    )
+                )
             step = prev
             for i in range(k):
                 step = f_step(step, self.time_delta, end.gas)
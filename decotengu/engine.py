@@ -26,6 +26,7 @@ DecoTengu dive decompression engine.
 from collections import namedtuple, OrderedDict
 import math
 import operator
+import inspect
 import logging
 
 from .model import ZH_L16B_GF
@@ -33,6 +34,7 @@ from .error import ConfigError, EngineError
 from .ft import recurse_while, bisect_find
 from .flow import coroutine
 from . import const
+from . import trace
 
 logger = logging.getLogger(__name__)
 
@@ -98,6 +100,15 @@ Dive decompression stop information.
 :var time: Length of decompression stops [min].
 """
 
+DivePlan = namedtuple('DivePlan', 'deco_table time data')
+DivePlan.__doc__ = """
+Dive plan summary.
+
+:var deco_table: Decompression table of the dive.
+:var time: Total time of the dive (runtime) [min].
+:var data: Decompression model data at the end of the dive.
+"""
+
 
 class Engine(object):
     """
@@ -211,10 +222,13 @@ class Engine(object):
             Absolute pressure (depth) has to be deeper or at the same depth
             as absolute pressure of ceiling limit.
 
+        The ceiling limit is calculated with gradient factor value of
+        decompression model data.
+
         :param abs_p: Absolute pressure of current depth.
         :param data: Decompression model data.
         """
-        return abs_p >= self.model.ceiling_limit(data)
+        return abs_p >= self.model.ceiling_limit(data, data.gf)
 
 
     def _can_ascend(self, abs_p, time, data, gf=None):
@@ -228,23 +242,34 @@ class Engine(object):
         :param gf: Gradient factor to be used for ceiling check.
         """
         p = abs_p - self._time_to_pressure(time, self.ascent_rate)
-        return p >= self.model.ceiling_limit(data, gf=gf)
+        limit = self.model.ceiling_limit(data, gf=gf)
+        if trace.subscribers:
+            trace.emit(trace.CeilingCheck(p, limit, gf))
+        return p >= limit
 
 
-    def _step_start(self, abs_p, gas):
+    def _step_start(self, abs_p, gas, data=None):
         """
         Create the very first dive step.
 
         The first step is initialized with decompression data calculated
-        for surface.
+        for surface unless decompression model data is specified, i.e.
+        for repetitive dive. Gradient factor value of the specified
+        decompression model data is reset to gradient factor low
+        parameter, so decompression model data at the end of previous dive
+        (with gradient factor high value) can be used.
 
         The dive starting depth is usually surface, but any depth can be
         specified, i.e. when descent part of the dive is to be skipped.
 
         :param abs_p: Absolute pressure of dive starting depth.
         :param gas: Gas mix configuration.
+        :param data: Decompression model data at start of the dive.
         """
-        data = self.model.init(self.surface_pressure)
+        if data is None:
+            data = self.model.init(self.surface_pressure)
+        else:
+            data = data._replace(gf=self.model.gf_low)
         step = Step(Phase.START, abs_p, 0, gas, data)
         return step
 
@@ -349,12 +374,12 @@ class Engine(object):
         The switch results in new dive step.
         """
         step = step._replace(phase=Phase.GAS_SWITCH, gas=gas)
-        if __debug__:
-            logger.debug('switched to gas mix {} at {}'.format(gas, step))
+        if trace.subscribers:
+            trace.emit(trace.GasSwitch(step.abs_p, step.time, gas))
         return step
 
 
-    def _dive_descent(self, abs_p, gas_list):
+    def _dive_descent(self, abs_p, gas_list, data=None):
         """
         Dive descent from surface to absolute pressure of destination
         depth.
@@ -364,9 +389,10 @@ class Engine(object):
 
         :param abs_p: Absolute pressure of destination depth.
         :param gas_list: List of gas mixes - travel and bottom gas mixes.
+        :param data: Decompression model data at start of the dive.
         """
         gas = gas_list[0]
-        step = self._step_start(self.surface_pressure, gas)
+        step = self._step_start(self.surface_pressure, gas, data)
         yield step
 
         stages = self._descent_stages(abs_p, gas_list)
@@ -384,7 +410,8 @@ class Engine(object):
             step = self._switch_gas(step, last)
             yield step
 
-        logger.debug('descent finished at {:.4f}bar'.format(step.abs_p))
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug('descent finished at {:.4f}bar'.format(step.abs_p))
 
 
     def _dive_ascent(self, start, gas_list):
@@ -452,10 +479,10 @@ class Engine(object):
         limit = self.model.ceiling_limit(step.data, gf)
         if step.abs_p < limit:
             step = None
-            if __debug__:
+            if logger.isEnabledFor(logging.DEBUG):
                 logger.debug('deco dive')
         else:
-            if __debug__:
+            if logger.isEnabledFor(logging.DEBUG):
                 logger.debug('ndl dive')
         return step
 
@@ -491,28 +518,21 @@ class Engine(object):
 
         step = start
         limit = model.ceiling_limit(step.data, step.data.gf)
+        if trace.subscribers:
+            trace.emit(trace.CeilingCheck(step.abs_p, limit, step.data.gf))
         limit = self._ceil_pressure_3m(limit)
         limit = max(abs_p, limit)
         t = self._pressure_to_time(step.abs_p - limit, self.ascent_rate)
 
-        if __debug__:
-            logger.debug(
-                'find first stop: check ascent from {}bar by {}min to {}bar (start)'
-                .format(step.abs_p, t, limit)
-            )
         while step.abs_p > limit and step.abs_p > abs_p:
             step = self._step_next_ascent(step, t, gas)
             limit = model.ceiling_limit(step.data, step.data.gf)
+            if trace.subscribers:
+                trace.emit(trace.CeilingCheck(step.abs_p, limit, step.data.gf))
             limit = self._ceil_pressure_3m(limit)
             limit = max(abs_p, limit)
             t = self._pressure_to_time(step.abs_p - limit, self.ascent_rate)
 
-            if __debug__:
-                logger.debug(
-                    'find first stop: check ascent from {}bar by {}min to {}bar'
-                    .format(step.abs_p, t, limit)
-                )
-
         stop = step
 
         if __debug__:
@@ -522,6 +542,7 @@ class Engine(object):
                 'Invalid first stop depth pressure {}bar ({}m)' \
                 .format(stop.abs_p, depth)
 
+        if logger.isEnabledFor(logging.DEBUG):
             if start is stop:
                 logger.debug('find first stop: at first deco stop already')
             elif stop.abs_p > abs_p:
@@ -529,7 +550,8 @@ class Engine(object):
                 logger.debug(
                     'find first stop: found at {}m ({}bar), ascent time={},'
                     ' limit={}'.format(
-                        depth, stop.abs_p, stop.time - start.time, limit
+                        self._to_depth(stop.abs_p), stop.abs_p,
+                        stop.time - start.time, limit
                     )
                 )
             else:
@@ -711,7 +733,6 @@ class Engine(object):
         :param gas: Gas to switch to.
         """
         gp = self._to_pressure(gas.depth)
-        logger.debug('ascent gas switch to {} at {}bar'.format(gas, step.abs_p))
         assert step.abs_p - gp < self._p3m
         if abs(step.abs_p - gp) < const.EPSILON:
             steps = (self._switch_gas(step, gas),)
@@ -742,19 +763,26 @@ class Engine(object):
         """
         step = start
         for depth, gas in stages:
+            # gas mix switch depth is rounded up to multiply of 3m, so
+            # ascent stage might be not shallower than starting dive step
+            if step.abs_p - depth < const.EPSILON:
+                continue
+
             if step.gas != gas: # first step might not need gas switch
                 # if gas switch drives us into deco zone, then stop ascent
                 # leaving `step` as first decompression stop
-                if __debug__:
-                    logger.debug('attempt to switch gas {} at {}'.format(gas, step))
+                if logger.isEnabledFor(logging.DEBUG):
+                    logger.debug(
+                        'attempt to switch gas {} at {}'.format(gas, step)
+                    )
                 gs_steps = self._ascent_switch_gas(step, gas)
                 if self._inv_limit(gs_steps[-1].abs_p, gs_steps[-1].data):
                     step = gs_steps[-1]
                     yield from gs_steps
-                    if __debug__:
+                    if logger.isEnabledFor(logging.DEBUG):
                         logger.debug('gas switch performed')
                 else:
-                    if __debug__:
+                    if logger.isEnabledFor(logging.DEBUG):
                         logger.debug('gas switch into deco zone, revert')
                     break
 
@@ -788,18 +816,29 @@ class Engine(object):
         bottom_gas = self._gas_list[0]
         stages = self._deco_stops(start, stages)
         step = start
+        hint = None
+        predict = _accepts_hint(self._deco_stop)
         for depth, gas, time, gf in stages:
             # switch gas
-            if step.abs_p >= self._to_pressure(gas.depth) and gas != bottom_gas:
+            if step.abs_p >= self._to_pressure(gas.depth) \
+                    and gas != bottom_gas and gas != step.gas:
                 for step in self._ascent_switch_gas(step, gas):
                     yield step
 
-            # execute deco stop
-            end = self._deco_stop(step, time, gas, gf)
+            # execute deco stop; decompression stops usually get longer
+            # towards the surface, so length of previous stop is used as
+            # predicted length of the stop unless deco stop calculation
+            # override does not accept the prediction
+            if hint is None:
+                end = self._deco_stop(step, time, gas, gf)
+            else:
+                end = self._deco_stop(step, time, gas, gf, hint=hint)
             self.deco_table.append(
                 self._to_depth(step.abs_p),
                 end.time - step.time
             )
+            if predict:
+                hint = round(end.time - step.time)
             step = end
             yield step
 
@@ -807,8 +846,10 @@ class Engine(object):
             step = self._step_next_ascent(step, time, gas, gf=gf)
             yield step
 
-        if __debug__:
-            logger.debug('deco engine: gf at surface={:.4f}'.format(step.data.gf))
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug(
+                'deco engine: gf at surface={:.4f}'.format(step.data.gf)
+            )
 
 
     def _deco_stops(self, step, stages):
@@ -829,12 +870,17 @@ class Engine(object):
 
         .. seealso:: :func:`decotengu.Engine._deco_ascent_stages`
         """
+        # gradient factor value of first decompression stop of an ascent
+        # is gradient factor low parameter unless the ascent starts
+        # between decompression stops (i.e. live dive), so gradient
+        # factor slope is anchored at the first decompression stop of
+        # the dive and gradient factor high is reached at the surface
+        gf = step.data.gf
         k = self._n_stops(step.abs_p)
-        gf_step = (self.model.gf_high - self.model.gf_low) / k
+        gf_step = (self.model.gf_high - gf) / k
         ts_3m = self._pressure_to_time(self._p3m, self.ascent_rate)
-        gf = step.data.gf
 
-        if __debug__:
+        if logger.isEnabledFor(logging.DEBUG):
             logger.debug('deco engine: gf step={:.4}'.format(gf_step))
 
         abs_p = step.abs_p
@@ -853,7 +899,7 @@ class Engine(object):
             abs_p = depth
 
 
-    def _deco_stop(self, step, next_time, gas, gf):
+    def _deco_stop(self, step, next_time, gas, gf, hint=None):
         """
         Calculate decompression stop.
 
@@ -861,27 +907,75 @@ class Engine(object):
         next decompression stop - the current decompression stop lasts
         until it is allowed to ascent to next stop.
 
+        The predicted length of decompression stop is usually length of
+        previous decompression stop. If the prediction is given, then
+        ascent is checked at the predicted length first. If ascent is not
+        possible, then the search is continued after the predicted length.
+        Otherwise, ascent is checked a minute before the predicted length
+        and the full search is performed if ascent is possible.
+
         :param step: Start of current decompression stop.
         :param next_time: Time required to ascent to next deco stop [min].
         :param gas: Gas mix configuration.
         :param gf: Gradient factor value of next decompression stop.
+        :param hint: Predicted length of decompression stop [min].
         """
         if __debug__:
             depth = self._to_depth(step.abs_p)
-            logger.debug('deco stop: calculate at {}m'.format(depth))
             assert depth % 3 == 0 and depth > 0, depth
 
+        stay = self._deco_stop_probe
+        if hint is not None and hint > const.MINUTE:
+            data = self._tissue_pressure_const(step.abs_p, hint, gas, step.data)
+            if stay(step, hint, next_time, data, gf):
+                return self._deco_stop_search(
+                    step, next_time, gas, gf, hint, data
+                )
+
+            time = hint - const.MINUTE
+            prev = self._tissue_pressure_const(
+                step.abs_p, time, gas, step.data
+            )
+            if stay(step, time, next_time, prev, gf):
+                return Step(
+                    Phase.DECO_STOP, step.abs_p, step.time + hint, gas, data
+                )
+
         # there are a lot of 1 minute deco stops, so check if we can ascend
         # after 1 minute first; otherwise continue searching for the
         # decompression stop length
         data = self._tissue_pressure_const(
             step.abs_p, const.MINUTE, gas, step.data
         )
-        if self._can_ascend(step.abs_p, next_time, data, gf):
+        if not stay(step, const.MINUTE, next_time, data, gf):
             return Step(
                 Phase.DECO_STOP, step.abs_p, step.time + const.MINUTE, gas, data
             )
 
+        return self._deco_stop_search(
+            step, next_time, gas, gf, const.MINUTE, data
+        )
+
+
+    def _deco_stop_search(self, step, next_time, gas, gf, time, data):
+        """
+        Search for length of decompression stop.
+
+        The search starts at specified time of decompression stop, when
+        ascent to next decompression stop is not possible yet. The length
+        of decompression stop is searched linearly using
+        `_deco_stop_search_time` time step, then binary search is
+        performed within the last time step.
+
+        :param step: Start of current decompression stop.
+        :param next_time: Time required to ascent to next deco stop [min].
+        :param gas: Gas mix configuration.
+        :param gf: Gradient factor value of next decompression stop.
+        :param time: Time of decompression stop, when ascent is not
+            possible [min].
+        :param data: Decompression model data at the time of
+            decompression stop.
+        """
         max_time = self._deco_stop_search_time
         # next_f(arg=(time, data)): (time, data) <- track both time and deco
         # data
@@ -890,22 +984,17 @@ class Engine(object):
             self._tissue_pressure_const(step.abs_p, max_time, gas, data)
         )
         inv_f = lambda time, data: \
-            not self._can_ascend(step.abs_p, next_time, data, gf)
-
-        time, data = recurse_while(inv_f, next_f, const.MINUTE, data)
+            self._deco_stop_probe(step, time, next_time, data, gf)
 
-        if __debug__:
-            logger.debug(
-                'deco stop: linear find finished after {}min'.format(time)
-            )
-            logger.debug('deco stop: deco data {}'.format(data))
+        time, data = recurse_while(inv_f, next_f, time, data)
 
         # start with `data` returned by `recurse_while`, so no need to add
         # `time`
         next_f = lambda k: self._tissue_pressure_const(step.abs_p, k, gas, data)
         # should we stay at deco stop?
-        exec_deco_stop = lambda k: \
-            not self._can_ascend(step.abs_p, next_time, next_f(k), gf)
+        exec_deco_stop = lambda k: self._deco_stop_probe(
+            step, time + k, next_time, next_f(k), gf
+        )
 
         # ascent is possible after self._deco_stop_search_time, so
         # check for self._deco_stop_search_time - 1
@@ -917,18 +1006,32 @@ class Engine(object):
         # final time of a deco stop
         time = time + k
 
-        if __debug__:
-            logger.debug(
-                'deco stop: search completed {}bar, {}min, n2={.n2}%,'
-                ' gf={:.4}, next gf={:.4}'.format(
-                    step.abs_p, time, gas, step.data.gf, gf
-                ))
-            assert time % 1 == 0 and time > 0, time
+        assert time % 1 == 0 and time > 0, time
+        if trace.subscribers:
+            trace.emit(trace.StopSearch(step.abs_p, time, gas, gf))
 
         step = self._step_next(step, time, gas, phase=Phase.DECO_STOP)
         return step
 
 
+    def _deco_stop_probe(self, step, time, next_time, data, gf):
+        """
+        Check if diver has to stay at decompression stop after specified
+        length of the decompression stop.
+
+        :param step: Start of current decompression stop.
+        :param time: Probed length of decompression stop [min].
+        :param next_time: Time required to ascent to next deco stop [min].
+        :param data: Decompression model data after the probed length of
+            decompression stop.
+        :param gf: Gradient factor value of next decompression stop.
+        """
+        stay = not self._can_ascend(step.abs_p, next_time, data, gf)
+        if trace.subscribers:
+            trace.emit(trace.StopProbe(step.abs_p, time, gf, stay))
+        return stay
+
+
     def add_gas(self, depth, o2, he=0, travel=False):
         """
         Add gas mix to the gas mix list.
@@ -952,7 +1055,7 @@ class Engine(object):
             self._gas_list.append(GasMix(depth, o2, 100 - o2 - he, he))
 
 
-    def calculate(self, depth, time, descent=True):
+    def calculate(self, depth, time, descent=True, data=None):
         """
         Start dive profile calculation for specified dive depth and bottom
         time.
@@ -963,40 +1066,81 @@ class Engine(object):
         :func:`decotengu.engine.Engine._validate_gas_list` method
         documentation for the list of gas mix list rules.
 
+        The dive starts with tissues saturated at the surface unless
+        decompression model data is specified, i.e. decompression model
+        data at the end of previous dive after surface interval (see
+        :func:`decotengu.Engine.surface_interval`).
+
         :param depth: Maximum depth [m].
         :param time: Dive bottom time [min].
         :param descent: Skip descent part of a dive if set to false.
+        :param data: Decompression model data at start of the dive.
 
         .. seealso:: :func:`decotengu.Engine._validate_gas_list`
         .. seealso:: :func:`decotengu.Engine.add_gas`
         """
+        yield from self._dive(depth, time, descent, data)
+
+
+    def plan(self, depth, time, descent=True, data=None):
+        """
+        Calculate decompression table of a dive for specified dive depth
+        and bottom time.
+
+        The method returns dive plan summary - decompression table, total
+        time of the dive and decompression model data at the end of the
+        dive.
+
+        This is a convenience method. The dive is calculated in the same
+        way as with :func:`decotengu.Engine.calculate` method, but the dive
+        steps are not returned, therefore they are not processed with the
+        decompression model validator nor the conveyor. The method is not
+        faster than exhausting the dive steps iterator of decompression
+        engine created without decompression model validator.
+
+        :param depth: Maximum depth [m].
+        :param time: Dive bottom time [min].
+        :param descent: Skip descent part of a dive if set to false.
+        :param data: Decompression model data at start of the dive.
+
+        .. seealso:: :func:`decotengu.Engine.calculate`
+        """
+        for step in self._dive(depth, time, descent, data):
+            pass
+        return DivePlan(DecoTable(self.deco_table), step.time, step.data)
+
+
+    def _dive(self, depth, time, descent=True, data=None):
+        """
+        Calculate dive profile for specified dive depth and bottom time.
+
+        The method returns an iterator of dive steps.
+
+        :param depth: Maximum depth [m].
+        :param time: Dive bottom time [min].
+        :param descent: Skip descent part of a dive if set to false.
+        :param data: Decompression model data at start of the dive.
+
+        .. seealso:: :func:`decotengu.Engine.calculate`
+        """
         del self.deco_table[:]
         self._validate_gas_list(depth)
-
-        # prepare travel and bottom gas mixes
-        depth_key = operator.attrgetter('depth')
-        bottom_gas = self._gas_list[0]
-        gas_list = sorted(self._travel_gas_list, key=depth_key)
-        gas_list.append(bottom_gas)
+        descent_gas_list, gas_list = self._dive_gas_lists()
+        bottom_gas = gas_list[0]
 
         abs_p = self._to_pressure(depth)
         if descent:
-            for step in self._dive_descent(abs_p, gas_list):
+            for step in self._dive_descent(abs_p, descent_gas_list, data):
                 yield step
         else:
-            step = self._step_start(abs_p, bottom_gas)
+            step = self._step_start(abs_p, bottom_gas, data)
             yield step
 
-        # prepare decompression gases, first gas mix is assumed to be
-        # bottom gas mix
-        gas_list = sorted(self._gas_list[1:], key=depth_key, reverse=True)
-        gas_list.insert(0, bottom_gas)
-
         t = time - step.time
         if t <= 0:
             raise EngineError('Bottom time shorter than descent time')
 
-        if __debug__:
+        if logger.isEnabledFor(logging.DEBUG):
             logger.debug(
                 'bottom time {}min (descent is {}min)'.format(t, step.time)
             )
@@ -1007,6 +1151,225 @@ class Engine(object):
         yield from self._dive_ascent(step, gas_list)
 
 
+    def surface_interval(self, data, time):
+        """
+        Calculate decompression model data after surface interval.
+
+        The tissues off-gas at the surface while diver breathes air. The
+        gas loading is calculated with single step of the decompression
+        model, so long surface interval costs the same as short one. The
+        air has the same nitrogen fraction as used to initialize the
+        decompression model, therefore after long enough surface interval
+        the tissues are saturated at the surface as at the start of the
+        very first dive.
+
+        The gradient factor of returned decompression model data is reset
+        to the gradient factor low value.
+
+        :param data: Decompression model data at the end of a dive.
+        :param time: Surface interval time [min].
+
+        .. seealso:: :func:`decotengu.Engine.plan_series`
+        """
+        if time < 0:
+            raise EngineError('Negative surface interval time')
+
+        if time > 0:
+            n2 = self.model.START_P_N2 * 100
+            air = GasMix(0, 100 - n2, n2, 0)
+            data = self.model.load(self.surface_pressure, time, air, 0, data)
+        return data._replace(gf=self.model.gf_low)
+
+
+    def plan_series(self, dives, data=None):
+        """
+        Calculate dive plan summaries of a series of repetitive dives.
+
+        The series is a collection of `(interval, depth, time)` tuples -
+        surface interval before a dive [min], maximum depth [m] and dive
+        bottom time [min]. Decompression model data at the end of a dive
+        is carried through the surface interval into the next dive, see
+        :func:`decotengu.Engine.surface_interval`. The surface interval
+        of the first dive is applied to the decompression model data
+        specified with `data` parameter or is ignored if the data is not
+        specified.
+
+        The method returns list of dive plan summaries, one per dive. The
+        same gas mix configuration is used for all dives of the series.
+
+        :param dives: Collection of `(interval, depth, time)` tuples.
+        :param data: Decompression model data before the first dive.
+
+        .. seealso:: :func:`decotengu.Engine.plan`
+        """
+        plans = []
+        for interval, depth, time in dives:
+            if data is not None:
+                data = self.surface_interval(data, interval)
+            plan = self.plan(depth, time, data=data)
+            plans.append(plan)
+            data = plan.data
+        return plans
+
+
+    def calculate_many(self, grid, descent=True):
+        """
+        Calculate decompression tables for a grid of dive depths and
+        bottom times.
+
+        The method returns ordered dictionary of decompression tables with
+        `(depth, time)` pairs as keys. The dictionary is sorted by depth
+        and bottom time.
+
+        The descent to each depth is calculated once. The bottom part of
+        a dive is calculated by extending bottom part of previous dive to
+        the same depth with shorter bottom time, so the tissues are loaded
+        with inert gas only for the time difference. Only ascent is
+        calculated separately for each dive.
+
+        Dive steps are not returned, therefore they are not processed with
+        the decompression model validator nor the conveyor.
+
+        :param grid: Collection of `(depth, time)` pairs - maximum depth
+            [m] and dive bottom time [min].
+        :param descent: Skip descent part of a dive if set to false.
+
+        .. seealso:: :func:`decotengu.Engine.calculate`
+        .. seealso:: :func:`decotengu.Engine.extend`
+        """
+        tables = OrderedDict()
+        for depth, time in sorted(set(grid)):
+            tables[depth, time] = None
+
+        dives = OrderedDict()
+        for depth, time in tables:
+            dives.setdefault(depth, []).append(time)
+
+        for depth, times in dives.items():
+            self._validate_gas_list(depth)
+            descent_gas_list, gas_list = self._dive_gas_lists()
+
+            abs_p = self._to_pressure(depth)
+            if descent:
+                *_, step = self._dive_descent(abs_p, descent_gas_list)
+            else:
+                step = self._step_start(abs_p, gas_list[0])
+
+            if times[0] <= step.time:
+                raise EngineError('Bottom time shorter than descent time')
+
+            for time in times:
+                steps = self.extend(step, time - step.time)
+                step = next(steps)
+                for _ in steps:
+                    pass
+                tables[depth, time] = DecoTable(self.deco_table)
+
+                if logger.isEnabledFor(logging.DEBUG):
+                    logger.debug(
+                        'calculated {}m {}min dive, deco {}min'.format(
+                            depth, time, self.deco_table.total
+                        )
+                    )
+
+        return tables
+
+
+    def extend(self, step, time):
+        """
+        Continue dive at depth of bottom dive step for specified amount of
+        time and calculate ascent to the surface.
+
+        The method returns an iterator of dive steps. If time is greater
+        than zero, then the first dive step is the bottom dive step
+        extended by the time. Descent and bottom part of the dive are not
+        recalculated, therefore a bottom dive step can be saved and
+        extended multiple times, i.e. to prepare decompression tables for
+        5, 10, 15 minutes longer bottom time.
+
+        After the iterator is exhausted, the decompression table of the
+        dive is available with `deco_table` attribute.
+
+        Dive steps are not processed with the decompression model validator
+        nor the conveyor.
+
+        :param step: Dive step at the end of the bottom part of a dive.
+        :param time: Additional bottom time [min].
+
+        .. seealso:: :func:`decotengu.Engine.calculate`
+        """
+        if time < 0:
+            raise EngineError('Negative additional bottom time')
+
+        del self.deco_table[:]
+        self._validate_gas_list(self._to_depth(step.abs_p))
+        _, gas_list = self._dive_gas_lists()
+
+        if time > 0:
+            step = self._step_next(step, time, gas_list[0])
+            yield step
+
+        yield from self._dive_ascent(step, gas_list)
+
+
+    def live(self, cache=False):
+        """
+        Start live dive, which is fed with depth samples of a dive in
+        progress.
+
+        The method returns live dive object starting at the surface.
+
+        :param cache: Use time to surface cache if true (see
+            :py:class:`decotengu.live.TTSCache`).
+
+        .. seealso:: :py:class:`decotengu.live.LiveDive`
+        """
+        from .live import LiveDive
+        mixes = self._gas_list + self._travel_gas_list
+        self._validate_gas_list(max((m.depth for m in mixes), default=0))
+        return LiveDive(self, cache=cache)
+
+
+    def _dive_gas_lists(self):
+        """
+        Prepare gas mix lists for descent and ascent.
+
+        Pair of lists is returned
+
+        - travel and bottom gas mixes sorted by switch depth, the last gas
+          mix is bottom gas mix
+        - bottom and decompression gas mixes sorted by switch depth in
+          reverse order, the first gas mix is bottom gas mix
+        """
+        depth_key = operator.attrgetter('depth')
+        bottom_gas = self._gas_list[0]
+
+        # prepare travel and bottom gas mixes
+        descent_gas_list = sorted(self._travel_gas_list, key=depth_key)
+        descent_gas_list.append(bottom_gas)
+
+        # prepare decompression gases, first gas mix is assumed to be
+        # bottom gas mix
+        gas_list = sorted(self._gas_list[1:], key=depth_key, reverse=True)
+        gas_list.insert(0, bottom_gas)
+
+        return descent_gas_list, gas_list
+
+
+
+def _accepts_hint(f):
+    """
+    Check if decompression stop calculation function accepts predicted
+    length of decompression stop with `hint` parameter.
+
+    :param f: Decompression stop calculation function.
+
+    .. seealso:: :func:`decotengu.Engine._deco_stop`
+    """
+    params = inspect.signature(f).parameters.values()
+    return any(p.name == 'hint' or p.kind == p.VAR_KEYWORD for p in params)
+
+
 
 class DecoTable(list):
     """
@@ -1033,7 +1396,7 @@ class DecoTable(list):
         :param depth: Depth of decompression stop [m].
         :param time: Time of decompression stop [min].
         """
-        if __debug__:
+        if logger.isEnabledFor(logging.DEBUG):
             logger.debug(
                 'deco table: adding {}m {}min stop'.format(depth, time)
             )
@@ -1045,7 +1408,7 @@ class DecoTable(list):
         assert stop.depth > 0
 
         super().append(stop)
-        if __debug__:
+        if logger.isEnabledFor(logging.DEBUG):
             logger.debug('deco table: added {}'.format(stop))
 
 
@@ -17,9 +17,7 @@
 # along with this program.  If not, see <http://www.gnu.org/licenses/>.
 #
 
-import logging
-
-logger = logging.getLogger(__name__)
+from . import trace
 
 
 def recurse_while(predicate, f, *args):
@@ -42,8 +40,8 @@ def recurse_while(predicate, f, *args):
         result = f(*args)
         result = result if type(result) == tuple else (result, )
 
-        if __debug__:
-            logger.debug('next result: {}'.format(result))
+        if trace.subscribers:
+            trace.emit(trace.RecurseStep(result))
 
     return args if len(args) > 1 else args[0]
 
@@ -62,15 +60,13 @@ def bisect_find(n, f, *args, **kw):
     """
     lo = 1
     hi = n + 1
-    if __debug__:
-        logger.debug('bisect n: {}'.format(n))
 
     while lo < hi:
         k = (lo + hi) // 2
 
-        if __debug__:
-            logger.debug('bisect range: {} <= {} <= {}'.format(lo, k, hi))
-            assert lo <= k <= hi, 'bisect range: {} <= {} <= {}'.format(lo, k, hi)
+        assert lo <= k <= hi, 'bisect range: {} <= {} <= {}'.format(lo, k, hi)
+        if trace.subscribers:
+            trace.emit(trace.BisectProbe(lo, k, hi))
 
         if f(k, *args, **kw):
             lo = k + 1
@@ -0,0 +1,383 @@
+#
+# DecoTengu - dive decompression library.
+#
+# Copyright (C) 2013-2014 by Artur Wroblewski <wrobell@pld-linux.org>
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+
+"""
+Numeric Kernels
+---------------
+The numeric kernel of decompression model is the implementation of
+tissue compartments loading with inert gas and calculation of ascent
+ceiling limit, i.e. :py:meth:`decotengu.model.ZH_L16_GF.load` and
+:py:meth:`decotengu.model.ZH_L16_GF.gf_limit` methods.
+
+DecoTengu provides the following numeric kernels
+
+python
+    Default, pure Python implementation.
+tab
+    Tabular calculator, see :ref:`tab-calc`. The kernel can be used only
+    with time values, which are multiples of 6 seconds.
+decimal
+    Calculations performed with decimal numbers of high precision, see
+    :py:class:`decotengu.alt.decimal.DecimalKernel`.
+vector
+    Vectorized calculator, see :ref:`vector-calc` (requires NumPy).
+float32
+    Pure Python implementation storing tissues gas loading with single
+    precision floats.
+vector32
+    Vectorized calculator using single precision floats for calculations
+    and for storage of tissues gas loading (requires NumPy).
+
+Single Precision Floats
+~~~~~~~~~~~~~~~~~~~~~~~
+The `float32` and `vector32` numeric kernels halve the memory required to
+store tissues gas loading of dive steps, which is useful when large
+number of dive profiles is calculated, i.e. for bulk decompression table
+generation.
+
+The single precision floats have about 7 significant digits, so results
+of calculations are not the same as results of default kernel. The
+numeric kernels are never selected with
+:py:func:`decotengu.kernel.select_kernel` function unless the tolerance
+is increased. The script ``scripts/dt-precision`` reports accuracy of the
+kernels for reference dive profiles used by DecoTengu integration tests,
+so it can be decided if the kernels are safe for given use case.
+
+The numeric kernel is set with :py:func:`decotengu.kernel.set_kernel`
+function or with :py:meth:`decotengu.model.ZH_L16_GF.set_kernel` method.
+
+The fastest numeric kernel depends on the hardware and software
+environment, i.e. vectorized calculator is fast when NumPy is available
+and tabular calculator can be faster when exponential function is
+expensive on a given hardware. The :py:func:`decotengu.kernel.select_kernel`
+function executes micro-benchmark of all registered numeric kernels and
+sets the fastest kernel, which results are the same as results of the pure
+Python kernel (within specified tolerance). Time values of the benchmark
+are multiples of 6 seconds, so every numeric kernel is benchmarked with
+the same workload. After the benchmark, the accuracy of a kernel is
+checked for descent and ascent by 1m with descent and ascent rates of
+decompression engine, i.e. tabular calculator is accepted only for the
+rates of 10m/min, so the selection should be performed after configuring
+decompression engine.
+
+Example
+~~~~~~~
+Create decompression engine and select the fastest numeric kernel
+
+    >>> import decotengu
+    >>> from decotengu.kernel import select_kernel
+    >>> engine = decotengu.create()
+    >>> engine.add_gas(0, 21)
+    >>> name = select_kernel(engine)
+    >>> engine.model.kernel == name
+    True
+
+Numeric kernel can be selected when creating decompression engine as well
+
+    >>> engine = decotengu.create(kernel='auto')
+    >>> engine.model.kernel in KERNELS
+    True
+"""
+
+from collections import OrderedDict
+import logging
+import math
+import time
+
+from .engine import GasMix
+from .error import ConfigError
+from .alt.tab import tab_kernel
+from .alt.decimal import decimal_kernel
+from . import const
+
+logger = logging.getLogger(__name__)
+
+# maximum absolute difference between results of a kernel and results of
+# pure Python kernel
+KERNEL_TOLERANCE = 1e-8
+
+# decompression model attributes, which can be overriden by a kernel
+KERNEL_ATTRS = (
+    'load', 'load_many', 'gf_limit', 'ceiling_limit', 'leading_tissue',
+    '_exp',
+)
+
+
+def python_kernel(model):
+    """
+    Reset decompression model to use pure Python numeric kernel.
+
+    :param model: Decompression model.
+    """
+    for attr in KERNEL_ATTRS:
+        model.__dict__.pop(attr, None)
+    model._exp_cache.clear()
+    model._load_plans.clear()
+    model.typecode = 'd'
+
+
+def float32_kernel(model):
+    """
+    Override decompression model, so tissues gas loading is stored with
+    single precision floats.
+
+    :param model: Decompression model.
+    """
+    model.typecode = 'f'
+
+
+def vector_kernel(model):
+    """
+    Override decompression model to use vectorized numeric kernel.
+
+    The vectorized calculator module is imported on first use, so NumPy
+    is not imported with DecoTengu unless the kernel is used.
+
+    :param model: Decompression model.
+
+    .. seealso:: :py:func:`decotengu.alt.vector.vector_kernel`
+    """
+    from .alt.vector import vector_kernel
+    vector_kernel(model)
+
+
+def vector32_kernel(model):
+    """
+    Override decompression model to use vectorized numeric kernel with
+    single precision floats.
+
+    The vectorized calculator module is imported on first use, see
+    :py:func:`decotengu.kernel.vector_kernel`.
+
+    :param model: Decompression model.
+
+    .. seealso:: :py:func:`decotengu.alt.vector.vector32_kernel`
+    """
+    from .alt.vector import vector32_kernel
+    vector32_kernel(model)
+
+
+KERNELS = OrderedDict((
+    ('python', python_kernel),
+    ('tab', tab_kernel),
+    ('decimal', decimal_kernel),
+    ('vector', vector_kernel),
+    ('float32', float32_kernel),
+    ('vector32', vector32_kernel),
+))
+
+
+def register_kernel(name, kernel):
+    """
+    Register numeric kernel.
+
+    The numeric kernel is a callable, which accepts decompression model as
+    its parameter and overrides decompression model attributes and
+    methods. It shall raise :py:exc:`decotengu.error.ConfigError` if the
+    kernel cannot be used, i.e. due to missing library.
+
+    :param name: Name of numeric kernel.
+    :param kernel: Numeric kernel callable.
+    """
+    KERNELS[name] = kernel
+
+
+def set_kernel(model, name):
+    """
+    Set numeric kernel of decompression model.
+
+    Decompression model is reset to use pure Python kernel first, so
+    numeric kernels are not combined.
+
+    :param model: Decompression model.
+    :param name: Name of numeric kernel.
+    """
+    if name not in KERNELS:
+        raise ConfigError('Unknown numeric kernel: {}'.format(name))
+
+    python_kernel(model)
+    model.kernel = 'python'
+    KERNELS[name](model)
+    model.kernel = name
+
+
+def select_kernel(engine, names=None, tolerance=KERNEL_TOLERANCE, number=10):
+    """
+    Select the fastest numeric kernel for decompression model of
+    decompression engine.
+
+    The numeric kernels are benchmarked with tissue compartments loading
+    and ascent ceiling limit calculations. A kernel is accepted if it can
+    be used and its results are within tolerance of the results of pure
+    Python kernel. The results are checked for the benchmark workload
+    and then for descent and ascent by 1m with engine descent and ascent
+    rates.
+
+    The fastest, accepted kernel is set for decompression model of the
+    engine and its name is returned.
+
+    :param engine: DecoTengu decompression engine.
+    :param names: Names of numeric kernels to benchmark, all registered
+        kernels by default.
+    :param tolerance: Maximum absolute difference between results of a
+        kernel and results of pure Python kernel.
+    :param number: Number of benchmark runs for each kernel.
+
+    :raises ConfigError: If no numeric kernel is accepted.
+    """
+    if names is None:
+        names = list(KERNELS)
+
+    model = type(engine.model)()
+    workload = _workload(engine)
+    rates = _rate_workload(engine)
+    set_kernel(model, 'python')
+    expected = _run(model, workload)
+    expected_rates = _run(model, rates)
+
+    timings = OrderedDict()
+    for name in names:
+        try:
+            set_kernel(model, name)
+            result = _run(model, workload)
+        except (ConfigError, AssertionError, ArithmeticError) as ex:
+            logger.debug('kernel {}: not available ({!r})'.format(name, ex))
+            continue
+
+        error = max(abs(v1 - v2) for v1, v2 in zip(expected, result))
+        if error > tolerance:
+            logger.debug(
+                'kernel {}: rejected, error {}'.format(name, error)
+            )
+            continue
+
+        t = []
+        for i in range(number):
+            t0 = time.perf_counter()
+            _run(model, workload)
+            t.append(time.perf_counter() - t0)
+
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug(
+                'kernel {}: {:.6f}s, error {}'.format(name, min(t), error)
+            )
+
+        try:
+            result = _run(model, rates)
+            error = max(abs(v1 - v2) for v1, v2 in zip(expected_rates, result))
+        except (AssertionError, ArithmeticError):
+            error = math.inf
+        if error > tolerance:
+            logger.debug(
+                'kernel {}: rejected, not accurate for engine descent and'
+                ' ascent rates'.format(name)
+            )
+            continue
+
+        timings[name] = min(t)
+
+    if not timings:
+        raise ConfigError('No numeric kernel available')
+
+    name = min(timings, key=timings.get)
+    set_kernel(engine.model, name)
+    logger.info('numeric kernel selected: {}'.format(name))
+    return name
+
+
+def _workload(engine):
+    """
+    Create workload of numeric kernel benchmark.
+
+    The workload is list of tissue compartments loading operations - for
+    each operation absolute pressure, time, gas mix and pressure rate
+    change are specified. The workload simulates short dives using engine
+    descent and ascent rates. The time values are rounded up to multiples
+    of 6 seconds, so the workload can be executed by every numeric kernel
+    (see tabular calculator), and the rates are adjusted to the rounded
+    time values.
+
+    :param engine: DecoTengu decompression engine.
+    """
+    # round up to multiply of 6s (0.1min)
+    to_6s = lambda t: math.ceil(round(t * 10, 6)) / 10
+
+    t_3m = to_6s(engine._pressure_to_time(engine._p3m, engine.ascent_rate))
+    ascent_rate = -engine._p3m / t_3m
+    gases = GasMix(0, 21, 79, 0), GasMix(0, 18, 37, 45)
+
+    workload = []
+    for gas in gases:
+        for depth in (15, 30, 60):
+            abs_p = engine._to_pressure(depth)
+            dp = abs_p - engine.surface_pressure
+            t = to_6s(engine._pressure_to_time(dp, engine.descent_rate))
+            workload.append((engine.surface_pressure, t, gas, dp / t))
+            workload.append((abs_p, 20, gas, 0))
+            workload.append((abs_p, t_3m, gas, ascent_rate))
+            abs_p = abs_p - engine._p3m
+            workload.append((abs_p, const.MINUTE, gas, 0))
+            workload.append((abs_p, engine._deco_stop_search_time, gas, 0))
+    return workload
+
+
+def _rate_workload(engine):
+    """
+    Create workload of descent and ascent by 1m with engine descent and
+    ascent rates.
+
+    The workload checks if a numeric kernel can be used with time values
+    of engine descent and ascent.
+
+    :param engine: DecoTengu decompression engine.
+    """
+    gas = GasMix(0, 18, 37, 45)
+    dp = engine._meter_to_bar
+    abs_p = engine._to_pressure(30)
+    descent_rate = engine._time_to_pressure(1, engine.descent_rate)
+    ascent_rate = -engine._time_to_pressure(1, engine.ascent_rate)
+    return [
+        (abs_p, engine._pressure_to_time(dp, engine.descent_rate), gas,
+            descent_rate),
+        (abs_p + dp, engine._pressure_to_time(dp, engine.ascent_rate), gas,
+            ascent_rate),
+    ]
+
+
+def _run(model, workload):
+    """
+    Run numeric kernel benchmark workload.
+
+    List of inert gas pressure values and ascent ceiling limits is
+    returned.
+
+    :param model: Decompression model.
+    :param workload: Numeric kernel benchmark workload.
+    """
+    result = []
+    data = model.init(workload[0][0])
+    for abs_p, t, gas, rate in workload:
+        data = model.load(abs_p, t, gas, rate, data)
+        result.extend(data._tissues)
+        result.extend(model.gf_limit(model.gf_low, data))
+        result.extend(model.gf_limit(model.gf_high, data))
+    return result
+
+
+# vim: sw=4:et:ai
@@ -0,0 +1,496 @@
+#
+# DecoTengu - dive decompression library.
+#
+# Copyright (C) 2013-2014 by Artur Wroblewski <wrobell@pld-linux.org>
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+
+"""
+Live Dive
+---------
+DecoTengu decompression engine can be fed with depth samples of a dive in
+progress, i.e. read every 2 seconds from a depth sensor, dive log or dive
+simulator. Live dive object is created with :py:meth:`decotengu.Engine.live`
+method. After each depth sample, the live dive object returns live dive
+information
+
+- current ascent ceiling limit
+- no decompression limit (NDL)
+- first decompression stop
+- time to surface (TTS)
+
+The tissue compartments are loaded with inert gas between samples using
+Schreiner equation with pressure rate change of depth change between the
+samples, i.e. depth change is assumed to be linear between the samples.
+Negative depth values (i.e. depth sensor noise at the surface) are
+treated as the surface. Bottom gas mix is breathed unless gas mix switch
+is passed with a depth sample.
+
+The gradient factor value changes from gradient factor low parameter at
+the first decompression stop of the dive to gradient factor high
+parameter at the surface, i.e. like for an ascent calculated with
+:py:meth:`decotengu.Engine.calculate` method. The ascent ceiling limit is
+calculated with the gradient factor value of current depth and the first
+decompression stop is the deepest one calculated since a diver had to
+perform decompression stops. The NDL is calculated with
+:py:meth:`decotengu.model.ZH_L16_GF.ndl` method taking ascent to the
+surface into account. If NDL is greater than zero, then ascent to the
+surface is possible without decompression stops and TTS is time of ascent
+to the surface. Otherwise, the ascent to the surface is calculated by the
+decompression engine (with all its overrides) to find first decompression
+stop and TTS. If current depth is shallower than the ascent ceiling
+limit, then the ascent is calculated from the depth of the ascent ceiling
+limit. Between decompression stops of the dive, the ascent starts with
+decompression stop at current depth or at the next decompression stop
+depth, if the ascent ceiling limit calculated with gradient factor value
+of the next decompression stop allows it. The gradient factor slope of
+the ascent is anchored at the first decompression stop of the dive, so
+TTS and decompression stops at the end of a decompression stop of planned
+dive are the rest of the plan, unless the plan has 1 minute decompression
+stops not required due to no decompression limit. Decompression gas mixes
+are used during the ascent.
+Decompression table of the ascent is available with `deco_table` attribute
+of the decompression engine.
+
+Worst-case Latency
+~~~~~~~~~~~~~~~~~~
+The calculation time for a depth sample is bounded by
+
+- one loading of tissue compartments with inert gas
+- one ascent ceiling limit calculation
+- one NDL calculation - for each tissue compartment, logarithm for
+  nitrogen-only tissue compartment or binary search of time of exposure
+  for tissue compartment with helium
+- when NDL is zero, calculation of the ascent to the surface - the same
+  cost as ascent part of :py:meth:`decotengu.Engine.calculate` method
+
+The last item dominates the worst-case latency, which is the calculation
+time of the longest ascent of a dive, usually at the end of the bottom
+part of the dive. The maximum calculation time of a depth sample is kept
+by `max_latency` attribute of the live dive object. Use ``dt-live`` script
+to measure the latency for few dive profiles.
+
+Time to Surface Cache
+~~~~~~~~~~~~~~~~~~~~~
+The decompression stops change little between depth samples. Live dive
+created with ``Engine.live(cache=True)`` uses time to surface cache (see
+:py:class:`TTSCache`), which predicts length of each decompression stop
+with the decompression stops calculated for previous depth sample. All
+decompression stops are recalculated, so time to surface is the same as
+without the cache, but the length of a decompression stop, which did not
+change, is confirmed with two tissue loadings.
+
+Example
+~~~~~~~
+Feed the engine with depth samples of a dive to 30m on air
+
+    >>> import decotengu
+    >>> engine = decotengu.create()
+    >>> engine.add_gas(0, 21)
+    >>> dive = engine.live()
+    >>> info = dive.sample(1.5, 30)
+    >>> info.ndl
+    13
+    >>> info = dive.sample(30, 30)
+    >>> info.ndl, info.stop, round(info.tts, 4)
+    (0, DecoStop(depth=15.0, time=1.0), 16.0)
+"""
+
+from collections import namedtuple
+import logging
+import math
+import time as timer
+
+from .engine import Phase, Step, _accepts_hint
+from .error import EngineError
+from . import const
+
+logger = logging.getLogger(__name__)
+
+LiveInfo = namedtuple('LiveInfo', 'time depth ceiling ndl stop tts data')
+LiveInfo.__doc__ = """
+Live dive information after a depth sample.
+
+:var time: Time of the depth sample [min].
+:var depth: Depth of the depth sample [m].
+:var ceiling: Depth of ascent ceiling limit [m] calculated with gradient
+    factor value of current depth.
+:var ndl: No decompression limit [min].
+:var stop: First decompression stop or null if no decompression required
+    (see :py:class:`decotengu.engine.DecoStop`).
+:var tts: Time to surface [min].
+:var data: Decompression model data after the depth sample.
+"""
+
+
+class LiveDive(object):
+    """
+    Live dive fed with depth samples.
+
+    :var engine: DecoTengu decompression engine.
+    :var step: Dive step of last depth sample.
+    :var max_latency: Maximum calculation time of a depth sample [s].
+    :var tts_cache: Time to surface cache or null if not used.
+    """
+    def __init__(self, engine, cache=False):
+        """
+        Create live dive starting at the surface.
+
+        :param engine: DecoTengu decompression engine.
+        :param cache: Use time to surface cache if true.
+        """
+        super().__init__()
+        self.engine = engine
+        _, self._gas_list = engine._dive_gas_lists()
+        self.step = engine._step_start(
+            engine.surface_pressure, self._gas_list[0]
+        )
+        self.max_latency = 0
+        self.tts_cache = TTSCache(engine) if cache else None
+        self._first_stop = None
+        self._ascent = self.tts_cache if cache else self._full_ascent
+
+
+    def sample(self, time, depth, gas=None):
+        """
+        Load tissue compartments with inert gas using depth sample and
+        calculate live dive information.
+
+        Gas mix, to which a diver switched at the depth sample, is
+        breathed since the depth sample.
+
+        :param time: Time of depth sample since start of the dive [min].
+        :param depth: Depth of depth sample [m].
+        :param gas: Gas mix switched at depth sample, if any.
+        """
+        t1 = timer.perf_counter()
+
+        engine = self.engine
+        prev = self.step
+        dt = time - prev.time
+        if dt <= 0:
+            raise EngineError(
+                'Depth sample time {}min not after {}min'.format(
+                    time, prev.time
+                )
+            )
+
+        abs_p = engine._to_pressure(max(0, depth))
+        rate = (abs_p - prev.abs_p) / dt
+        if rate > 0:
+            phase = Phase.DESCENT
+        elif rate < 0:
+            phase = Phase.ASCENT
+        else:
+            phase = Phase.CONST
+        data = engine.model.load(prev.abs_p, dt, prev.gas, rate, prev.data)
+        if gas is None or gas == prev.gas:
+            gas = prev.gas
+        else:
+            phase = Phase.GAS_SWITCH
+        self.step = step = Step(phase, abs_p, time, gas, data)
+
+        info = self._info(step)
+
+        t2 = timer.perf_counter()
+        self.max_latency = max(self.max_latency, t2 - t1)
+        return info
+
+
+    def _info(self, step):
+        """
+        Calculate live dive information at dive step.
+
+        :param step: Dive step of depth sample.
+        """
+        engine = self.engine
+        model = engine.model
+        surface = engine.surface_pressure
+        rate = -engine.ascent_rate * engine._meter_to_bar
+
+        limit = model.ceiling_limit(step.data, self._gf(step.abs_p))
+        ceiling = max(0, engine._to_depth(limit))
+        ndl = model.ndl(
+            step.data, step.abs_p, step.gas, surface_pressure=surface,
+            rate=rate
+        )
+
+        del engine.deco_table[:]
+        if ndl > 0:
+            stop = None
+            tts = engine._pressure_to_time(
+                step.abs_p - surface, engine.ascent_rate
+            )
+            self._first_stop = None
+        else:
+            start, deco = self._deco_start(step, limit)
+            start, gas_list = self._ascent_start(start)
+
+            tts = self._ascent(start, gas_list, deco)
+            tts += start.time - step.time
+            stop = engine.deco_table[0] if engine.deco_table else None
+            if stop:
+                abs_p = engine._to_pressure(stop.depth)
+                if self._first_stop is None or abs_p > self._first_stop:
+                    self._first_stop = abs_p
+
+        return LiveInfo(
+            step.time, engine._to_depth(step.abs_p), ceiling, ndl, stop,
+            tts, step.data
+        )
+
+
+    def _gf(self, abs_p):
+        """
+        Calculate gradient factor value at depth.
+
+        The gradient factor value changes from `gf_low` at first
+        decompression stop of the dive to `gf_high` at the surface in the
+        same way as for ascent calculated by decompression engine (see
+        :py:meth:`decotengu.Engine._deco_stops`).
+
+        :param abs_p: Absolute pressure of depth [bar].
+        """
+        engine = self.engine
+        model = engine.model
+        p = self._first_stop
+        if p is None or abs_p >= p:
+            return model.gf_low
+
+        n = engine._n_stops(p)
+        k = min(engine._n_stops(p, abs_p), n)
+        return model.gf_low + (model.gf_high - model.gf_low) * k / n
+
+
+    def _deco_start(self, step, limit):
+        """
+        Calculate starting dive step of ascent to the surface, when
+        decompression is required.
+
+        The ascent is calculated from first decompression stop depth, when
+        diver is shallower than the ascent ceiling limit. The ascent
+        ceiling limit might be at the surface with gradient factor low, but
+        no decompression limit is calculated with gradient factor high, so
+        the ascent starts at the last decompression stop depth at least.
+
+        When diver is between decompression stops of the dive, then the
+        ascent starts with decompression stop. Diver ascends to the next
+        decompression stop, if the ascent ceiling limit calculated with
+        gradient factor value of the next decompression stop allows it,
+        i.e. at the end of a decompression stop. Gradient factor value of
+        the starting dive step is set to the value at its depth.
+
+        Pair of starting dive step and decompression stop indicator is
+        returned.
+
+        :param step: Dive step of depth sample.
+        :param limit: Ascent ceiling limit at the dive step [bar].
+        """
+        engine = self.engine
+        surface = engine.surface_pressure
+        p3m = engine._p3m
+        last = surface + (2 if engine.last_stop_6m else 1) * p3m
+
+        limit = max(engine._ceil_pressure_3m(limit), last)
+        start = step._replace(abs_p=limit) if step.abs_p < limit else step
+
+        first = self._first_stop
+        stop = first is not None and start.abs_p - first < const.EPSILON
+        if stop:
+            k = math.ceil((start.abs_p - surface) / p3m - const.EPSILON)
+            abs_p = surface + (k - 1) * p3m
+            gf = self._gf(abs_p)
+            if abs_p - last > -const.EPSILON \
+                    and engine.model.ceiling_limit(start.data, gf) <= abs_p:
+                t = engine._pressure_to_time(
+                    start.abs_p - abs_p, engine.ascent_rate
+                )
+                start = engine._step_next_ascent(start, t, start.gas)
+            else:
+                # decompression stop depth is multiply of 3m
+                stop = abs(abs_p + p3m - start.abs_p) < const.EPSILON
+
+        data = start.data._replace(gf=self._gf(start.abs_p))
+        return start._replace(data=data), stop
+
+
+    def _full_ascent(self, start, gas_list, stop=False):
+        """
+        Calculate ascent to the surface and return its time.
+
+        :param start: Starting dive step.
+        :param gas_list: List of gas mixes - bottom and decompression gas
+            mixes.
+        :param stop: Starting dive step is decompression stop if true.
+        """
+        return _ascent_time(self.engine, start, gas_list, stop)
+
+
+    def _ascent_start(self, start):
+        """
+        Prepare starting dive step and gas mix list for ascent to the
+        surface.
+
+        Decompression gas mix with switch depth not shallower than
+        starting depth is switched at starting dive step. If there is more
+        than one such gas mix, then the gas mix with shallowest switch
+        depth is used.
+
+        :param start: Starting dive step.
+        """
+        engine = self.engine
+        gas_list = [start.gas]
+        for m in self._gas_list[1:]:
+            if engine._to_pressure(m.depth) - start.abs_p > -const.EPSILON:
+                gas_list = [m]
+            else:
+                gas_list.append(m)
+        if gas_list[0] != start.gas:
+            start = engine._switch_gas(start, gas_list[0])
+        return start, gas_list
+
+
+
+class TTSCache(object):
+    """
+    Time to surface calculator predicting decompression stop lengths with
+    previous ascent calculation.
+
+    Tissues gas loading changes little between depth samples, so the
+    decompression stops of an ascent usually have the same length as the
+    decompression stops of the ascent calculated for previous depth
+    sample. The calculator keeps the length of each decompression stop of
+    last calculated ascent and uses it as predicted length of the
+    decompression stop at the same depth and on the same gas mix (see
+    `hint` parameter of :py:meth:`decotengu.Engine._deco_stop` method).
+    Ascent is checked at the predicted length and a minute before it, so
+    two tissue loadings confirm length of a decompression stop, which did
+    not change. The length of a decompression stop affected by the
+    change of tissues gas loading, i.e. when the ascent ceiling limit
+    crosses a 3m boundary, is searched from the predicted length.
+
+    All decompression stops are recalculated by the decompression engine
+    from the same starting dive step as without the cache, so the time to
+    surface and decompression stops are the same as calculated without the
+    cache.
+
+    :var engine: DecoTengu decompression engine.
+    :var calls: Number of time to surface calculations.
+    :var fallbacks: Number of time to surface calculations without
+        predicted length of any decompression stop.
+    :var stops: Number of calculated decompression stops.
+    :var hits: Number of decompression stops with length equal to
+        predicted length.
+    """
+    def __init__(self, engine):
+        """
+        Create time to surface calculator.
+
+        :param engine: DecoTengu decompression engine.
+        """
+        super().__init__()
+        self.engine = engine
+        self.calls = 0
+        self.fallbacks = 0
+        self.stops = 0
+        self.hits = 0
+        self._lengths = {}
+
+
+    def __call__(self, start, gas_list, stop=False):
+        """
+        Calculate ascent to the surface and return its time.
+
+        Decompression table of the ascent is available with `deco_table`
+        attribute of the decompression engine.
+
+        :param start: Starting dive step.
+        :param gas_list: List of gas mixes - bottom and decompression gas
+            mixes.
+        :param stop: Starting dive step is decompression stop if true.
+        """
+        engine = self.engine
+        deco_stop = engine._deco_stop
+        hinted = _accepts_hint(deco_stop)
+        lengths, self._lengths = self._lengths, {}
+        predicted = 0
+
+        def calc(step, next_time, gas, gf, hint=None):
+            nonlocal predicted
+
+            key = round(engine._to_depth(step.abs_p)), gas
+            length = lengths.get(key)
+            if length is not None:
+                hint = length
+                predicted += 1
+
+            if hint is None or not hinted:
+                end = deco_stop(step, next_time, gas, gf)
+            else:
+                end = deco_stop(step, next_time, gas, gf, hint=hint)
+
+            self._lengths[key] = round(end.time - step.time)
+            self.stops += 1
+            if self._lengths[key] == length:
+                self.hits += 1
+            return end
+
+        # override decompression stop calculation of the engine for the
+        # time of the ascent calculation only
+        override = '_deco_stop' in engine.__dict__
+        engine._deco_stop = calc
+        try:
+            tts = _ascent_time(engine, start, gas_list, stop)
+        finally:
+            if override:
+                engine._deco_stop = deco_stop
+            else:
+                del engine._deco_stop
+
+        self.calls += 1
+        if predicted == 0:
+            self.fallbacks += 1
+        return tts
+
+
+
+def _ascent_time(engine, start, gas_list, stop):
+    """
+    Calculate ascent to the surface and return its time.
+
+    If starting dive step is decompression stop, then the ascent is
+    performed with decompression stops only (see
+    :py:meth:`decotengu.Engine._deco_staged_ascent`), otherwise the ascent
+    is calculated with :py:meth:`decotengu.Engine._dive_ascent` method.
+
+    :param engine: DecoTengu decompression engine.
+    :param start: Starting dive step.
+    :param gas_list: List of gas mixes - bottom and decompression gas
+        mixes.
+    :param stop: Starting dive step is decompression stop if true.
+    """
+    if stop:
+        stages = engine._deco_ascent_stages(start.abs_p, gas_list)
+        steps = engine._deco_staged_ascent(start, stages)
+    else:
+        steps = engine._dive_ascent(start, gas_list)
+
+    end = start
+    for end in steps:
+        pass
+    return end.time - start.time
+
+
+# vim: sw=4:et:ai
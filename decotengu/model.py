@@ -362,6 +362,53 @@ The pressure of ascent ceiling of a diver is calculated with the
 - length of decompression stop - a diver cannot ascent from decompression
   stop until depth of ascent ceiling decreases
 
+.. _model-ndl:
+
+No Decompression Limit
+----------------------
+No decompression limit (NDL) is the time a diver can stay at current depth
+and still ascend to the surface without decompression stops. It is
+calculated with the :func:`ZH_L16_GF.ndl` method.
+
+At constant depth, Schreiner equation reduces to exponential decay
+
+    .. math::
+
+        P(t) = P_{alv} + (P_{i} - P_{alv}) * e^{-k * t}
+
+Ascent to the surface takes constant time :math:`t_a`, therefore Schreiner
+equation for the ascent is a linear function of inert gas pressure at the
+start of the ascent :math:`P(t)`
+
+    .. math::
+
+        P_s = c_0 + c_1 * P(t)
+
+where :math:`c_1 = e^{-k * t_a}` and :math:`c_0 = P_{alv} + R * (t_a - 1 / k) - (P_{alv} - R / k) * c_1`
+(:math:`P_{alv}` and :math:`R` for the ascent). Combining both equations,
+the inert gas pressure at the surface is
+
+    .. math::
+
+        P_s(t) = Q + D * e^{-k * t}
+
+where :math:`Q = c_0 + c_1 * P_{alv}` and :math:`D = c_1 * (P_{i} - P_{alv})`.
+
+When a tissue compartment contains nitrogen only, then it is allowed to
+ascend to the surface as long as :math:`P_s(t)` does not exceed
+:math:`P_{max} = P_{surface} * (gf / B + 1 - gf) + A * gf` and NDL of the
+tissue compartment is
+
+    .. math::
+
+        t = \\frac{1}{k} * ln(\\frac{D}{P_{max} - Q})
+
+When a tissue compartment contains helium, Buhlmann coefficients depend on
+inert gas pressure values, so the NDL of the tissue compartment is found
+with binary search over minutes.
+
+The NDL is the minimum of NDL values of all tissue compartments.
+
 References
 ----------
 * Baker, Erik. :download:`Understanding M-values <mvalues.pdf>`.
@@ -372,24 +419,139 @@ References
   source code <https://bitbucket.org/heinrichsweikamp/ostc2_code>`_.
 """
 
-from collections import namedtuple
+from array import array
+from collections import OrderedDict
 import math
+import operator
 import logging
 
 from .error import EngineError
 from . import const
 from .flow import coroutine
+from .ft import bisect_find
 
 logger = logging.getLogger(__name__)
 
-Data = namedtuple('Data', 'tissues gf')
-Data.__doc__ = """
-Data for ZH-L16-GF decompression model.
+# maximum number of exposure times kept by exponential function cache
+EXP_CACHE_SIZE = 64
 
-:var tissues: Tissues gas loading. Tuple of pair numbers - each pair holds
-    value of inert gas pressure (N2, He) in a tissue compartment.
-:var gf: Gradient factor value.
-"""
+# maximum number of tissue compartments loading plans kept by
+# decompression model
+LOAD_PLAN_CACHE_SIZE = 64
+
+# NDL values are searched up to this value [min]
+NDL_MAX = 2 ** 16
+
+INF = float('inf')
+
+
+class Data(object):
+    """
+    Data for ZH-L16-GF decompression model.
+
+    The inert gas pressure values are kept in a flat, contiguous buffer,
+    i.e. nitrogen and helium pressure of first tissue compartment, then
+    nitrogen and helium pressure of second tissue compartment, etc. The
+    buffer is an array of doubles unless the values are not floats (i.e.
+    decimal numbers), then a tuple is used.
+
+    :var tissues: Tissues gas loading. Tuple of pair numbers - each pair holds
+        value of inert gas pressure (N2, He) in a tissue compartment.
+    :var gf: Gradient factor value.
+    :var _tissues: Flat buffer of inert gas pressure values.
+    """
+    __slots__ = ('_tissues', 'gf')
+
+    def __init__(self, tissues, gf):
+        """
+        Create decompression model data.
+
+        :param tissues: Collection of inert gas pressure pairs (N2, He) -
+            a pair for each tissue compartment.
+        :param gf: Gradient factor value.
+        """
+        self._tissues = _buffer(v for pair in tissues for v in pair)
+        self.gf = gf
+
+
+    @property
+    def tissues(self):
+        """
+        Tuple of inert gas pressure pairs (N2, He) - a pair for each tissue
+        compartment.
+        """
+        tp = self._tissues
+        return tuple(zip(tp[::2], tp[1::2]))
+
+
+    def _replace(self, **kw):
+        """
+        Create copy of decompression model data with replaced values of
+        specified attributes.
+
+        :param kw: Tissues gas loading (`tissues`) and gradient factor
+            value (`gf`).
+        """
+        tp = self._tissues
+        if 'tissues' in kw:
+            tp = _buffer(v for pair in kw.pop('tissues') for v in pair)
+        data = Data._from_buffer(tp, kw.pop('gf', self.gf))
+        assert not kw, kw
+        return data
+
+
+    @classmethod
+    def _from_buffer(cls, tp, gf):
+        """
+        Create decompression model data using flat buffer of inert gas
+        pressure values.
+
+        :param tp: Flat buffer of inert gas pressure values.
+        :param gf: Gradient factor value.
+        """
+        data = cls.__new__(cls)
+        data._tissues = tp
+        data.gf = gf
+        return data
+
+
+    def __eq__(self, other):
+        return isinstance(other, Data) \
+            and tuple(self._tissues) == tuple(other._tissues) \
+            and self.gf == other.gf
+
+
+    def __hash__(self):
+        return hash((tuple(self._tissues), self.gf))
+
+
+    def __repr__(self):
+        return 'Data(tissues={}, gf={})'.format(self.tissues, self.gf)
+
+
+
+def _buffer(values, like=None, typecode='d'):
+    """
+    Create flat buffer of inert gas pressure values.
+
+    If buffer `like` is specified, then buffer of the same type is
+    created. Otherwise, an array of doubles is created for floats and
+    a tuple is created for any other number type.
+
+    :param values: Flat collection of inert gas pressure values.
+    :param like: Optional buffer to take type of new buffer from.
+    :param typecode: Typecode of array of floats, i.e. `f` for single
+        precision floats.
+    """
+    if type(like) is array:
+        return array(like.typecode, values)
+
+    values = tuple(values)
+    if type(like) is tuple \
+            or not all(isinstance(v, (float, int)) for v in values):
+        return values
+    else:
+        return array(typecode, values)
 
 
 def eq_gf_limit(gf, p_n2, p_he, a_n2, b_n2, a_he, b_he):
@@ -415,6 +577,146 @@ def eq_gf_limit(gf, p_n2, p_he, a_n2, b_n2, a_he, b_he):
 
 
 
+class ExpCache(object):
+    """
+    Cache of exponential function values for tissue compartments loading.
+
+    For an exposure time, the cache keeps values of :math:`e^{-k * t}` for
+    each tissue compartment and inert gas - in the same order as inert gas
+    pressure values of decompression model data flat buffer. The values
+    are calculated with :py:meth:`ZH_L16_GF._exp` method of decompression
+    model, so the cache has to be cleared when the method is overriden.
+
+    The cache is bounded. When the cache is full, the least recently used
+    exposure time is removed from the cache.
+
+    :var model: Decompression model.
+    :var size: Maximum number of exposure times kept by the cache.
+    :var hits: Number of cache hits.
+    :var misses: Number of cache misses.
+    """
+    def __init__(self, model, size=EXP_CACHE_SIZE):
+        """
+        Create exponential function values cache.
+
+        :param model: Decompression model.
+        :param size: Maximum number of exposure times kept by the cache.
+        """
+        super().__init__()
+        self.model = model
+        self.size = size
+        self.hits = 0
+        self.misses = 0
+        self._cache = OrderedDict()
+
+
+    def __call__(self, time):
+        """
+        Get values of exponential function for exposure time.
+
+        :param time: Time of exposure [min].
+        """
+        cache = self._cache
+        values = cache.get(time)
+        if values is None:
+            self.misses += 1
+            exp = self.model._exp
+            values = cache[time] = tuple(
+                exp(time, k) for k in self.model._k_flat
+            )
+            if len(cache) > self.size:
+                cache.popitem(last=False)
+        else:
+            self.hits += 1
+            cache.move_to_end(time)
+        return values
+
+
+    def __len__(self):
+        """
+        Get number of exposure times kept by the cache.
+        """
+        return len(self._cache)
+
+
+    def clear(self):
+        """
+        Remove all values from the cache and reset cache statistics.
+        """
+        self._cache.clear()
+        self.hits = 0
+        self.misses = 0
+
+
+
+class LoadPlan(object):
+    """
+    Tissue compartments loading plan.
+
+    The plan precalculates constants of Schreiner equation (see
+    :ref:`eq-schreiner`) for absolute pressure, gas mix and pressure rate
+    change, so tissue compartments can be loaded with inert gas for any
+    time of exposure without calculating the constants again.
+
+    The constants are kept for each tissue compartment and inert gas - in
+    the same order as inert gas pressure values of decompression model
+    data flat buffer.
+
+    :var model: Decompression model.
+    :var abs_p: Absolute pressure [bar] (current depth).
+    :var gas: Gas mix configuration.
+    :var rate: Pressure rate change [bar/min].
+    :var _p_alv: Pressure of inspired inert gas :math:`P_{alv}`.
+    :var _r: Rate of change of inert gas pressure :math:`R`.
+    :var _r_k: Values of :math:`R / k`.
+    """
+    def __init__(self, model, abs_p, gas, rate):
+        """
+        Create tissue compartments loading plan.
+
+        :param model: Decompression model.
+        :param abs_p: Absolute pressure [bar] (current depth).
+        :param gas: Gas mix configuration.
+        :param rate: Pressure rate change [bar/min].
+        """
+        super().__init__()
+        self.model = model
+        self.abs_p = abs_p
+        self.gas = gas
+        self.rate = rate
+
+        p = abs_p - model.water_vapour_pressure
+        f_n2 = gas.n2 / 100
+        f_he = gas.he / 100
+        n = model.NUM_COMPARTMENTS
+        self._p_alv = (f_n2 * p, f_he * p) * n
+        self._r = (f_n2 * rate, f_he * rate) * n
+        self._r_k = tuple(map(operator.truediv, self._r, model._k_flat))
+
+
+    def apply(self, time, data):
+        """
+        Load all tissue compartments with inert gas for time of exposure.
+
+        The method returns decompression model data.
+
+        :param time: Time of exposure [min] (i.e. time of ascent).
+        :param data: Decompression model data.
+        """
+        assert time > 0
+        exp = self.model._exp_cache(time)
+        tp = data._tissues
+        items = zip(
+            tp, exp, self._p_alv, self._r, self.model._k_inv, self._r_k
+        )
+        values = [
+            p_alv + r * (time - k_inv) - (p_alv - p_i - r_k) * e
+            for p_i, e, p_alv, r, k_inv, r_k in items
+        ]
+        return Data._from_buffer(_buffer(values, tp), data.gf)
+
+
+
 class ZH_L16_GF(object):
     """
     Base abstract class for Buhlmann ZH-L16 decompression model with
@@ -427,6 +729,20 @@ class ZH_L16_GF(object):
         tissue compartment.
     :var he_k_const: Gas decay constants :math:`k` for helium for each
         tissues compartment.
+    :var _gf_coeff: Buhlmann coefficients `(N2 A, N2 B, He A, He B)` for
+        each tissue compartment.
+    :var kernel: Name of numeric kernel, see :py:mod:`decotengu.kernel`.
+    :var typecode: Typecode of array of floats used by decompression model
+        data created with :py:meth:`ZH_L16_GF.init` method, i.e. `f` for
+        single precision floats.
+    :var _exp_cache: Cache of exponential function values for recurring
+        exposure times.
+    :var _load_plans: Cache of tissue compartments loading plans.
+    :var _k_flat: Gas decay constants :math:`k` for each tissue
+        compartment and inert gas - in the same order as inert gas
+        pressure values of decompression model data flat buffer.
+    :var _k_inv: Inverse of gas decay constants, :math:`1 / k`, in the
+        same order as `_k_flat` attribute.
     """
     NUM_COMPARTMENTS = 16
     N2_A = None
@@ -445,12 +761,35 @@ class ZH_L16_GF(object):
         super().__init__()
         self.n2_k_const = self._k_const(self.N2_HALF_LIFE)
         self.he_k_const = self._k_const(self.HE_HALF_LIFE)
+        self._gf_coeff = tuple(
+            zip(self.N2_A, self.N2_B, self.HE_A, self.HE_B)
+        )
         self.gf_low = 0.3
         self.gf_high = 0.85
+        self.kernel = 'python'
+        self.typecode = 'd'
+        self._k_flat = tuple(
+            k for pair in zip(self.n2_k_const, self.he_k_const) for k in pair
+        )
+        self._k_inv = tuple(1 / k for k in self._k_flat)
+        self._exp_cache = ExpCache(self)
+        self._load_plans = OrderedDict()
 
         self.water_vapour_pressure = const.WATER_VAPOUR_PRESSURE_DEFAULT
 
 
+    def set_kernel(self, name):
+        """
+        Set numeric kernel of the decompression model.
+
+        :param name: Name of numeric kernel.
+
+        .. seealso:: :py:func:`decotengu.kernel.set_kernel`
+        """
+        from .kernel import set_kernel
+        set_kernel(self, name)
+
+
     def init(self, surface_pressure):
         """
         Initialize pressure of inert gas in all tissues.
@@ -462,7 +801,8 @@ class ZH_L16_GF(object):
         """
         p_n2 = self.START_P_N2 * (surface_pressure - self.water_vapour_pressure)
         p_he = self.START_P_HE
-        data = Data(tuple([(p_n2, p_he)] * self.NUM_COMPARTMENTS), self.gf_low)
+        tp = _buffer((p_n2, p_he) * self.NUM_COMPARTMENTS, typecode=self.typecode)
+        data = Data._from_buffer(tp, self.gf_low)
         return data
 
 
@@ -480,16 +820,64 @@ class ZH_L16_GF(object):
 
         .. seealso::
 
-            - :py:meth:`decotengu.model.ZH_L16_GF._tissue_loaders`
-            - :py:meth:`decotengu.model.ZH_L16_GF._tissue_loader`
+            - :py:meth:`decotengu.model.ZH_L16_GF.load_plan`
+            - :py:class:`decotengu.model.LoadPlan`
         """
-        n2_loader, he_loader = self._tissue_loaders(abs_p, gas, rate)
+        return self.load_plan(abs_p, gas, rate).apply(time, data)
 
-        tp = tuple(
-            (n2_loader(time, p_n2, i), he_loader(time, p_he, i))
-            for i, (p_n2, p_he) in enumerate(data.tissues)
-        )
-        return Data(tp, data.gf)
+
+    def load_plan(self, abs_p, gas, rate):
+        """
+        Get tissue compartments loading plan for absolute pressure, gas mix
+        and pressure rate change.
+
+        The loading plans are kept in bounded cache, so a plan is reused
+        when tissue compartments are loaded multiple times at the same
+        depth, using the same gas mix and pressure rate change, i.e.
+        during decompression stop. Water vapour pressure is part of the
+        cache key as the plan constants depend on it.
+
+        :param abs_p: Absolute pressure [bar] (current depth).
+        :param gas: Gas mix configuration.
+        :param rate: Pressure rate change [bar/min].
+        """
+        key = abs_p, gas, rate, self.water_vapour_pressure
+        plans = self._load_plans
+        plan = plans.get(key)
+        if plan is None:
+            plan = plans[key] = LoadPlan(self, abs_p, gas, rate)
+            if len(plans) > LOAD_PLAN_CACHE_SIZE:
+                plans.popitem(last=False)
+        else:
+            plans.move_to_end(key)
+        return plan
+
+
+    def load_many(self, abs_p, time, gas, rate, data):
+        """
+        Calculate gas loading for all tissue compartments of multiple,
+        independent decompression model data.
+
+        Each parameter is a collection with a value for each decompression
+        model data. The method returns list of decompression model data.
+
+        This is a convenience method, which calls
+        :py:meth:`ZH_L16_GF.load` method for each decompression model data,
+        so it is not faster than the calls. The vectorized numeric kernel
+        replaces the method with array operation (see
+        :py:meth:`decotengu.alt.vector.VectorCalculator.load_many`).
+
+        :param abs_p: Absolute pressure [bar] values (current depth).
+        :param time: Time of exposure [min] values (i.e. time of ascent).
+        :param gas: Gas mix configurations.
+        :param rate: Pressure rate change [bar/min] values.
+        :param data: Collection of decompression model data.
+
+        .. seealso:: :py:meth:`decotengu.model.ZH_L16_GF.load`
+        """
+        assert len(abs_p) == len(time) == len(gas) == len(rate) == len(data)
+        load = self.load
+        return [load(*args) for args in zip(abs_p, time, gas, rate, data)]
 
 
     def ceiling_limit(self, data, gf=None):
@@ -510,11 +898,130 @@ class ZH_L16_GF(object):
         .. seealso::
 
             - :py:meth:`decotengu.model.ZH_L16_GF.gf_limit`
-            - :py:meth:`decotengu.model.ZH_L16_GF._tissue_loader`
+            - :py:meth:`decotengu.model.ZH_L16_GF.load`
         """
         return max(self.gf_limit(gf, data))
 
 
+    def ndl(
+            self, data, abs_p, gas, gf=None,
+            surface_pressure=const.SURFACE_PRESSURE, rate=None
+        ):
+        """
+        Calculate no decompression limit (NDL) at current depth.
+
+        The method returns number of full minutes a diver can stay at
+        current depth, so ascent to the surface is possible without
+        decompression stops. If ascent to the surface is already not
+        possible, then zero is returned. Infinity is returned if there is
+        no decompression limit.
+
+        The ascent is instant by default (no ascent path effect). If
+        pressure rate change of ascent is specified, the inert gas loading
+        during ascent to the surface is taken into account.
+
+        :param data: Decompression model data.
+        :param abs_p: Absolute pressure of current depth [bar].
+        :param gas: Gas mix configuration.
+        :param gf: Gradient factor value, `gf_high` by default.
+        :param surface_pressure: Surface pressure [bar].
+        :param rate: Pressure rate change of ascent [bar/min], i.e. -1
+            for ascent rate of about 10m/min.
+
+        .. seealso:: :ref:`model-ndl`
+        """
+        if gf is None:
+            gf = self.gf_high
+        assert gf > 0 and gf <= 1.5
+        assert rate is None or rate < 0
+        assert abs_p >= surface_pressure
+
+        p_alv = abs_p - self.water_vapour_pressure
+        f_n2 = gas.n2 / 100
+        f_he = gas.he / 100
+        if rate is None:
+            t_a = 0
+        else:
+            t_a = (abs_p - surface_pressure) / -rate
+
+        tp = data._tissues
+        items = zip(
+            tp[::2], tp[1::2], self.n2_k_const, self.he_k_const,
+            self._gf_coeff
+        )
+        ndl = NDL_MAX
+        for p_n2, p_he, n2_k, he_k, (n2_a, n2_b, he_a, he_b) in items:
+            n2_q, n2_d = self._ndl_coeff(p_n2, p_alv, f_n2, n2_k, rate, t_a)
+            if p_he == 0 and f_he == 0:
+                p_max = surface_pressure * (gf / n2_b + 1 - gf) + n2_a * gf
+                if n2_q + n2_d > p_max:
+                    return 0
+                elif n2_q > p_max:
+                    t = math.log(n2_d / (p_max - n2_q)) / n2_k
+                    ndl = min(ndl, math.floor(t))
+            else:
+                he_q, he_d = self._ndl_coeff(
+                    p_he, p_alv, f_he, he_k, rate, t_a
+                )
+                def can_ascend(t):
+                    n2_p = n2_q + n2_d * math.exp(-n2_k * t)
+                    he_p = he_q + he_d * math.exp(-he_k * t)
+                    if n2_p + he_p == 0: # no inert gas, i.e. on oxygen
+                        return True
+                    limit = eq_gf_limit(
+                        gf, n2_p, he_p, n2_a, n2_b, he_a, he_b
+                    )
+                    return limit <= surface_pressure
+                if not can_ascend(0):
+                    return 0
+                ndl = min(ndl, bisect_find(ndl, can_ascend))
+        return INF if ndl >= NDL_MAX else ndl
+
+
+    def _ndl_coeff(self, p_i, p_alv, f_gas, k, rate, t_a):
+        """
+        Calculate coefficients :math:`Q` and :math:`D` of inert gas pressure
+        equation at the surface for NDL calculation.
+
+        :param p_i: Initial inert gas pressure in tissue compartment.
+        :param p_alv: Alveolar pressure of current depth (not including
+            inert gas fraction).
+        :param f_gas: Inert gas fraction.
+        :param k: Gas decay constant.
+        :param rate: Pressure rate change of ascent [bar/min] or null.
+        :param t_a: Time of ascent to the surface [min].
+
+        .. seealso:: :ref:`model-ndl`
+        """
+        p_alv = f_gas * p_alv
+        if rate is None:
+            c_0, c_1 = 0, 1
+        else:
+            r = f_gas * rate
+            c_1 = math.exp(-k * t_a)
+            c_0 = p_alv + r * (t_a - 1 / k) - (p_alv - r / k) * c_1
+        return c_0 + c_1 * p_alv, c_1 * (p_i - p_alv)
+
+
+    def leading_tissue(self, data, gf=None):
+        """
+        Calculate pressure of ascent ceiling limit and find the leading
+        tissue compartment, i.e. the compartment controlling the ceiling.
+
+        The method returns tuple `(limit, no)`, where `limit` is the
+        pressure of ascent ceiling limit (see
+        :py:meth:`ZH_L16_GF.ceiling_limit`) and `no` is the index of the
+        leading tissue compartment. If more than one tissue compartment
+        controls the ceiling, then the first one is returned.
+
+        :param data: Decompression model data.
+        :param gf: Gradient factor value, `gf_low` by default.
+        """
+        limits = self.gf_limit(gf, data)
+        no = max(range(len(limits)), key=limits.__getitem__)
+        return limits[no], no
+
+
     def _k_const(self, half_life):
         """
         Calculate gas decay constant :math:`k` for each tissue compartment
@@ -537,59 +1044,6 @@ class ZH_L16_GF(object):
         return math.exp(-k * time)
 
 
-    def _tissue_loaders(self, abs_p, gas, rate):
-        """
-        Create function to load tissue compartment with inert gas for each
-        inert gas specified in gas mix configuration.
-
-        :param abs_p: Absolute pressure of current depth [bar] (:math:`P_{abs}`).
-        :param gas: Gas mix configuration.
-        :param rate: Pressure rate change [bar/min] (:math:`P_{rate}`).
-        """
-        n2_loader = self._tissue_loader(
-            abs_p, gas.n2 / 100, rate, self.n2_k_const
-        )
-        he_loader = self._tissue_loader(
-            abs_p, gas.he / 100, rate, self.he_k_const
-        )
-        return n2_loader, he_loader
-
-
-    def _tissue_loader(self, abs_p, f_gas, rate, k_const):
-        """
-        Create function to load tissue compartment with inert gas.
-
-        The created function uses Schreiner equation and has the following
-        parameters
-
-        time
-            Time of exposure [min] at depth (:math:`T_{time}`).
-        p_i
-            Initial (current) pressure of inert gas in tissue compartment
-            [bar] (:math:`P_{i}`).
-        tissue_no
-            Number of tissue compartment in the decompression model
-            (starting with zero).
-
-        See :ref:`eq-schreiner` section for details.
-
-        :param abs_p: Absolute pressure of current depth [bar] (:math:`P_{abs}`).
-        :param f_gas: Inert gas fraction, i.e. for air it is 0.79 (:math:`F_{gas}`).
-        :param rate: Pressure rate change [bar/min] (:math:`P_{rate}`).
-        :param k_const: Collection of gas decay constants for each tissue
-            compartment (:math:`k`).
-        """
-        p_alv = f_gas * (abs_p - self.water_vapour_pressure)
-        r = f_gas * rate
-        def f(time, p_i, tissue_no):
-            assert time > 0
-            k = k_const[tissue_no]
-            return p_alv + r * (time - 1 / k) - (p_alv - p_i - r / k) \
-                * self._exp(time, k)
-            #return p_alv + r * (t - 1 / k) - (p_alv - p_i - r / k) * math.exp(-k * t)
-        return f
-
-
     def gf_limit(self, gf, data):
         """
         Calculate pressure of ascent ceiling for each tissue compartment.
@@ -597,6 +1051,11 @@ class ZH_L16_GF(object):
         The method returns a tuple of values - a pressure value for each
         tissue compartment.
 
+        The calculation is equivalent to calling :py:func:`eq_gf_limit`
+        function for each tissue compartment, but Buhlmann coefficients
+        are prepared once on model initialization and gradient factor
+        value is validated once per call.
+
         :param gf: Gradient factor.
         :param data: Decompression model data.
         """
@@ -605,11 +1064,15 @@ class ZH_L16_GF(object):
             gf = self.gf_low
         assert gf > 0 and gf <= 1.5
 
-        data = zip(data.tissues, self.N2_A, self.N2_B, self.HE_A, self.HE_B)
-        return tuple(
-            eq_gf_limit(gf, p_n2, p_he, n2_a, n2_b, he_a, he_b)
-            for (p_n2, p_he), n2_a, n2_b, he_a, he_b in data
-        )
+        tp = data._tissues
+        limits = []
+        for p_n2, p_he, (n2_a, n2_b, he_a, he_b) in \
+                zip(tp[::2], tp[1::2], self._gf_coeff):
+            p = p_n2 + p_he
+            a = (n2_a * p_n2 + he_a * p_he) / p
+            b = (n2_b * p_n2 + he_b * p_he) / p
+            limits.append((p - a * gf) / (gf / b + 1 - gf))
+        return tuple(limits)
 
 
 
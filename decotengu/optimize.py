@@ -0,0 +1,401 @@
+#
+# DecoTengu - dive decompression library.
+#
+# Copyright (C) 2013-2014 by Artur Wroblewski <wrobell@pld-linux.org>
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+
+"""
+Dive Plan Optimizer
+-------------------
+Dive plan optimizer searches for parameters of a dive plan, which
+minimize decompression time.
+
+Gas Mix Switch Depths
+~~~~~~~~~~~~~~~~~~~~~
+Switch depths of decompression gas mixes are searched on 3m grid. The
+candidate switch depths of a gas mix are depths, where partial pressure
+of oxygen of the gas mix is within specified limits (the depths are
+rounded to whole meters first, i.e. oxygen is used at 6m with 1.6 ppO2
+limit). Gas mixes richer in oxygen are switched to at shallower depths.
+
+The descent and bottom part of the dive are calculated once and the
+ascent of each candidate is calculated from the dive step at the end of
+bottom time. The candidate with all gas mixes switched at their deepest
+switch depths is calculated first and its decompression time is the
+initial bound. The ascent of a candidate is abandoned as soon as its
+decompression time reaches the bound, so most of the candidates are
+pruned after few decompression stops.
+
+The candidates can be evaluated with a pool of processes. The
+decompression engine used by the optimizer is the template of the
+engines created to evaluate the candidates, see
+:py:mod:`decotengu.table` module documentation for details.
+
+Find switch depths of EAN50 and oxygen for 45m dive on air
+
+    >>> import decotengu
+    >>> from decotengu.optimize import optimize_switch_depths, gf_frontier
+    >>> engine = decotengu.create()
+    >>> engine.add_gas(0, 21)
+    >>> result = optimize_switch_depths(engine, 45, 25, ((50, 0), (100, 0)))
+    >>> result.gas
+    ((21, 50, 0), (6, 100, 0))
+    >>> result.plan.deco_table.total
+    16.0
+
+Gradient Factors
+~~~~~~~~~~~~~~~~
+Gradient factors frontier is the list of gradient factors pairs, which
+give total decompression time not longer than target time. For each
+gradient factor low value, the lowest gradient factor high value (with
+0.01 precision) is searched with bisection as decompression time
+decreases with gradient factor high value. The descent and bottom part
+of the dive are calculated once, the ascent of each probe is abandoned as
+soon as the target time is exceeded and the solution for previous
+gradient factor low value is upper bound of the search for the next one.
+
+Find gradient factors limiting decompression time of 50m dive to 30
+minutes
+
+    >>> engine = decotengu.create()
+    >>> engine.add_gas(0, 21)
+    >>> engine.add_gas(21, 50)
+    >>> engine.add_gas(6, 100)
+    >>> frontier = gf_frontier(engine, 50, 30, 30, gf_low=(0.2, 0.3, 0.4))
+    >>> [(p.gf_low, p.gf_high) for p in frontier]
+    [(0.2, 0.83), (0.3, 0.83), (0.4, 0.79)]
+"""
+
+from collections import namedtuple
+from multiprocessing import Pool
+import itertools
+import logging
+import math
+from time import perf_counter
+
+from .engine import DecoTable, DivePlan
+from .error import ConfigError, EngineError
+from .table import engine_config, create_engine, CHUNKS_PER_PROCESS
+
+logger = logging.getLogger(__name__)
+
+SwitchDepths = namedtuple('SwitchDepths', 'gas plan stats')
+SwitchDepths.__doc__ = """
+Result of gas mix switch depths optimization.
+
+:var gas: Decompression gas mix configuration - tuple of arguments of
+    :py:meth:`decotengu.Engine.add_gas` method calls.
+:var plan: Dive plan summary of the dive using the decompression gas
+    mixes.
+:var stats: Optimizer statistics.
+"""
+
+GFPoint = namedtuple('GFPoint', 'gf_low gf_high plan')
+GFPoint.__doc__ = """
+Point of gradient factors frontier.
+
+:var gf_low: Gradient factor low value.
+:var gf_high: Gradient factor high value.
+:var plan: Dive plan summary of the dive using the gradient factors.
+"""
+
+OptimizerStats = namedtuple('OptimizerStats', 'candidates pruned time')
+OptimizerStats.__doc__ = """
+Dive plan optimizer statistics.
+
+:var candidates: Number of candidates.
+:var pruned: Number of candidates, which calculation was abandoned.
+:var time: Time of optimization [s].
+"""
+
+
+class GFFrontier(list):
+    """
+    Gradient factors frontier.
+
+    The frontier is list of :py:class:`decotengu.optimize.GFPoint` points
+    sorted by gradient factor low value.
+
+    :var ascents: Number of calculated dive ascents.
+    """
+    def __init__(self):
+        super().__init__()
+        self.ascents = 0
+
+
+
+def optimize_switch_depths(
+        engine, depth, time, gas, ppo2=(1.0, 1.6), processes=1,
+        setup=None):
+    """
+    Find switch depths of decompression gas mixes, which minimize
+    decompression time of a dive.
+
+    The decompression gas mixes are specified as collection of `(o2, he)`
+    pairs - O2 and helium percentage. Decompression gas mixes of the
+    template engine are ignored.
+
+    If number of processes is one, then the calculation is performed in
+    current process.
+
+    :param engine: Template decompression engine with bottom and travel
+        gas mixes.
+    :param depth: Maximum depth [m].
+    :param time: Dive bottom time [min].
+    :param gas: Collection of decompression gas mixes.
+    :param ppo2: Minimal and maximal partial pressure of oxygen of
+        a decompression gas mix at its switch depth.
+    :param processes: Number of processes.
+    :param setup: Function called with each decompression engine
+        evaluating the candidates, i.e. to override engine methods.
+    """
+    t1 = perf_counter()
+
+    bottom = _bottom_step(engine, depth, time)
+    bottom_gas = engine._gas_list[0]
+
+    candidates = _candidates(engine, depth, gas, ppo2)
+    if not candidates:
+        raise ConfigError('No gas mix switch depths within ppO2 limits')
+
+    config = engine_config(engine, setup)
+    base = tuple(m for m in config.gas if len(m) > 3)
+    base += ((bottom_gas.depth, bottom_gas.o2, bottom_gas.he),)
+
+    # the first candidate provides initial bound
+    first = (config, base, bottom, math.inf, [(0, candidates[0])])
+    (k, best, plan), n_pruned = _evaluate_chunk(first)
+    bound = plan.deco_table.total
+
+    # distribute candidates evenly, so each chunk starts with good
+    # candidates
+    n = processes * CHUNKS_PER_PROCESS if processes > 1 else 1
+    rest = list(enumerate(candidates))[1:]
+    chunks = [
+        (config, base, bottom, bound, rest[i::n]) for i in range(n)
+    ]
+    chunks = [c for c in chunks if c[-1]]
+
+    if processes == 1:
+        results = list(map(_evaluate_chunk, chunks))
+    else:
+        with Pool(processes=processes) as pool:
+            results = pool.map(_evaluate_chunk, chunks)
+
+    for (i, mixes, p), pruned in results:
+        n_pruned += pruned
+        if p is not None and (p.deco_table.total, i) \
+                < (plan.deco_table.total, k):
+            k, best, plan = i, mixes, p
+
+    t2 = perf_counter()
+    stats = OptimizerStats(len(candidates), n_pruned, t2 - t1)
+    logger.info(
+        'evaluated {} candidates, pruned {} in {:.2f}s'.format(
+            stats.candidates, stats.pruned, stats.time
+        )
+    )
+    return SwitchDepths(best, plan, stats)
+
+
+def gf_frontier(engine, depth, time, target, gf_low=None, gf_high=(0.5, 1.0)):
+    """
+    Find gradient factors pairs, which limit total decompression time of
+    a dive to target time.
+
+    For each gradient factor low value, the lowest (the most
+    conservative) gradient factor high value is found, which gives total
+    decompression time not longer than the target time. Gradient factor
+    low values, for which there is no such gradient factor high value,
+    are omitted.
+
+    :param engine: Decompression engine.
+    :param depth: Maximum depth [m].
+    :param time: Dive bottom time [min].
+    :param target: Target total decompression time [min].
+    :param gf_low: Collection of gradient factor low values, 0.1 to 0.9
+        by 0.1 by default.
+    :param gf_high: Range of gradient factor high values.
+    """
+    if gf_low is None:
+        gf_low = [k / 10 for k in range(1, 10)]
+
+    bottom = _bottom_step(engine, depth, time)
+    model = engine.model
+    saved = model.gf_low, model.gf_high
+
+    frontier = GFFrontier()
+    ascents = 0
+
+    def ascent(gf_low, gf):
+        nonlocal ascents
+        ascents += 1
+        return _gf_ascent(engine, bottom, gf_low, gf / 100, target)
+
+    h_min, h_max = (round(v * 100) for v in gf_high)
+    h_end = h_max
+    try:
+        for gl in sorted(gf_low):
+            lo = max(h_min, math.ceil(round(gl * 100, 6)))
+            if lo > h_max:
+                break
+
+            # deco time decreases with gradient factor high, so previous
+            # solution is likely upper bound
+            hi = max(lo, h_end)
+            plan = ascent(gl, hi)
+            if plan is None and hi < h_max:
+                hi = h_max
+                plan = ascent(gl, hi)
+            if plan is None:
+                continue
+
+            # bisect for the lowest feasible gradient factor high;
+            # `lo - 1` is assumed to be infeasible
+            lo -= 1
+            while hi - lo > 1:
+                mid = (lo + hi) // 2
+                p = ascent(gl, mid)
+                if p is None:
+                    lo = mid
+                else:
+                    hi, plan = mid, p
+
+            h_end = hi
+            frontier.append(GFPoint(gl, hi / 100, plan))
+    finally:
+        model.gf_low, model.gf_high = saved
+
+    frontier.ascents = ascents
+    logger.info(
+        'gf frontier of {} points found with {} ascents'.format(
+            len(frontier), ascents
+        )
+    )
+    return frontier
+
+
+def _bottom_step(engine, depth, time):
+    """
+    Calculate dive step at the end of bottom time of a dive.
+
+    :param engine: Decompression engine.
+    :param depth: Maximum depth [m].
+    :param time: Dive bottom time [min].
+    """
+    engine._validate_gas_list(depth)
+    descent_gas_list, gas_list = engine._dive_gas_lists()
+    abs_p = engine._to_pressure(depth)
+    *_, step = engine._dive_descent(abs_p, descent_gas_list)
+    if time <= step.time:
+        raise EngineError('Bottom time shorter than descent time')
+    return engine._step_next(step, time - step.time, gas_list[0])
+
+
+def _candidates(engine, depth, gas, ppo2):
+    """
+    Create candidate decompression gas mix configurations.
+
+    The candidates are sorted, so the candidates with deeper gas mix
+    switch depths are first.
+
+    :param engine: Decompression engine.
+    :param depth: Maximum depth [m].
+    :param gas: Collection of decompression gas mixes.
+    :param ppo2: Minimal and maximal partial pressure of oxygen.
+    """
+    gas = sorted(gas)
+    ppo2_min, ppo2_max = ppo2
+    depths = []
+    for o2, he in gas:
+        d_min = engine._to_depth(ppo2_min * 100 / o2)
+        d_max = engine._to_depth(ppo2_max * 100 / o2)
+        d_min = max(3, math.ceil(round(d_min) / 3) * 3)
+        d_max = math.floor(min(depth, round(d_max)) / 3) * 3
+        depths.append(range(d_max, d_min - 1, -3))
+
+    candidates = [
+        tuple((d, o2, he) for d, (o2, he) in zip(c, gas))
+        for c in itertools.product(*depths)
+        if all(d1 > d2 for d1, d2 in zip(c[:-1], c[1:]))
+    ]
+    return candidates
+
+
+def _evaluate_chunk(chunk):
+    """
+    Evaluate chunk of candidate decompression gas mix configurations.
+
+    The ascent of a candidate is abandoned when its decompression time is
+    not shorter than decompression time of the best candidate found so
+    far.
+
+    A pair is returned
+
+    - tuple of index, gas mix configuration and dive plan summary of the
+      best candidate of the chunk; the dive plan summary is null if all
+      candidates are pruned
+    - number of pruned candidates
+
+    :param chunk: Chunk of candidates.
+    """
+    config, base, bottom, bound, candidates = chunk
+    engine = create_engine(config, base)
+    n = len(engine._gas_list)
+
+    best = None, None, None
+    pruned = 0
+    for i, mixes in candidates:
+        del engine._gas_list[n:]
+        for args in mixes:
+            engine.add_gas(*args)
+
+        for step in engine.extend(bottom, 0):
+            if engine.deco_table.total >= bound:
+                pruned += 1
+                break
+        else:
+            table = DecoTable(engine.deco_table)
+            bound = table.total
+            best = i, mixes, DivePlan(table, step.time, step.data)
+    return best, pruned
+
+
+def _gf_ascent(engine, bottom, gf_low, gf_high, target):
+    """
+    Calculate dive ascent with gradient factors from the dive step at the
+    end of bottom time.
+
+    Dive plan summary is returned or null if total decompression time is
+    longer than target time. The ascent is abandoned as soon as the
+    target time is exceeded.
+
+    :param engine: Decompression engine.
+    :param bottom: Dive step at the end of bottom time.
+    :param gf_low: Gradient factor low value.
+    :param gf_high: Gradient factor high value.
+    :param target: Target total decompression time [min].
+    """
+    engine.model.gf_low = gf_low
+    engine.model.gf_high = gf_high
+    step = bottom._replace(data=bottom.data._replace(gf=gf_low))
+    for step in engine.extend(step, 0):
+        if engine.deco_table.total > target:
+            return None
+    return DivePlan(DecoTable(engine.deco_table), step.time, step.data)
+
+
+# vim: sw=4:et:ai
@@ -0,0 +1,372 @@
+#
+# DecoTengu - dive decompression library.
+#
+# Copyright (C) 2013-2014 by Artur Wroblewski <wrobell@pld-linux.org>
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+
+"""
+Decompression Tables Generator
+------------------------------
+Decompression tables generator calculates decompression tables for a grid
+of dive depths, bottom times, gas mix configurations and gradient factors
+using a pool of processes.
+
+The grid is divided into units - a unit is a dive depth with all bottom
+times for given gas mix configuration and gradient factors. The units are
+calculated with :py:meth:`decotengu.Engine.calculate_many` method, so
+descent to a depth is calculated once per unit.
+
+The cost of a unit is estimated with dive depth and bottom times - the
+length of decompression grows with both. The units are sharded into chunks
+of balanced cost (the most expensive units are assigned first to the
+cheapest chunk) and the chunks are distributed to the processes of the
+pool.
+
+The decompression engine used by the generator is the template of the
+engines created by the processes. Surface pressure, ascent and descent
+rates, last decompression stop depth, decompression model, gradient
+factors, numeric kernel and gas mixes of the template engine are used.
+Other overrides of decompression engine (i.e. with
+:py:func:`decotengu.alt.solver.solver_engine` function) have to be applied
+with `setup` function, which has to be picklable when the pool has more
+than one process. The configuration of template engine is obtained with
+:py:func:`decotengu.table.engine_config` function and decompression
+engines are recreated with :py:func:`decotengu.table.create_engine`
+function, which can be used by other modules distributing dive
+calculations to a pool of processes as well.
+
+Example
+~~~~~~~
+Create decompression engine template and calculate decompression tables
+for air and EAN32 dives
+
+    >>> import decotengu
+    >>> from decotengu.table import generate
+    >>> engine = decotengu.create()
+    >>> engine.add_gas(0, 21)
+    >>> tables = generate(
+    ...     engine, (30, 40), (20, 25),
+    ...     gas=(((0, 21),), ((0, 32),)), processes=1
+    ... )
+    >>> len(tables)
+    8
+    >>> key = TableKey(((0, 21),), 0.3, 0.85, 40, 25)
+    >>> tables[key].total
+    25.0
+    >>> tables.stats.tables
+    8
+"""
+
+from collections import namedtuple, OrderedDict
+from multiprocessing import Pool
+import heapq
+import logging
+import os
+import time
+
+from .engine import Engine
+from .error import ConfigError, EngineError
+from .kernel import set_kernel
+
+logger = logging.getLogger(__name__)
+
+# number of chunks per process of the pool
+CHUNKS_PER_PROCESS = 4
+
+TableKey = namedtuple('TableKey', 'gas gf_low gf_high depth time')
+TableKey.__doc__ = """
+Decompression table key.
+
+:var gas: Gas mix configuration - tuple of arguments of
+    :py:meth:`decotengu.Engine.add_gas` method calls.
+:var gf_low: Gradient factor low parameter.
+:var gf_high: Gradient factor high parameter.
+:var depth: Maximum depth [m].
+:var time: Dive bottom time [min].
+"""
+
+TableStats = namedtuple('TableStats', 'tables errors time throughput')
+TableStats.__doc__ = """
+Decompression tables generator statistics.
+
+:var tables: Number of calculated decompression tables.
+:var errors: Number of dives, which could not be calculated.
+:var time: Time of calculation [s].
+:var throughput: Number of decompression tables calculated per second.
+"""
+
+EngineConfig = namedtuple(
+    'EngineConfig',
+    'model kernel surface_pressure ascent_rate descent_rate last_stop_6m'
+    ' gas gf setup'
+)
+EngineConfig.__doc__ = """
+Configuration of template decompression engine.
+
+The configuration can be passed to a process of a pool, so decompression
+engines can be recreated with :py:func:`decotengu.table.create_engine`
+function.
+
+:var model: Decompression model class.
+:var kernel: Name of numeric kernel of decompression model.
+:var surface_pressure: Surface pressure [bar].
+:var ascent_rate: Ascent rate [m/min].
+:var descent_rate: Descent rate [m/min].
+:var last_stop_6m: Last decompression stop at 6m flag.
+:var gas: Gas mix configuration - tuple of arguments of
+    :py:meth:`decotengu.Engine.add_gas` method calls.
+:var gf: Pair of gradient factors.
+:var setup: Function called with each created decompression engine.
+"""
+
+
+class TableSet(OrderedDict):
+    """
+    Result set of decompression tables generator.
+
+    The result set is ordered dictionary of decompression tables with
+    :py:class:`decotengu.table.TableKey` keys. The order of keys is the
+    order of grid values.
+
+    :var errors: Dictionary of error messages of dives, which could not be
+        calculated, i.e. due to bottom time shorter than descent time.
+    :var stats: Decompression tables generator statistics.
+    """
+    def __init__(self):
+        super().__init__()
+        self.errors = OrderedDict()
+        self.stats = None
+
+
+
+def generate(
+        engine, depths, times, gas=None, gf=None, processes=None,
+        chunks=None, setup=None):
+    """
+    Calculate decompression tables for a grid of dive depths, bottom
+    times, gas mix configurations and gradient factors.
+
+    The gas mix configuration is a tuple of arguments of
+    :py:meth:`decotengu.Engine.add_gas` method calls, i.e.
+    `((0, 21), (22, 50))` for air with EAN50 decompression gas mix.
+
+    If number of processes is one, then the calculation is performed in
+    current process.
+
+    :param engine: Template decompression engine.
+    :param depths: Collection of maximum dive depths [m].
+    :param times: Collection of dive bottom times [min].
+    :param gas: Collection of gas mix configurations, gas mixes of
+        template engine by default.
+    :param gf: Collection of `(gf_low, gf_high)` pairs, gradient factors
+        of template engine decompression model by default.
+    :param processes: Number of processes, number of CPUs by default.
+    :param chunks: Number of chunks, `CHUNKS_PER_PROCESS` per process by
+        default.
+    :param setup: Function called with each decompression engine created
+        by the processes, i.e. to override engine methods. The function
+        is sent to the processes of the pool, so it has to be picklable
+        (i.e. module level function) if number of processes is greater
+        than one.
+    """
+    config = engine_config(engine, setup)
+    if gas is None:
+        gas = (config.gas,)
+    if gf is None:
+        gf = (config.gf,)
+    if processes is None:
+        processes = os.cpu_count() or 1
+    if chunks is None:
+        chunks = processes * CHUNKS_PER_PROCESS
+
+    gas = [tuple(tuple(m) for m in mixes) for mixes in gas]
+    times = sorted(set(times))
+
+    units = [
+        (config, mixes, gf_pair, depth, times)
+        for mixes in gas for gf_pair in gf for depth in depths
+    ]
+
+    tables = TableSet()
+    for mixes, (gf_low, gf_high), depth, t in (
+            (u[1], u[2], u[3], t) for u in units for t in times):
+        tables[TableKey(mixes, gf_low, gf_high, depth, t)] = None
+
+    t1 = time.perf_counter()
+    shards = _shard(units, chunks)
+    logger.debug(
+        'generating {} tables in {} chunks with {} processes'.format(
+            len(tables), len(shards), processes
+        )
+    )
+
+    if processes == 1:
+        results = map(_calculate_chunk, shards)
+        _collect(tables, results)
+    else:
+        with Pool(processes=processes) as pool:
+            results = pool.imap_unordered(_calculate_chunk, shards)
+            _collect(tables, results)
+    t2 = time.perf_counter()
+
+    for key in tables.errors:
+        del tables[key]
+
+    n = len(tables)
+    t = t2 - t1
+    tables.stats = TableStats(n, len(tables.errors), t, n / t if t else 0)
+    logger.info(
+        'generated {} tables in {:.2f}s ({:.1f} tables/s)'.format(
+            n, t, tables.stats.throughput
+        )
+    )
+    return tables
+
+
+def engine_config(engine, setup=None):
+    """
+    Get configuration of template decompression engine.
+
+    Surface pressure, ascent and descent rates, last decompression stop
+    depth, decompression model, gradient factors, numeric kernel and gas
+    mixes of the template engine are used. Travel gas mixes are marked
+    with `travel` argument of :py:meth:`decotengu.Engine.add_gas` method.
+
+    :param engine: Template decompression engine.
+    :param setup: Function called with each created decompression engine.
+    """
+    model = engine.model
+    gas = tuple(
+        (m.depth, m.o2, m.he, True) for m in engine._travel_gas_list
+    )
+    gas += tuple((m.depth, m.o2, m.he) for m in engine._gas_list)
+    return EngineConfig(
+        type(model), model.kernel, engine.surface_pressure,
+        engine.ascent_rate, engine.descent_rate, engine.last_stop_6m, gas,
+        (model.gf_low, model.gf_high), setup,
+    )
+
+
+def create_engine(config, gas=None, gf=None):
+    """
+    Create decompression engine using template engine configuration.
+
+    :param config: Template decompression engine configuration.
+    :param gas: Gas mix configuration, gas mixes of template engine by
+        default.
+    :param gf: Pair of gradient factors, gradient factors of template
+        engine by default.
+    """
+    if gas is None:
+        gas = config.gas
+    if gf is None:
+        gf = config.gf
+
+    engine = Engine()
+    engine.model = config.model()
+    set_kernel(engine.model, config.kernel)
+    engine.model.gf_low, engine.model.gf_high = gf
+    engine.surface_pressure = config.surface_pressure
+    engine.ascent_rate = config.ascent_rate
+    engine.descent_rate = config.descent_rate
+    engine.last_stop_6m = config.last_stop_6m
+    for args in gas:
+        engine.add_gas(*args)
+    if config.setup is not None:
+        config.setup(engine)
+    return engine
+
+
+def _cost(unit):
+    """
+    Estimate cost of calculation of a unit of decompression tables grid.
+
+    The length of decompression, which dominates the cost, grows with dive
+    depth and bottom time.
+
+    :param unit: Unit of decompression tables grid.
+    """
+    depth, times = unit[3], unit[4]
+    return sum(1 + depth * t / 100 for t in times)
+
+
+def _shard(units, n):
+    """
+    Shard units of decompression tables grid into chunks of balanced
+    cost.
+
+    The most expensive units are assigned to the cheapest chunk first.
+    Empty chunks are not returned.
+
+    :param units: Units of decompression tables grid.
+    :param n: Number of chunks.
+    """
+    heap = [(0, i, []) for i in range(max(1, n))]
+    for unit in sorted(units, key=_cost, reverse=True):
+        cost, i, chunk = heapq.heappop(heap)
+        chunk.append(unit)
+        heapq.heappush(heap, (cost + _cost(unit), i, chunk))
+    return [chunk for _, _, chunk in sorted(heap, key=lambda v: v[1]) if chunk]
+
+
+def _calculate_chunk(chunk):
+    """
+    Calculate decompression tables of a chunk of decompression tables
+    grid.
+
+    List of pairs is returned - decompression table key and decompression
+    table or error message.
+
+    :param chunk: Chunk of decompression tables grid.
+    """
+    engines = {}
+    results = []
+    for config, gas, gf, depth, times in chunk:
+        if (gas, gf) not in engines:
+            engines[gas, gf] = create_engine(config, gas, gf)
+        engine = engines[gas, gf]
+
+        key = lambda t: TableKey(gas, gf[0], gf[1], depth, t)
+        try:
+            tables = engine.calculate_many((depth, t) for t in times)
+            results.extend((key(t), v) for (_, t), v in tables.items())
+        except (ConfigError, EngineError):
+            # calculate dives separately to find the failing ones
+            for t in times:
+                try:
+                    tables = engine.calculate_many([(depth, t)])
+                    results.append((key(t), tables[depth, t]))
+                except (ConfigError, EngineError) as ex:
+                    results.append((key(t), str(ex)))
+    return results
+
+
+def _collect(tables, results):
+    """
+    Collect results of calculation of decompression tables grid chunks.
+
+    :param tables: Decompression tables result set.
+    :param results: Iterator of chunks results.
+    """
+    for chunk in results:
+        for key, value in chunk:
+            if isinstance(value, str):
+                tables.errors[key] = value
+            else:
+                tables[key] = value
+
+
+# vim: sw=4:et:ai
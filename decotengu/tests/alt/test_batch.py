@@ -0,0 +1,123 @@
+#
+# DecoTengu - dive decompression library.
+#
+# Copyright (C) 2013-2014 by Artur Wroblewski <wrobell@pld-linux.org>
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+
+"""
+Batched first decompression stop search tests.
+"""
+
+from decotengu.engine import Engine, Phase, GasMix
+from decotengu.alt.batch import BatchFindFirstStop, batch_engine
+
+from ..tools import _step, _engine, AIR
+
+import unittest
+from unittest import mock
+
+TX1845 = GasMix(0, 18, 37, 45)
+
+
+class BatchFindFirstStopTestCase(unittest.TestCase):
+    """
+    Batched first decompression stop search tests.
+    """
+    def setUp(self):
+        """
+        Create decompression engine and batched first decompression stop
+        search.
+        """
+        self.engine = _engine()
+        self.model = self.engine.model
+        self.batch = BatchFindFirstStop(self.engine)
+
+
+    def _data(self, gas, abs_p, time):
+        """
+        Create decompression model data after a dive.
+        """
+        data = self.model.init(1.0)
+        return self.model.load(abs_p, time, gas, 0, data)
+
+
+    def test_first_stop(self):
+        """
+        Test batched first decompression stop search with engine algorithm
+        """
+        engine = self.engine
+        for gas, abs_p in ((AIR, 4.0), (AIR, 5.5), (TX1845, 10.0)):
+            for time in (5, 20, 60):
+                data = self._data(gas, abs_p, time)
+                start = _step(Phase.CONST, abs_p, time, gas=gas, data=data)
+                for target in (1.0, 2.2, 3.1):
+                    stop = self.batch(start, target, gas)
+                    expected = Engine._find_first_stop(
+                        engine, start, target, gas
+                    )
+                    self.assertEqual(expected.abs_p, stop.abs_p)
+                    self.assertEqual(expected.time, stop.time)
+                    self.assertAlmostEqual(
+                        engine.model.ceiling_limit(expected.data),
+                        engine.model.ceiling_limit(stop.data)
+                    )
+
+
+    def test_first_stop_at_depth(self):
+        """
+        Test batched first decompression stop search when starting depth is deco stop
+        """
+        data = self._data(AIR, 4.0, 60)
+        start = _step(Phase.CONST, 2.2, 60, data=data)
+        self.model.load_many = mock.MagicMock()
+
+        stop = self.batch(start, 1.0, AIR)
+        self.assertIs(start, stop)
+        self.assertFalse(self.model.load_many.called)
+
+
+    def test_first_stop_batch(self):
+        """
+        Test batched first decompression stop search loads candidates at once
+        """
+        data = self._data(AIR, 4.0, 20)
+        start = _step(Phase.CONST, 4.0, 20, data=data)
+        load_many = self.model.load_many
+        self.model.load_many = mock.MagicMock(side_effect=load_many)
+
+        stop = self.batch(start, 1.0, AIR)
+        self.assertEqual(1, self.model.load_many.call_count)
+
+        # candidates between ascent ceiling limit and the surface
+        limit = self.engine._ceil_pressure_3m(
+            self.model.ceiling_limit(data)
+        )
+        n = self.engine._n_stops(limit) + 1
+        args = self.model.load_many.call_args[0]
+        self.assertEqual(n, len(args[1]))
+        self.assertTrue(all(t > 0 for t in args[1]))
+        self.assertTrue(stop.abs_p <= limit)
+
+
+    def test_batch_engine(self):
+        """
+        Test overriding decompression engine with batched first stop search
+        """
+        batch_engine(self.engine)
+        self.assertIsInstance(self.engine._find_first_stop, BatchFindFirstStop)
+
+
+# vim: sw=4:et:ai
@@ -0,0 +1,178 @@
+#
+# DecoTengu - dive decompression library.
+#
+# Copyright (C) 2013-2014 by Artur Wroblewski <wrobell@pld-linux.org>
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+
+"""
+Ascent cache tests.
+"""
+
+from decotengu.engine import Phase, DecoStop
+from decotengu.alt.cache import AscentCache, cache_engine
+
+from ..tools import _step, _engine, AIR, EAN50
+
+import unittest
+from unittest import mock
+
+
+class AscentCacheTestCase(unittest.TestCase):
+    """
+    Ascent cache tests.
+    """
+    def setUp(self):
+        """
+        Create decompression engine and ascent cache.
+        """
+        self.engine = engine = _engine(air=True)
+        self.steps = [
+            _step(Phase.ASCENT, 3.7, 31), _step(Phase.DECO_STOP, 3.7, 32),
+            _step(Phase.ASCENT, 1.0, 36),
+        ]
+
+        def ascent(start, gas_list):
+            for step in self.steps:
+                if step.phase == Phase.DECO_STOP:
+                    engine.deco_table.append(27, 1)
+                yield step
+
+        engine._dive_ascent = mock.MagicMock(side_effect=ascent)
+        self.cache = AscentCache(engine, size=2)
+
+
+    def _start(self, time=30, pressure=2.5):
+        """
+        Create starting dive step.
+        """
+        data = self.engine.model.init(1.0)
+        data = data._replace(tissues=((pressure, 0.0),) * 16)
+        return _step(Phase.CONST, 4.0, time, data=data)
+
+
+    def test_miss(self):
+        """
+        Test ascent cache miss
+        """
+        steps = list(self.cache(self._start(), [AIR]))
+        self.assertEqual(self.steps, steps)
+        self.assertEqual([DecoStop(27, 1)], self.engine.deco_table)
+        self.assertEqual((0, 1), (self.cache.hits, self.cache.misses))
+        self.assertEqual(1, len(self.cache))
+
+
+    def test_hit(self):
+        """
+        Test ascent cache hit
+        """
+        engine = self.engine
+        list(self.cache(self._start(), [AIR]))
+        del engine.deco_table[:]
+
+        steps = list(self.cache(self._start(), [AIR]))
+        self.assertEqual(self.steps, steps)
+        self.assertEqual([DecoStop(27, 1)], engine.deco_table)
+        self.assertEqual(1, engine._dive_ascent.call_count)
+        self.assertEqual((1, 1), (self.cache.hits, self.cache.misses))
+        self.assertEqual(0.5, self.cache.hit_rate)
+
+
+    def test_hit_time(self):
+        """
+        Test ascent cache hit with different time of starting dive step
+        """
+        list(self.cache(self._start(), [AIR]))
+        steps = list(self.cache(self._start(time=40), [AIR]))
+        self.assertEqual([41, 42, 46], [s.time for s in steps])
+        self.assertEqual(1, self.cache.hits)
+
+
+    def test_quantum(self):
+        """
+        Test ascent cache key quantization of inert gas pressure values
+        """
+        key = lambda p: self.cache.key(self._start(pressure=p), [AIR])
+        self.assertEqual(key(2.5), key(2.5 + 1e-14))
+        self.assertNotEqual(key(2.5), key(2.5 + 1e-9))
+
+        self.cache.quantum = 1e-6
+        self.assertEqual(key(2.5), key(2.5 + 1e-9))
+
+
+    def test_key_config(self):
+        """
+        Test ascent cache key depends on gas mixes and engine configuration
+        """
+        cache = self.cache
+        start = self._start()
+        key = cache.key(start, [AIR])
+        self.assertNotEqual(key, cache.key(start, [AIR, EAN50]))
+
+        self.engine.model.gf_high = 0.9
+        self.assertNotEqual(key, cache.key(start, [AIR]))
+
+        key = cache.key(start, [AIR])
+        self.engine.model.water_vapour_pressure = 0.0493
+        self.assertNotEqual(key, cache.key(start, [AIR]))
+
+
+    def test_partial(self):
+        """
+        Test ascent cache skips partially calculated ascent
+        """
+        it = self.cache(self._start(), [AIR])
+        next(it)
+        self.assertEqual(0, len(self.cache))
+
+
+    def test_eviction(self):
+        """
+        Test ascent cache removes least recently used ascent
+        """
+        cache = self.cache
+        for p in (2.5, 2.6, 2.5, 2.7):
+            list(cache(self._start(pressure=p), [AIR]))
+
+        self.assertEqual(2, len(cache))
+        keys = [cache.key(self._start(pressure=p), [AIR]) for p in (2.5, 2.7)]
+        self.assertEqual(keys, list(cache._cache))
+
+
+    def test_clear(self):
+        """
+        Test clearing ascent cache
+        """
+        cache = self.cache
+        list(cache(self._start(), [AIR]))
+        list(cache(self._start(), [AIR]))
+        cache.clear()
+        self.assertEqual(0, len(cache))
+        self.assertEqual((0, 0), (cache.hits, cache.misses))
+        self.assertEqual(0, cache.hit_rate)
+
+
+    def test_cache_engine(self):
+        """
+        Test overriding decompression engine with ascent cache
+        """
+        ascent = self.engine._dive_ascent
+        cache_engine(self.engine, size=8)
+        self.assertIsInstance(self.engine._dive_ascent, AscentCache)
+        self.assertEqual(8, self.engine._dive_ascent.size)
+        self.assertIs(ascent, self.engine._dive_ascent._ascent)
+
+
+# vim: sw=4:et:ai
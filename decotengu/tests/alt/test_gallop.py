@@ -0,0 +1,205 @@
+#
+# DecoTengu - dive decompression library.
+#
+# Copyright (C) 2013-2014 by Artur Wroblewski <wrobell@pld-linux.org>
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+
+"""
+Decompression stop galloping search tests.
+"""
+
+from decotengu import trace
+from decotengu.engine import Engine, Phase, GasMix
+from decotengu.alt.gallop import DecoStopGallop, gallop_engine
+
+from ..tools import _step, _engine, AIR
+
+import unittest
+from unittest import mock
+
+TX1845 = GasMix(0, 18, 37, 45)
+EAN50 = GasMix(0, 50, 50, 0)
+
+
+class DecoStopGallopTestCase(unittest.TestCase):
+    """
+    Decompression stop galloping search tests.
+    """
+    def setUp(self):
+        """
+        Create decompression engine and decompression stop galloping
+        search.
+        """
+        self.engine = _engine()
+        self.model = self.engine.model
+        self.gallop = DecoStopGallop(self.engine)
+
+
+    def _data(self, gas, abs_p=4.0, time=30):
+        """
+        Create decompression model data after a dive.
+        """
+        data = self.model.init(1.0)
+        return self.model.load(abs_p, time, gas, 0, data)
+
+
+    def test_deco_stop(self):
+        """
+        Test decompression stop galloping search with engine algorithm
+        """
+        for gas, abs_p in ((AIR, 4.0), (TX1845, 6.0)):
+            data = self._data(gas, abs_p)
+            start = _step(Phase.ASCENT, 1.9, 20, gas=EAN50, data=data)
+            for gf in (0.3, 0.4, 0.6, 0.85):
+                step = self.gallop(start, 0.3, EAN50, gf)
+                expected = Engine._deco_stop(
+                    self.engine, start, 0.3, EAN50, gf
+                )
+                self.assertEqual(expected, step)
+
+
+    def test_deco_stop_1min(self):
+        """
+        Test decompression stop galloping search for 1 minute stop
+        """
+        self.engine._can_ascend = mock.MagicMock(return_value=True)
+        start = _step(Phase.ASCENT, 1.9, 20, data=self._data(AIR))
+
+        step = self.gallop(start, 0.3, AIR, 0.3)
+        self.assertEqual(Phase.DECO_STOP, step.phase)
+        self.assertEqual(21, step.time)
+        self.assertEqual(1, self.engine._can_ascend.call_count)
+
+
+    def test_deco_stop_search(self):
+        """
+        Test decompression stop galloping search steps
+        """
+        engine = self.engine
+        # track time of decompression stop with gradient factor value of
+        # decompression model data
+        data = self._data(AIR)._replace(gf=0)
+        start = _step(Phase.ASCENT, 1.9, 20, data=data)
+
+        times = []
+        def load(abs_p, time, gas, data):
+            t = data.gf + time
+            times.append(t)
+            return data._replace(gf=t)
+
+        # ascent possible after 12 minutes
+        engine._tissue_pressure_const = load
+        engine._can_ascend = lambda abs_p, time, data, gf: data.gf >= 12
+
+        step = self.gallop(start, 0.3, AIR, 0.3)
+
+        self.assertEqual(32, step.time)
+        # 1 minute, galloping: 2, 4, 8, 16; bisect: 12, 10, 11
+        self.assertEqual([1, 2, 4, 8, 16, 12, 10, 11], times[:-1])
+
+
+    def test_deco_stop_trace(self):
+        """
+        Test decompression stop galloping search result event
+        """
+        data = self._data(AIR)
+        start = _step(Phase.ASCENT, 1.9, 20, gas=EAN50, data=data)
+        events = []
+        with trace.subscribed(events.append):
+            step = self.gallop(start, 0.3, EAN50, 0.4)
+
+        event, = [e for e in events if isinstance(e, trace.StopSearch)]
+        self.assertEqual(
+            trace.StopSearch(1.9, step.time - start.time, EAN50, 0.4), event
+        )
+
+
+    def test_deco_stop_hint(self):
+        """
+        Test decompression stop galloping search with predicted stop length
+        """
+        for gas, abs_p in ((AIR, 4.0), (TX1845, 6.0)):
+            data = self._data(gas, abs_p)
+            start = _step(Phase.ASCENT, 1.9, 20, gas=EAN50, data=data)
+            for gf in (0.3, 0.4, 0.6, 0.85):
+                for hint in (1, 2, 3, 5, 8, 13, 30):
+                    step = self.gallop(start, 0.3, EAN50, gf, hint=hint)
+                    expected = Engine._deco_stop(
+                        self.engine, start, 0.3, EAN50, gf
+                    )
+                    self.assertEqual(expected.time, step.time, hint)
+                    self.assertEqual(expected.data, step.data, hint)
+
+
+    def _search(self, hint, stop=12):
+        """
+        Perform decompression stop galloping search with tracked stop
+        length and return times of tissue loading calls.
+        """
+        engine = self.engine
+        data = self._data(AIR)._replace(gf=0)
+        start = _step(Phase.ASCENT, 1.9, 20, data=data)
+
+        times = []
+        def load(abs_p, time, gas, data):
+            t = data.gf + time
+            times.append(t)
+            return data._replace(gf=t)
+
+        engine._tissue_pressure_const = load
+        engine._can_ascend = lambda abs_p, time, data, gf: data.gf >= stop
+
+        step = self.gallop(start, 0.3, AIR, 0.3, hint=hint)
+        self.assertEqual(20 + stop, step.time)
+        return times
+
+
+    def test_deco_stop_hint_exact(self):
+        """
+        Test decompression stop galloping search with exact prediction
+        """
+        # predicted length and a minute before
+        self.assertEqual([12, 11], self._search(12))
+
+
+    def test_deco_stop_hint_short(self):
+        """
+        Test decompression stop galloping search with too short prediction
+        """
+        # predicted length, galloping from it: 12, 14; bisect: 13
+        times = self._search(11, stop=14)
+        self.assertEqual([11, 12, 14, 13], times[:-1])
+
+
+    def test_deco_stop_hint_long(self):
+        """
+        Test decompression stop galloping search with too long prediction
+        """
+        # predicted length, a minute before; bisect in (0, 11]: 6, 3, 5, 4
+        times = self._search(12, stop=4)
+        self.assertEqual([12, 11, 6, 3, 5, 4], times[:-1])
+
+
+    def test_gallop_engine(self):
+        """
+        Test overriding decompression engine with galloping search
+        """
+        gallop_engine(self.engine, start=2)
+        self.assertIsInstance(self.engine._deco_stop, DecoStopGallop)
+        self.assertEqual(2, self.engine._deco_stop.start)
+
+
+# vim: sw=4:et:ai
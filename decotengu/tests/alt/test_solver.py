@@ -0,0 +1,158 @@
+#
+# DecoTengu - dive decompression library.
+#
+# Copyright (C) 2013-2014 by Artur Wroblewski <wrobell@pld-linux.org>
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+
+"""
+Decompression stop solver tests.
+"""
+
+from decotengu import trace
+from decotengu.engine import Engine, Phase, GasMix
+from decotengu.alt.naive import DecoStopStepper
+from decotengu.alt.solver import DecoStopSolver, solver_engine
+
+from ..tools import _step, _engine, AIR
+
+import unittest
+from unittest import mock
+
+TX1845 = GasMix(0, 18, 37, 45)
+EAN50 = GasMix(0, 50, 50, 0)
+
+
+class DecoStopSolverTestCase(unittest.TestCase):
+    """
+    Decompression stop solver tests.
+    """
+    def setUp(self):
+        """
+        Create decompression engine and decompression stop solver.
+        """
+        self.engine = _engine()
+        self.model = self.engine.model
+        self.solver = DecoStopSolver(self.engine)
+
+
+    def _data(self, gas, abs_p=4.0, time=30):
+        """
+        Create decompression model data after a dive.
+        """
+        data = self.model.init(1.0)
+        return self.model.load(abs_p, time, gas, 0, data)
+
+
+    def test_nitrox_time(self):
+        """
+        Test decompression stop time calculation for nitrox
+        """
+        data = self._data(AIR)
+        t = self.solver.stop_time(1.9, 1.6, EAN50, 0.4, data)
+        self.assertTrue(t > 0)
+
+        data = self.model.load(1.9, t, EAN50, 0, data)
+        limit = self.model.ceiling_limit(data, 0.4)
+        self.assertAlmostEqual(1.6, limit, 6)
+
+
+    def test_trimix_time(self):
+        """
+        Test decompression stop time calculation for trimix
+        """
+        data = self._data(TX1845, 6.0)
+        t = self.solver.stop_time(2.5, 2.2, EAN50, 0.4, data)
+        self.assertTrue(t > 0)
+
+        data = self.model.load(2.5, t, EAN50, 0, data)
+        limit = self.model.ceiling_limit(data, 0.4)
+        self.assertAlmostEqual(2.2, limit, 6)
+
+
+    def test_no_stop_time(self):
+        """
+        Test decompression stop time calculation when ascent is possible
+        """
+        data = self._data(TX1845, 1.5, 5)
+        t = self.solver.stop_time(1.3, 1.0, TX1845, 0.85, data)
+        self.assertEqual(0, t)
+
+
+    def test_infinite_time(self):
+        """
+        Test decompression stop time calculation when ascent is not possible
+        """
+        data = self._data(AIR, 4.0)
+        t = self.solver.stop_time(4.0, 1.0, AIR, 0.1, data)
+        self.assertEqual(float('inf'), t)
+
+
+    def test_deco_stop(self):
+        """
+        Test decompression stop solver with stepper
+        """
+        stepper = DecoStopStepper(self.engine)
+
+        for gas, abs_p in ((AIR, 4.0), (TX1845, 6.0)):
+            data = self._data(gas, abs_p)
+            start = _step(Phase.ASCENT, 1.9, 20, gas=EAN50, data=data)
+            for gf in (0.3, 0.4, 0.6, 0.85):
+                step = self.solver(start, 0.3, EAN50, gf)
+                expected = stepper(start, 0.3, EAN50, gf)
+                self.assertEqual(Phase.DECO_STOP, step.phase)
+                self.assertEqual(expected.time, step.time)
+                self.assertEqual(expected.abs_p, step.abs_p)
+
+
+    def test_deco_stop_trace(self):
+        """
+        Test decompression stop solver search result event
+        """
+        data = self._data(AIR)
+        start = _step(Phase.ASCENT, 1.9, 20, gas=EAN50, data=data)
+        events = []
+        with trace.subscribed(events.append):
+            step = self.solver(start, 0.3, EAN50, 0.4)
+
+        event, = [e for e in events if isinstance(e, trace.StopSearch)]
+        self.assertEqual(
+            trace.StopSearch(1.9, step.time - start.time, EAN50, 0.4), event
+        )
+
+
+    @mock.patch.object(Engine, '_deco_stop')
+    def test_deco_stop_fallback(self, f):
+        """
+        Test decompression stop solver fallback to engine algorithm
+        """
+        data = self._data(AIR, 4.0)
+        start = _step(Phase.ASCENT, 4.0, 20, data=data)
+        f.return_value = mock.sentinel.step
+
+        step = self.solver(start, 3, AIR, 0.1)
+        self.assertIs(mock.sentinel.step, step)
+        f.assert_called_once_with(self.engine, start, 3, AIR, 0.1)
+
+
+    def test_solver_engine(self):
+        """
+        Test overriding decompression engine with decompression stop solver
+        """
+        solver_engine(self.engine)
+        self.assertIsInstance(self.engine._deco_stop, DecoStopSolver)
+
+
+# vim: sw=4:et:ai
@@ -89,12 +89,14 @@ class TabOverrideTestCase(unittest.TestCase):
         engine = _engine()
         engine.descent_rate = 30
         engine.ascent_rate = 15
+        engine.model._exp_cache(1)
 
         tab_engine(engine)
 
         self.assertEqual(10, engine.descent_rate)
         self.assertEqual(10, engine.ascent_rate)
         self.assertTrue(isinstance(engine.model._exp, TabExp))
+        self.assertEqual(0, len(engine.model._exp_cache))
 
 
 # vim: sw=4:et:ai
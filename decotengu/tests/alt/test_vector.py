@@ -0,0 +1,208 @@
+#
+# DecoTengu - dive decompression library.
+#
+# Copyright (C) 2013-2014 by Artur Wroblewski <wrobell@pld-linux.org>
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+
+"""
+Vectorized calculator tests.
+"""
+
+from decotengu.model import ZH_L16B_GF
+from decotengu.engine import GasMix
+from decotengu.alt.vector import np, VectorCalculator, vector_engine
+
+from ..tools import _engine, AIR
+
+import unittest
+
+TX1845 = GasMix(0, 18, 37, 45)
+
+
+@unittest.skipIf(np is None, 'NumPy not installed')
+class VectorCalculatorTestCase(unittest.TestCase):
+    """
+    Vectorized calculator tests.
+    """
+    def setUp(self):
+        """
+        Create vectorized calculator and decompression model.
+        """
+        self.model = ZH_L16B_GF()
+        self.calc = VectorCalculator(self.model)
+
+
+    def _check(self, abs_p, time, gas, rate, data):
+        """
+        Compare vectorized calculator results with decompression model
+        results.
+        """
+        expected = self.model.load(abs_p, time, gas, rate, data)
+        result = self.calc.load(abs_p, time, gas, rate, data)
+
+        self.assertEqual(expected.gf, result.gf)
+        self.assertEqual(len(expected.tissues), len(result.tissues))
+        for (n2_v1, he_v1), (n2_v2, he_v2) in zip(expected.tissues, result.tissues):
+            self.assertTrue(abs(n2_v1 - n2_v2) < 1e-10, (n2_v1, n2_v2))
+            self.assertTrue(abs(he_v1 - he_v2) < 1e-10, (he_v1, he_v2))
+        return result
+
+
+    def test_k_const(self):
+        """
+        Test vectorized calculator gas decay constants
+        """
+        k = self.calc._k_const
+        self.assertEqual((16, 2), k.shape)
+        self.assertEqual(self.model.n2_k_const, tuple(k[:, 0]))
+        self.assertEqual(self.model.he_k_const, tuple(k[:, 1]))
+
+
+    def test_load_descent(self):
+        """
+        Test vectorized tissue loading (descent)
+        """
+        data = self.model.init(1.01325)
+        self._check(1.01325, 1.5, AIR, 2, data)
+
+
+    def test_load_const(self):
+        """
+        Test vectorized tissue loading (constant depth)
+        """
+        data = self.model.init(1.01325)
+        data = self._check(1.01325, 1.5, TX1845, 2, data)
+        self._check(4.0, 20, TX1845, 0, data)
+
+
+    def test_load_ascent(self):
+        """
+        Test vectorized tissue loading (ascent)
+        """
+        data = self.model.init(1.01325)
+        data = self.model.load(1.01325, 3, TX1845, 2, data)
+        data = self.model.load(7.0, 20, TX1845, 0, data)
+        self._check(7.0, 3, AIR, -1, data)
+
+
+    def test_load_many(self):
+        """
+        Test vectorized tissue loading of multiple decompression model data
+        """
+        m = self.model
+        d1 = m.init(1.01325)
+        d2 = m.load(1.01325, 3, TX1845, 2, d1)
+        d3 = m.load(7.0, 20, TX1845, 0, d2)
+
+        args = (
+            (1.01325, 4.0, 7.0), (1.5, 20, 3), (AIR, TX1845, AIR),
+            (2, 0, -1), (d1, d2, d3),
+        )
+        expected = m.load_many(*args)
+        result = self.calc.load_many(*args)
+
+        self.assertEqual(3, len(result))
+        for r, e in zip(result, expected):
+            self.assertEqual(e.gf, r.gf)
+            for v1, v2 in zip(e._tissues, r._tissues):
+                self.assertTrue(abs(v1 - v2) < 1e-10, (v1, v2))
+
+
+    def test_load_many_empty(self):
+        """
+        Test vectorized tissue loading of empty collection of data
+        """
+        self.assertEqual([], self.calc.load_many((), (), (), (), ()))
+
+
+    def test_load_stack(self):
+        """
+        Test vectorized tissue loading of stack of tissues gas loading
+        """
+        data = self.model.init(1.01325)
+        stack = np.array([data._tissues] * 2)
+        result = self.calc.load_stack(
+            (4.0, 4.0), (1, 2), ((0.79, 0), (0.79, 0)), (0, 0), stack
+        )
+        self.assertEqual((2, 32), result.shape)
+        self.assertTrue(np.all(result[1, ::2] > result[0, ::2]))
+        self.assertTrue(np.all(result[:, 1::2] == 0))
+
+
+    def test_gf_limit(self):
+        """
+        Test vectorized gradient factor limit calculation
+        """
+        m = self.model
+        data = m.init(1.01325)
+        data = m.load(1.01325, 3, TX1845, 2, data)
+        data = m.load(7.0, 20, TX1845, 0, data)
+
+        for gf in (None, 0.3, 0.85, 1.0):
+            expected = m.gf_limit(gf, data)
+            result = self.calc.gf_limit(gf, data)
+            self.assertEqual(16, len(result))
+            for v1, v2 in zip(expected, result):
+                self.assertTrue(abs(v1 - v2) < 1e-10, (v1, v2))
+
+
+    def test_leading_tissue(self):
+        """
+        Test vectorized ceiling limit and leading tissue compartment
+        """
+        m = self.model
+        data = m.init(1.01325)
+        data = m.load(7.0, 20, AIR, 0, data)
+
+        limit, no = m.leading_tissue(data, 0.3)
+        v_limit, v_no = self.calc.leading_tissue(data, 0.3)
+        self.assertEqual(no, v_no)
+        self.assertTrue(abs(limit - v_limit) < 1e-10)
+        self.assertEqual(v_limit, self.calc.ceiling_limit(data, 0.3))
+
+
+    def test_ceiling_stack(self):
+        """
+        Test vectorized ceiling calculation for stack of tissues with gf per row
+        """
+        m = self.model
+        d1 = m.load(7.0, 20, AIR, 0, m.init(1.01325))
+        d2 = m.load(5.0, 30, TX1845, 0, m.init(1.01325))
+        stack = np.array([d1._tissues, d2._tissues])
+
+        result = self.calc.ceiling_stack((0.3, 0.8), stack)
+        self.assertEqual((2, 16), result.shape)
+        for row, gf, data in zip(result, (0.3, 0.8), (d1, d2)):
+            expected = m.gf_limit(gf, data)
+            self.assertTrue(np.allclose(expected, row, atol=1e-10, rtol=0))
+
+
+    def test_vector_engine(self):
+        """
+        Test overriding decompression engine with vectorized calculator
+        """
+        engine = _engine()
+        vector_engine(engine)
+        self.assertIsInstance(engine.model.load.__self__, VectorCalculator)
+        self.assertIsInstance(
+            engine.model.load_many.__self__, VectorCalculator
+        )
+        self.assertIsInstance(
+            engine.model.ceiling_limit.__self__, VectorCalculator
+        )
+
+
+# vim: sw=4:et:ai
@@ -0,0 +1,105 @@
+#
+# DecoTengu - dive decompression library.
+#
+# Copyright (C) 2013-2014 by Artur Wroblewski <wrobell@pld-linux.org>
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+
+"""
+Batched first decompression stop search integration tests.
+"""
+
+from decotengu import create
+from decotengu.alt.batch import batch_engine
+
+from . import test_engine as te
+
+import unittest
+
+
+class EngineTest(te.EngineTest):
+    """
+    Abstract class for all DecoTengu engine test cases.
+    """
+    def _engine(self, *args, **kw):
+        engine = create(*args, **kw)
+        batch_engine(engine)
+        return engine
+
+
+
+# copy main test cases for DecoTengu engine
+class EngineTestCase(EngineTest, te.EngineTestCase):
+    pass
+
+
+class NDLTestCase(EngineTest, te.NDLTestCase):
+    pass
+
+
+class ProfileTestCase(EngineTest, te.ProfileTestCase):
+    pass
+
+
+
+class StepsTestCase(unittest.TestCase):
+    """
+    Dive steps of batched first decompression stop search engine
+    comparison tests.
+    """
+    def _steps(self, batch, depth, time, gas, gf):
+        """
+        Calculate dive steps with default or batched engine.
+        """
+        engine = create()
+        if batch:
+            batch_engine(engine)
+        engine.model.gf_low, engine.model.gf_high = gf
+        for args in gas:
+            if args[0] <= depth:
+                engine.add_gas(*args)
+        steps = [s[:4] for s in engine.calculate(depth, time)]
+        return steps, list(engine.deco_table)
+
+
+    def _check(self, gas, gf, depths):
+        """
+        Check dive steps calculated by default and batched engines are
+        equal.
+        """
+        for depth in depths:
+            for time in (10, 20, 35, 60):
+                expected = self._steps(False, depth, time, gas, gf)
+                result = self._steps(True, depth, time, gas, gf)
+                self.assertEqual(expected, result, (depth, time))
+
+
+    def test_trimix(self):
+        """
+        Test dive steps of batched engine for trimix dives
+        """
+        gas = (0, 18, 45), (22, 50), (6, 100)
+        self._check(gas, (0.3, 0.85), range(45, 91, 3))
+
+
+    def test_deepstop(self):
+        """
+        Test dive steps of batched engine for dives with deep stops
+        """
+        gas = (0, 13, 50), (33, 36), (21, 50), (9, 80)
+        self._check(gas, (0.2, 0.75), range(45, 91, 3))
+
+
+# vim: sw=4:et:ai
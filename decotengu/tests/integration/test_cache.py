@@ -0,0 +1,67 @@
+#
+# DecoTengu - dive decompression library.
+#
+# Copyright (C) 2013-2014 by Artur Wroblewski <wrobell@pld-linux.org>
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+
+"""
+Ascent cache integration tests.
+"""
+
+from decotengu import create
+from decotengu.alt.cache import cache_engine
+
+from . import test_engine as te
+
+
+class EngineTest(te.EngineTest):
+    """
+    Abstract class for all DecoTengu engine test cases.
+    """
+    def _engine(self, *args, **kw):
+        engine = create(*args, **kw)
+        cache_engine(engine)
+        return engine
+
+
+
+# copy main test cases for DecoTengu engine
+class EngineTestCase(EngineTest, te.EngineTestCase):
+    def test_cache_hit(self):
+        """
+        Test ascent cache hit results
+        """
+        engine = self.engine
+        engine.add_gas(0, 21)
+        engine.add_gas(24, 50)
+
+        profile = list(engine.calculate(45, 25))
+        table = list(engine.deco_table)
+        self.assertEqual(profile, list(engine.calculate(45, 25)))
+        self.assertEqual(table, engine.deco_table)
+        self.assertEqual(1, engine._dive_ascent.hits)
+
+
+
+class NDLTestCase(EngineTest, te.NDLTestCase):
+    pass
+
+
+class ProfileTestCase(EngineTest, te.ProfileTestCase):
+    pass
+
+
+# vim: sw=4:et:ai
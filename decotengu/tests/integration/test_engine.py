@@ -25,8 +25,10 @@ import itertools
 from pprint import pformat
 
 from decotengu import create
+from decotengu.engine import Phase
 
 import unittest
+from unittest import mock
 
 
 class EngineTest(unittest.TestCase):
@@ -96,6 +98,41 @@ class EngineTestCase(EngineTest):
             self.assertEquals(times[depth], dt.total, msg)
 
 
+    def test_gas_switch_at_bottom_depth(self):
+        """
+        Test deco engine with gas mix switch depth rounded to dive depth
+
+        The gas mix switch depth rounded up to multiply of 3m is not
+        shallower than dive depth.
+        """
+        for depth in (23, 24):
+            engine = self._engine()
+            engine.add_gas(0, 21)
+            engine.add_gas(22, 50)
+            data = list(engine.calculate(depth, 40))
+
+            gas = [s.gas.o2 for s in data if s.phase == Phase.GAS_SWITCH]
+            self.assertEquals([50], gas, 'depth={}'.format(depth))
+            self.assertTrue(engine.deco_table.total > 0)
+
+
+    def test_gas_switch_at_first_stop(self):
+        """
+        Test deco engine with gas mix switch at first decompression stop
+
+        The gas mix switch is performed once.
+        """
+        engine = self.engine
+        engine.add_gas(0, 18, 45)
+        engine.add_gas(21, 50)
+        data = list(engine.calculate(42, 20))
+
+        steps = [s for s in data if s.phase == Phase.GAS_SWITCH]
+        self.assertEqual(1, len(steps))
+        self.assertEqual(50, steps[0].gas.o2)
+        self.assertAlmostEqual(21, engine._to_depth(steps[0].abs_p))
+
+
     def test_dive_with_travel_gas(self):
         """
         Test a dive with travel gas mix
@@ -160,6 +197,122 @@ class EngineTestCase(EngineTest):
         self.assertEquals(14, t)
 
 
+    def test_calculate_many(self):
+        """
+        Test calculation of decompression tables for a grid of dives
+        """
+        engine = self.engine
+        engine.add_gas(0, 21)
+        engine.add_gas(22, 50)
+        engine.add_gas(6, 100)
+
+        grid = [(d, t) for d in (30, 39, 45) for t in (15, 25, 35)]
+        tables = engine.calculate_many(grid)
+        self.assertEqual(grid, list(tables))
+        for (depth, time), table in tables.items():
+            list(engine.calculate(depth, time))
+            self.assertEqual(engine.deco_table, table, (depth, time))
+
+
+    @mock.patch('decotengu.engine.logger')
+    def test_debug_disabled(self, logger):
+        """
+        Test deco engine not logging debug messages when debug disabled
+        """
+        engine = self.engine
+        engine.add_gas(0, 21)
+        engine.add_gas(22, 50)
+
+        logger.isEnabledFor.return_value = False
+        list(engine.calculate(40, 25))
+        self.assertTrue(engine.deco_table.total > 0)
+        self.assertFalse(logger.debug.called)
+
+
+    def test_plan(self):
+        """
+        Test dive plan summary
+        """
+        engine = self.engine
+        engine.add_gas(0, 21)
+        engine.add_gas(22, 50)
+        engine.add_gas(6, 100)
+
+        for depth, time in ((30, 15), (45, 25), (60, 20)):
+            plan = engine.plan(depth, time)
+            profile = list(engine.calculate(depth, time))
+            self.assertEqual(engine.deco_table, plan.deco_table)
+            self.assertEqual(profile[-1].time, plan.time)
+            self.assertEqual(profile[-1].data, plan.data)
+
+
+    def test_extend(self):
+        """
+        Test extending bottom time of a dive
+        """
+        engine = self.engine
+        engine.add_gas(0, 21)
+        engine.add_gas(22, 50)
+
+        profile = list(engine.calculate(40, 20))
+        bottom = next(s for s in profile if s.phase == Phase.CONST)
+
+        for t in (0, 5, 10):
+            steps = list(engine.extend(bottom, t))
+            table = list(engine.deco_table)
+
+            expected = list(engine.calculate(40, 20 + t))
+            self.assertEqual(table, engine.deco_table, t)
+            self.assertEqual(expected[-1].time, steps[-1].time, t)
+
+
+    def test_plan_series(self):
+        """
+        Test planning series of repetitive dives
+        """
+        engine = self.engine
+        engine.add_gas(0, 21)
+
+        plans = engine.plan_series([(0, 30, 25), (60, 30, 25), (60, 30, 25)])
+        totals = [p.deco_table.total for p in plans]
+        self.assertTrue(totals[0] < totals[1] < totals[2], totals)
+
+        # repetitive dive calculated step by step gives the same result
+        data = engine.surface_interval(plans[0].data, 60)
+        profile = list(engine.calculate(30, 25, data=data))
+        self.assertEqual(plans[1].deco_table, engine.deco_table)
+        self.assertEqual(profile[-1].data, plans[1].data)
+
+
+    def test_plan_end_data(self):
+        """
+        Test planning repetitive dive with data at the end of previous dive
+        """
+        engine = self.engine
+        engine.add_gas(0, 21)
+
+        data = engine.plan(40, 30).data
+        self.assertAlmostEqual(engine.model.gf_high, data.gf)
+
+        expected = engine.plan(
+            40, 30, data=data._replace(gf=engine.model.gf_low)
+        )
+        plan = engine.plan(40, 30, data=data)
+        self.assertEqual(expected.deco_table, plan.deco_table)
+        self.assertTrue(plan.deco_table.total > 60)
+
+
+    def test_plan_series_long_interval(self):
+        """
+        Test planning repetitive dive after long surface interval
+        """
+        engine = self.engine
+        engine.add_gas(0, 21)
+
+        plans = engine.plan_series([(0, 30, 25), (48 * 60, 30, 25)])
+        self.assertEqual(plans[0].deco_table, plans[1].deco_table)
+
+
 
 class NDLTestCase(EngineTest):
     """
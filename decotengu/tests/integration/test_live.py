@@ -0,0 +1,248 @@
+#
+# DecoTengu - dive decompression library.
+#
+# Copyright (C) 2013-2014 by Artur Wroblewski <wrobell@pld-linux.org>
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+
+"""
+Live dive integration tests.
+"""
+
+from decotengu import create
+from decotengu.engine import Phase
+
+import unittest
+
+# recorded dive log of multi-level dive on air - (time [min], depth [m])
+# waypoints sampled every 2 seconds
+DIVE_LOG = (
+    (0, 0), (1, 18), (12, 18), (13, 15), (25, 15), (26, 10), (40, 10),
+    (41, 5), (44, 5), (45, 0),
+)
+
+
+class LiveDiveTestCase(unittest.TestCase):
+    """
+    Live dive integration tests.
+    """
+    def _samples(self, log, dt):
+        """
+        Sample dive log waypoints with constant time delta.
+
+        :param log: Dive log waypoints.
+        :param dt: Time delta between samples [min].
+        """
+        for (t1, d1), (t2, d2) in zip(log[:-1], log[1:]):
+            n = round((t2 - t1) / dt)
+            for k in range(1, n + 1):
+                yield t1 + k * dt, d1 + (d2 - d1) * k / n
+
+
+    def _assert_tissues(self, expected, data):
+        """
+        Assert inert gas pressure in tissue compartments.
+        """
+        for t1, t2 in zip(expected.tissues, data.tissues):
+            self.assertAlmostEqual(t1[0], t2[0])
+            self.assertAlmostEqual(t1[1], t2[1])
+
+
+    def _replay_plan(self, engine, depth, time, cache=False):
+        """
+        Replay planned dive profile with live dive and check live dive
+        information against the plan.
+
+        At the end of bottom time and at each decompression stop, time to
+        surface and decompression stops are the remaining time and
+        decompression stops of the plan.
+
+        :param engine: Decompression engine.
+        :param depth: Maximum depth [m].
+        :param time: Dive bottom time [min].
+        :param cache: Use time to surface cache if true.
+        """
+        profile = list(engine.calculate(depth, time))
+        expected = list(engine.deco_table)
+        self.assertTrue(expected)
+
+        # end of bottom time
+        k = max(i for i, s in enumerate(profile) if s.phase == Phase.CONST)
+        end = profile[k]
+
+        # one sample per time of dive steps; gas mix breathed since the
+        # sample is the gas mix of next dive step
+        dive = engine.live(cache=cache)
+        for step, next_step in zip(profile[1:], profile[2:] + [None]):
+            if next_step is not None and next_step.time == step.time:
+                continue
+            gas = next_step.gas if next_step else None
+            info = dive.sample(step.time, engine._to_depth(step.abs_p), gas)
+            self._assert_tissues(step.data, info.data)
+
+            msg = 'time {}'.format(step.time)
+            if step is end:
+                self.assertEqual(0, info.ndl)
+                self.assertEqual(expected[0], info.stop)
+            if step is end or step.phase == Phase.DECO_STOP:
+                depth = engine._to_depth(step.abs_p)
+                stops = [s for s in expected if s.depth < depth] \
+                    if step.phase == Phase.DECO_STOP else expected
+                self.assertAlmostEqual(
+                    profile[-1].time - step.time, info.tts, msg=msg
+                )
+                self.assertEqual(stops, engine.deco_table, msg)
+
+        self.assertEqual(0, info.tts)
+        self.assertTrue(dive.max_latency > 0)
+        return dive
+
+
+    def test_replay_plan(self):
+        """
+        Test live dive replaying planned dive profile
+        """
+        engine = create()
+        engine.add_gas(0, 21)
+        self._replay_plan(engine, 40, 35)
+
+
+    def test_replay_plan_6m(self):
+        """
+        Test live dive replaying planned dive profile with last stop at 6m
+        """
+        engine = create()
+        engine.last_stop_6m = True
+        engine.add_gas(0, 21)
+        self._replay_plan(engine, 40, 35)
+
+
+    def test_replay_plan_trimix(self):
+        """
+        Test live dive replaying planned trimix dive profile
+        """
+        engine = create()
+        engine.add_gas(0, 18, 45)
+        engine.add_gas(22, 50)
+        engine.add_gas(6, 100)
+        self._replay_plan(engine, 68, 20)
+
+
+    def test_replay_plan_cache(self):
+        """
+        Test live dive with time to surface cache replaying planned trimix
+        dive profile
+        """
+        engine = create()
+        engine.add_gas(0, 18, 45)
+        engine.add_gas(22, 50)
+        engine.add_gas(6, 100)
+        dive = self._replay_plan(engine, 68, 20, cache=True)
+        self.assertTrue(dive.tts_cache.hits > 0)
+
+
+    def test_replay_trimix(self):
+        """
+        Test live dive replaying trimix dive with decompression gas mixes
+        """
+        engine = create()
+        engine.add_gas(0, 18, 45)
+        engine.add_gas(22, 50)
+        engine.add_gas(6, 100)
+        profile = list(engine.calculate(68, 20))
+        steps = [(s.time, engine._to_depth(s.abs_p)) for s in profile]
+        end = max(s.time for s in profile if s.phase == Phase.CONST)
+
+        # bottom gas is breathed during live dive, so decompression is
+        # required since end of bottom time, even at the surface
+        dive = engine.live()
+        for t, depth in self._samples(steps, 2 / 60):
+            info = dive.sample(t, depth)
+            if t >= end:
+                self.assertIsNotNone(info.stop, 'time {}'.format(t))
+                self.assertTrue(info.tts > 0)
+
+        self.assertEqual(0, info.depth)
+
+
+    def test_replay_cache(self):
+        """
+        Test live dive with time to surface cache replaying trimix dive
+        """
+        engines = [create(), create()]
+        for engine in engines:
+            engine.add_gas(0, 18, 45)
+            engine.add_gas(22, 50)
+            engine.add_gas(6, 100)
+
+        engine = engines[0]
+        profile = list(engine.calculate(68, 20))
+        segments = [
+            (s1, s2) for s1, s2 in zip(profile[:-1], profile[1:])
+            if s2.time > s1.time
+        ]
+
+        dive = engine.live()
+        cached = engines[1].live(cache=True)
+        for i, (s1, s2) in enumerate(segments):
+            steps = [(s.time, engine._to_depth(s.abs_p)) for s in (s1, s2)]
+            samples = list(self._samples(steps, 2 / 60))
+            for k, (t, depth) in enumerate(samples, 1):
+                # gas mix of next segment is switched with last sample
+                gas = None
+                if k == len(samples) and i + 1 < len(segments):
+                    gas = segments[i + 1][1].gas
+                info = dive.sample(t, depth, gas)
+                table = list(engine.deco_table)
+                c_info = cached.sample(t, depth, gas)
+                msg = 'time {}'.format(t)
+                self.assertEqual(info.stop, c_info.stop, msg)
+                self.assertTrue(c_info.tts >= info.tts, msg)
+                self.assertEqual(info.tts, c_info.tts, msg)
+                self.assertEqual(table, engines[1].deco_table, msg)
+
+        cache = cached.tts_cache
+        self.assertTrue(0 < cache.fallbacks < cache.calls / 10)
+        self.assertTrue(cache.hits > cache.stops / 2)
+
+
+    def test_replay_log(self):
+        """
+        Test live dive replaying recorded multi-level dive log
+        """
+        engine = create()
+        engine.add_gas(0, 21)
+        model = engine.model
+
+        dive = engine.live()
+        for t, depth in self._samples(DIVE_LOG, 2 / 60):
+            info = dive.sample(t, depth)
+            self.assertTrue(info.ndl > 0, 'time {}'.format(t))
+            self.assertIsNone(info.stop)
+            self.assertEqual([], engine.deco_table)
+
+        # tissues loaded with waypoint segments
+        data = model.init(engine.surface_pressure)
+        for (t1, d1), (t2, d2) in zip(DIVE_LOG[:-1], DIVE_LOG[1:]):
+            p = engine._to_pressure(d1)
+            rate = (engine._to_pressure(d2) - p) / (t2 - t1)
+            data = model.load(p, t2 - t1, engine._gas_list[0], rate, data)
+
+        self._assert_tissues(data, info.data)
+        self.assertEqual(0, info.depth)
+        self.assertEqual(0, info.tts)
+
+
+# vim: sw=4:et:ai
@@ -0,0 +1,135 @@
+#
+# DecoTengu - dive decompression library.
+#
+# Copyright (C) 2013-2014 by Artur Wroblewski <wrobell@pld-linux.org>
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+
+"""
+Contingency plans tests.
+"""
+
+from decotengu import create
+from decotengu.contingency import contingency
+from decotengu.error import EngineError
+
+import unittest
+from unittest import mock
+
+
+class ContingencyTestCase(unittest.TestCase):
+    """
+    Contingency plans tests.
+    """
+    def setUp(self):
+        """
+        Create template decompression engine.
+        """
+        self.engine = create()
+        self.engine.add_gas(0, 18, 45)
+        self.engine.add_gas(22, 50)
+        self.engine.add_gas(6, 100)
+
+
+    def _check(self, plan, depth, time, gas=((0, 18, 45), (22, 50), (6, 100))):
+        """
+        Check dive plan summary against results of decompression engine.
+        """
+        engine = create()
+        for args in gas:
+            engine.add_gas(*args)
+        expected = engine.plan(depth, time)
+        self.assertEqual(expected.deco_table, plan.deco_table)
+        self.assertAlmostEqual(expected.time, plan.time)
+        for v1, v2 in zip(expected.data.tissues, plan.data.tissues):
+            self.assertAlmostEqual(v1[0], v2[0])
+            self.assertAlmostEqual(v1[1], v2[1])
+
+
+    def test_contingency(self):
+        """
+        Test contingency plans
+        """
+        bailout = ((0, 18, 45), (22, 50))
+        plans = contingency(self.engine, 60, 20, bailout=bailout)
+        self.assertEqual(
+            ['nominal', 'deeper', 'longer', 'lost gas', 'bailout'],
+            list(plans)
+        )
+        self._check(plans['nominal'], 60, 20)
+        self._check(plans['deeper'], 65, 20)
+        self._check(plans['longer'], 60, 25)
+        self._check(plans['lost gas'], 60, 20, gas=((0, 18, 45),))
+        self._check(plans['bailout'], 60, 20, gas=bailout)
+
+
+    def test_contingency_params(self):
+        """
+        Test contingency plans with custom depth and time of variants
+        """
+        plans = contingency(self.engine, 40, 20, deeper=9, longer=10)
+        self.assertEqual(
+            ['nominal', 'deeper', 'longer', 'lost gas'], list(plans)
+        )
+        self._check(plans['deeper'], 49, 20)
+        self._check(plans['longer'], 40, 30)
+
+
+    def test_contingency_no_deco_gas(self):
+        """
+        Test contingency plans without decompression gas mixes
+        """
+        engine = create()
+        engine.add_gas(0, 21)
+        plans = contingency(engine, 30, 25)
+        self.assertEqual(['nominal', 'deeper', 'longer'], list(plans))
+
+
+    def test_contingency_fork(self):
+        """
+        Test contingency plans descent and bottom calculated once
+        """
+        self.engine._dive_descent = mock.MagicMock(
+            side_effect=self.engine._dive_descent
+        )
+        contingency(self.engine, 60, 20)
+        self.assertEqual(1, self.engine._dive_descent.call_count)
+
+
+    def test_contingency_pool(self):
+        """
+        Test contingency plans calculated with pool of processes
+        """
+        bailout = ((0, 21), (21, 50))
+        expected = contingency(self.engine, 60, 20, bailout=bailout)
+        plans = contingency(
+            self.engine, 60, 20, bailout=bailout, processes=2
+        )
+        self.assertEqual(list(expected), list(plans))
+        for name in expected:
+            self.assertEqual(expected[name].deco_table, plans[name].deco_table)
+
+
+    def test_contingency_bottom_time_error(self):
+        """
+        Test contingency plans bottom time error
+        """
+        # 5min to descent at 20m/min
+        self.assertRaises(EngineError, contingency, self.engine, 100, 5)
+        # 4.75min to descent to 95m, 5min to deeper variant depth of 100m
+        self.assertRaises(EngineError, contingency, self.engine, 95, 5)
+
+
+# vim: sw=4:et:ai
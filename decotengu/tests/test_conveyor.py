@@ -21,6 +21,7 @@
 Conveyor tests.
 """
 
+from decotengu import create
 from decotengu.engine import Phase
 from decotengu.conveyor import Conveyor
 
@@ -91,6 +92,21 @@ class ConveyorTestCase(unittest.TestCase):
         self.assertEquals(s2, v2)
 
 
+    @mock.patch('decotengu.conveyor.logger')
+    def test_debug_disabled(self, logger):
+        """
+        Test conveyor not formatting debug messages when debug disabled
+        """
+        engine = create()
+        engine.add_gas(0, 21)
+        engine.calculate = Conveyor(engine, 1)
+
+        logger.isEnabledFor.return_value = False
+        list(engine.calculate(30, 20))
+        messages = [c[0][0] for c in logger.debug.call_args_list]
+        self.assertFalse(any(m.startswith('conveyor') for m in messages))
+
+
 # FIXME: readd the tests below
 #    def test_dive_descent(self):
 #        """
@@ -21,7 +21,8 @@
 Tests for DecoTengu dive decompression engine.
 """
 
-from decotengu.engine import Engine, DecoTable, Phase, GasMix, DecoStop
+from decotengu.engine import Engine, DecoTable, Phase, GasMix, DecoStop, \
+    DivePlan
 from decotengu.error import ConfigError, EngineError
 
 from .tools import _step, _engine, _data, AIR, EAN50
@@ -123,6 +124,16 @@ class EngineTestCase(unittest.TestCase):
         self.assertTrue(v)
 
 
+    def test_ceiling_invariant_gf(self):
+        """
+        Test ceiling limit invariant uses gradient factor of model data
+        """
+        data = self.engine.model.init(1)._replace(gf=0.55)
+        self.engine.model.ceiling_limit = mock.MagicMock(return_value=3.0)
+        self.engine._inv_limit(3.0, data)
+        self.engine.model.ceiling_limit.assert_called_once_with(data, 0.55)
+
+
     def test_ascent_invariant_edge(self):
         """
         Test ascent invariant (at limit)
@@ -148,6 +159,19 @@ class EngineTestCase(unittest.TestCase):
         self.engine.model.init.assert_called_once_with(1)
 
 
+    def test_step_start_data(self):
+        """
+        Test creation of initial dive step record with decompression model data
+        """
+        self.engine.model.init = mock.MagicMock()
+        data = mock.MagicMock()
+
+        step = self.engine._step_start(1.2, AIR, data)
+        self.assertIs(data._replace.return_value, step.data)
+        data._replace.assert_called_once_with(gf=self.engine.model.gf_low)
+        self.assertFalse(self.engine.model.init.called)
+
+
     def test_step_next(self):
         """
         Test creation of next dive step record
@@ -320,6 +344,222 @@ class EngineTestCase(unittest.TestCase):
         self.assertEquals(5, step.abs_p, step)
 
 
+    def test_calculate_many(self):
+        """
+        Test deco engine calculation of decompression tables for a grid
+        """
+        engine = self.engine
+        start = _step(Phase.START, 1, 0)
+        step = _step(Phase.DESCENT, 4, 2)
+        engine._dive_descent = mock.MagicMock(
+            side_effect=lambda *args: [start, step]
+        )
+        engine._step_next = mock.MagicMock(
+            side_effect=lambda s, t, gas: s._replace(time=s.time + t)
+        )
+
+        def ascent(step, gas_list):
+            engine.deco_table.append(3, step.time)
+            yield step
+
+        engine._dive_ascent = mock.MagicMock(side_effect=ascent)
+
+        tables = engine.calculate_many([(30, 20), (20, 15), (30, 10), (30, 20)])
+
+        self.assertEqual([(20, 15), (30, 10), (30, 20)], list(tables))
+        self.assertEqual([DecoStop(3, 15)], tables[20, 15])
+        self.assertEqual([DecoStop(3, 10)], tables[30, 10])
+        self.assertEqual([DecoStop(3, 20)], tables[30, 20])
+        self.assertIsInstance(tables[30, 20], DecoTable)
+
+        # descent once per depth, bottom time extended incrementally
+        self.assertEqual(2, engine._dive_descent.call_count)
+        times = [c[0][1] for c in engine._step_next.call_args_list]
+        self.assertEqual([13, 8, 10], times)
+
+
+    def test_calculate_many_bottom_time_error(self):
+        """
+        Test deco engine bottom time error for a grid
+        """
+        grid = [(100, 30), (100, 5)] # 5min to descent at 20m/min
+        self.assertRaises(EngineError, self.engine.calculate_many, grid)
+
+
+    def test_plan(self):
+        """
+        Test deco engine dive plan summary
+        """
+        engine = self.engine
+        start = _step(Phase.START, 1, 0)
+        step = _step(Phase.DESCENT, 4, 2)
+        bottom = _step(Phase.CONST, 4, 20)
+        ascent = _step(Phase.ASCENT, 2, 25)
+        end = _step(Phase.ASCENT, 1, 30)
+        engine._dive_descent = mock.MagicMock(return_value=[start, step])
+        engine._step_next = mock.MagicMock(return_value=bottom)
+
+        def dive_ascent(step, gas_list):
+            engine.deco_table.append(3, 5)
+            yield ascent
+            yield end
+
+        engine._dive_ascent = mock.MagicMock(side_effect=dive_ascent)
+
+        plan = engine.plan(30, 20)
+
+        self.assertEqual([DecoStop(3, 5)], plan.deco_table)
+        self.assertIsInstance(plan.deco_table, DecoTable)
+        self.assertIsNot(engine.deco_table, plan.deco_table)
+        self.assertEqual(30, plan.time)
+        self.assertIs(end.data, plan.data)
+        engine._step_next.assert_called_once_with(step, 18, AIR)
+        engine._dive_ascent.assert_called_once_with(bottom, [AIR])
+
+
+    def test_plan_bottom_time_error(self):
+        """
+        Test deco engine dive plan summary bottom time error
+        """
+        # 5min to descent at 20m/min
+        self.assertRaises(EngineError, self.engine.plan, 100, 5)
+
+
+    def test_surface_interval(self):
+        """
+        Test deco engine surface interval
+        """
+        model = self.engine.model
+        data = model.load(4, 30, AIR, 0, model.init(1))._replace(gf=0.8)
+
+        result = self.engine.surface_interval(data, 60)
+        self.assertEqual(model.gf_low, result.gf)
+
+        air = GasMix(0, 100 - 79.02, 79.02, 0)
+        expected = model.load(1, 60, air, 0, data)
+        self.assertEqual(expected.tissues, result.tissues)
+
+
+    def test_surface_interval_long(self):
+        """
+        Test deco engine long surface interval saturates tissues at surface
+        """
+        model = self.engine.model
+        data = model.load(4, 30, AIR, 0, model.init(1))
+
+        result = self.engine.surface_interval(data, 7 * 24 * 60)
+        for v1, v2 in zip(model.init(1).tissues, result.tissues):
+            self.assertAlmostEqual(v1[0], v2[0], 4)
+            self.assertAlmostEqual(v1[1], v2[1], 4)
+
+
+    def test_surface_interval_zero(self):
+        """
+        Test deco engine zero surface interval
+        """
+        model = self.engine.model
+        model.load = mock.MagicMock()
+        data = model.init(1)._replace(gf=0.8)
+
+        result = self.engine.surface_interval(data, 0)
+        self.assertEqual(data.tissues, result.tissues)
+        self.assertEqual(model.gf_low, result.gf)
+        self.assertFalse(model.load.called)
+
+
+    def test_surface_interval_error(self):
+        """
+        Test deco engine negative surface interval error
+        """
+        data = self.engine.model.init(1)
+        self.assertRaises(
+            EngineError, self.engine.surface_interval, data, -1
+        )
+
+
+    def test_plan_series(self):
+        """
+        Test deco engine series of dive plan summaries
+        """
+        engine = self.engine
+        d1, d2, d3, d4 = (mock.MagicMock() for i in range(4))
+        p1 = DivePlan(DecoTable(), 30, d1)
+        p2 = DivePlan(DecoTable(), 40, d3)
+        engine.plan = mock.MagicMock(side_effect=[p1, p2])
+        engine.surface_interval = mock.MagicMock(return_value=d2)
+
+        plans = engine.plan_series([(0, 30, 20), (60, 21, 30)])
+
+        self.assertEqual([p1, p2], plans)
+        engine.surface_interval.assert_called_once_with(d1, 60)
+        engine.plan.assert_has_calls([
+            mock.call(30, 20, data=None), mock.call(21, 30, data=d2)
+        ])
+
+
+    def test_plan_series_data(self):
+        """
+        Test deco engine series of dive plan summaries with initial data
+        """
+        engine = self.engine
+        d1, d2 = mock.MagicMock(), mock.MagicMock()
+        p1 = DivePlan(DecoTable(), 30, mock.MagicMock())
+        engine.plan = mock.MagicMock(return_value=p1)
+        engine.surface_interval = mock.MagicMock(return_value=d2)
+
+        plans = engine.plan_series([(120, 30, 20)], data=d1)
+
+        self.assertEqual([p1], plans)
+        engine.surface_interval.assert_called_once_with(d1, 120)
+        engine.plan.assert_called_once_with(30, 20, data=d2)
+
+
+    def test_extend(self):
+        """
+        Test deco engine dive extension from bottom dive step
+        """
+        engine = self.engine
+        step = _step(Phase.CONST, 4, 20)
+        bottom = _step(Phase.CONST, 4, 25)
+        ascent = _step(Phase.ASCENT, 1, 30)
+        engine.deco_table.append(3, 1)
+        engine._step_next = mock.MagicMock(return_value=bottom)
+        engine._dive_ascent = mock.MagicMock(return_value=[ascent])
+
+        steps = list(engine.extend(step, 5))
+
+        self.assertEqual([bottom, ascent], steps)
+        self.assertEqual([], engine.deco_table)
+        engine._step_next.assert_called_once_with(step, 5, AIR)
+        engine._dive_ascent.assert_called_once_with(bottom, [AIR])
+
+
+    def test_extend_no_time(self):
+        """
+        Test deco engine dive extension with no additional bottom time
+        """
+        engine = self.engine
+        step = _step(Phase.CONST, 4, 20)
+        ascent = _step(Phase.ASCENT, 1, 30)
+        engine._step_next = mock.MagicMock()
+        engine._dive_ascent = mock.MagicMock(return_value=[ascent])
+
+        steps = list(engine.extend(step, 0))
+
+        self.assertEqual([ascent], steps)
+        self.assertFalse(engine._step_next.called)
+        engine._dive_ascent.assert_called_once_with(step, [AIR])
+
+
+    def test_extend_error(self):
+        """
+        Test deco engine dive extension with negative bottom time
+        """
+        step = _step(Phase.CONST, 4, 20)
+        it = self.engine.extend(step, -1)
+        self.assertRaises(EngineError, next, it)
+
+
 
 class FirstStopFinderTestCase(unittest.TestCase):
     """
@@ -915,6 +1155,24 @@ class EngineDiveAscentTestCase(unittest.TestCase):
         self.assertEquals([0.1] * 5, diff)
 
 
+    def test_deco_stops_gf(self):
+        """
+        Test converting deco ascent stages to deco stops with gf above gf low
+        """
+        self.engine.model.gf_low = 0.30
+        self.engine.model.gf_high = 0.90
+        stages = [(1.0, AIR)]
+
+        # 6m stop anchored at 12m first stop
+        data = _data(0.6, 2.5, 2.5, 2.5)._replace(gf=0.6)
+        step = _step(Phase.ASCENT, 1.6, 2, data=data)
+
+        stops = list(self.engine._deco_stops(step, stages))
+        self.assertEquals(2, len(stops))
+        gfv = [round(s[3], 2) for s in stops]
+        self.assertEquals([0.75, 0.9], gfv)
+
+
     def test_deco_stops_6m(self):
         """
         Test converting deco ascent stages to deco stops (last stop 6m)
@@ -985,6 +1243,99 @@ class EngineDiveAscentTestCase(unittest.TestCase):
         self.assertEquals(3, step.time)
 
 
+    def test_deco_staged_ascent_hint(self):
+        """
+        Test deco engine deco ascent predicts deco stop length
+        """
+        stages = [(1.9, AIR)] # 3 deco stops
+        start = _step(Phase.ASCENT, 2.8, 20, data=_data(0.3, 3.0, 3.0))
+        self.engine._gas_list = [AIR]
+        self.engine._deco_stop = mock.MagicMock(side_effect=[
+            start._replace(time=22), start._replace(time=25),
+            start._replace(time=29),
+        ])
+        self.engine._step_next_ascent = mock.MagicMock(
+            side_effect=lambda step, *args, **kw: step
+        )
+
+        list(self.engine._deco_staged_ascent(start, stages))
+
+        hints = [
+            c[1].get('hint') for c in self.engine._deco_stop.call_args_list
+        ]
+        self.assertEqual([None, 2, 3], hints)
+        self.assertEqual([2, 3, 4], [s.time for s in self.engine.deco_table])
+
+
+    def test_deco_staged_ascent_no_hint(self):
+        """
+        Test deco engine deco ascent with deco stop override without hint
+        """
+        stages = [(1.9, AIR)] # 3 deco stops
+        start = _step(Phase.ASCENT, 2.8, 20, data=_data(0.3, 3.0, 3.0))
+        self.engine._gas_list = [AIR]
+        calls = []
+
+        def deco_stop(step, time, gas, gf):
+            calls.append(step)
+            return step._replace(time=step.time + 2)
+
+        self.engine._deco_stop = deco_stop
+        self.engine._step_next_ascent = mock.MagicMock(
+            side_effect=lambda step, *args, **kw: step
+        )
+
+        list(self.engine._deco_staged_ascent(start, stages))
+        self.assertEqual(3, len(calls))
+        self.assertEqual([2, 2, 2], [s.time for s in self.engine.deco_table])
+
+
+    def test_deco_stop_hint(self):
+        """
+        Test deco stop calculation with predicted length
+        """
+        data = _data(0.3, 2.5, 2.5, 2.5)
+        step = _step(Phase.ASCENT, 2.5, 2, data=data)
+
+        self.engine._can_ascend = mock.MagicMock(side_effect=[True, False])
+        self.engine._deco_stop_search = mock.MagicMock()
+
+        step = self.engine._deco_stop(step, 0.3, AIR, 0.42, hint=4)
+        self.assertEqual(6, step.time)
+        self.assertEqual(Phase.DECO_STOP, step.phase)
+        self.assertEqual(2, self.engine._can_ascend.call_count)
+        self.assertFalse(self.engine._deco_stop_search.called)
+
+
+    def test_deco_stop_hint_longer(self):
+        """
+        Test deco stop calculation longer than predicted length
+        """
+        data = _data(0.3, 2.5, 2.5, 2.5)
+        start = _step(Phase.ASCENT, 2.5, 2, data=data)
+
+        self.engine._can_ascend = mock.MagicMock(return_value=False)
+        self.engine._deco_stop_search = mock.MagicMock()
+
+        self.engine._deco_stop(start, 0.3, AIR, 0.42, hint=4)
+        args = self.engine._deco_stop_search.call_args[0]
+        self.assertEqual((start, 0.3, AIR, 0.42, 4), args[:-1])
+
+
+    def test_deco_stop_hint_shorter(self):
+        """
+        Test deco stop calculation shorter than predicted length
+        """
+        data = _data(0.3, 2.5, 2.5, 2.5)
+        step = _step(Phase.ASCENT, 2.5, 2, data=data)
+
+        self.engine._can_ascend = mock.MagicMock(return_value=True)
+
+        step = self.engine._deco_stop(step, 0.3, AIR, 0.42, hint=4)
+        self.assertEqual(3, step.time)
+        self.assertEqual(3, self.engine._can_ascend.call_count)
+
+
 
 class GasMixTestCase(unittest.TestCase):
     """
@@ -1143,6 +1494,18 @@ class DecoTableTestCase(unittest.TestCase):
         self.assertEquals(1, dt[1].time)
 
 
+    @mock.patch('decotengu.engine.logger')
+    def test_adding_stop_debug_disabled(self, logger):
+        """
+        Test adding deco stop to deco table with debug logging disabled
+        """
+        logger.isEnabledFor.return_value = False
+        dt = DecoTable()
+        dt.append(15, 4)
+        self.assertEquals([DecoStop(15, 4)], dt)
+        self.assertFalse(logger.debug.called)
+
+
     def test_total(self):
         """
         Test deco table total time summary
@@ -0,0 +1,335 @@
+#
+# DecoTengu - dive decompression library.
+#
+# Copyright (C) 2013-2014 by Artur Wroblewski <wrobell@pld-linux.org>
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+"""
+Numeric kernels tests.
+"""
+
+from decotengu import create
+from decotengu.error import ConfigError
+from decotengu.kernel import KERNELS, register_kernel, set_kernel, \
+    select_kernel
+from decotengu import kernel
+from decotengu.alt.tab import TabExp
+from decotengu.alt.decimal import DecimalKernel
+from decotengu.alt.vector import np
+
+from .tools import AIR
+
+import subprocess
+import sys
+import unittest
+from unittest import mock
+
+
+class KernelTestCase(unittest.TestCase):
+    """
+    Numeric kernels tests.
+    """
+    def setUp(self):
+        """
+        Create decompression engine.
+        """
+        self.engine = create()
+        self.engine.add_gas(0, 21)
+        self.model = self.engine.model
+
+
+    def test_default(self):
+        """
+        Test default numeric kernel
+        """
+        self.assertEqual('python', self.model.kernel)
+        self.assertEqual('python', list(KERNELS)[0])
+
+
+    def test_import_no_numpy(self):
+        """
+        Test importing DecoTengu does not import NumPy
+        """
+        code = 'import sys, decotengu; print("numpy" in sys.modules)'
+        out = subprocess.check_output([sys.executable, '-c', code])
+        self.assertEqual(b'False', out.strip())
+
+
+    def test_set_kernel(self):
+        """
+        Test setting numeric kernel
+        """
+        set_kernel(self.model, 'tab')
+        self.assertEqual('tab', self.model.kernel)
+        self.assertIsInstance(self.model._exp, TabExp)
+
+
+    def test_set_kernel_reset(self):
+        """
+        Test setting numeric kernel resets previous kernel
+        """
+        self.model.set_kernel('tab')
+        self.model.set_kernel('decimal')
+        self.assertEqual('decimal', self.model.kernel)
+        self.assertNotIsInstance(self.model._exp, TabExp)
+        self.assertIsInstance(self.model.load.__self__, DecimalKernel)
+
+        self.model.set_kernel('python')
+        self.assertEqual('python', self.model.kernel)
+        self.assertNotIn('load', self.model.__dict__)
+        self.assertNotIn('gf_limit', self.model.__dict__)
+
+
+    def test_set_kernel_unknown(self):
+        """
+        Test setting unknown numeric kernel
+        """
+        self.assertRaises(ConfigError, set_kernel, self.model, 'unknown')
+
+
+    def test_register_kernel(self):
+        """
+        Test registering numeric kernel
+        """
+        kernel = mock.MagicMock()
+        with mock.patch.dict(KERNELS):
+            register_kernel('test', kernel)
+            set_kernel(self.model, 'test')
+
+        kernel.assert_called_once_with(self.model)
+        self.assertEqual('test', self.model.kernel)
+        self.assertNotIn('test', KERNELS)
+
+
+    def test_select_kernel(self):
+        """
+        Test selecting the fastest numeric kernel
+        """
+        name = select_kernel(self.engine, names=('python', 'decimal'))
+        self.assertEqual('python', name)
+        self.assertEqual('python', self.model.kernel)
+
+
+    def test_select_kernel_tab(self):
+        """
+        Test selecting tabular numeric kernel
+        """
+        self.engine.descent_rate = 10
+        self.engine.ascent_rate = 10
+        name = select_kernel(self.engine, names=('tab', 'decimal'))
+        self.assertEqual('tab', name)
+
+
+    def test_select_kernel_timings(self):
+        """
+        Test numeric kernel selection benchmarks every registered kernel
+        """
+        available = []
+        for name in KERNELS:
+            try:
+                set_kernel(type(self.model)(), name)
+                available.append(name)
+            except ConfigError:
+                pass
+
+        # kernel is run once to check accuracy and 3 times to benchmark it
+        runs = []
+        run = kernel._run
+        def f(model, workload):
+            runs.append(model.kernel)
+            return run(model, workload)
+
+        with mock.patch('decotengu.kernel._run', side_effect=f):
+            name = select_kernel(self.engine, tolerance=1e-3, number=3)
+
+        timed = [k for k in available if runs.count(k) >= 4]
+        self.assertTrue(len(available) > 3)
+        self.assertEqual(available, timed)
+        self.assertIn('tab', timed)
+        self.assertNotEqual('tab', name)
+
+
+    def test_select_kernel_rates(self):
+        """
+        Test numeric kernel selection rejects tabular kernel for engine rates
+        """
+        with mock.patch('decotengu.kernel.logger') as logger:
+            name = select_kernel(self.engine, names=('tab', 'decimal'))
+        self.assertEqual('decimal', name)
+        logger.debug.assert_any_call(
+            'kernel tab: rejected, not accurate for engine descent and'
+            ' ascent rates'
+        )
+
+
+    def test_workload(self):
+        """
+        Test numeric kernel benchmark workload time values
+        """
+        workload = kernel._workload(self.engine)
+        for abs_p, t, gas, rate in workload:
+            self.assertAlmostEqual(0, t * 10 - round(t * 10), 6, t)
+
+
+    def test_select_kernel_error(self):
+        """
+        Test numeric kernel selection rejects inaccurate kernels
+        """
+        def kernel(model):
+            load = model.load
+            model.load = lambda *args: load(*args)._replace(
+                tissues=((1.0, 0.0),) * 16
+            )
+
+        with mock.patch.dict(KERNELS):
+            register_kernel('test', kernel)
+            name = select_kernel(self.engine, names=('test', 'decimal'))
+        self.assertEqual('decimal', name)
+
+
+    def test_select_kernel_not_available(self):
+        """
+        Test numeric kernel selection skips kernels not available
+        """
+        kernel = mock.MagicMock(side_effect=ConfigError('not available'))
+        with mock.patch.dict(KERNELS):
+            register_kernel('test', kernel)
+            name = select_kernel(self.engine, names=('test', 'python'))
+        self.assertEqual('python', name)
+
+
+    def test_select_kernel_none(self):
+        """
+        Test numeric kernel selection when no kernel is accepted
+        """
+        kernel = mock.MagicMock(side_effect=ConfigError('not available'))
+        with mock.patch.dict(KERNELS):
+            register_kernel('test', kernel)
+            self.assertRaises(
+                ConfigError, select_kernel, self.engine, names=('test',)
+            )
+
+
+    def test_select_kernel_float32(self):
+        """
+        Test numeric kernel selection rejects single precision kernels
+        """
+        name = select_kernel(self.engine, names=('float32', 'python'))
+        self.assertEqual('python', name)
+
+
+    def test_create(self):
+        """
+        Test creating decompression engine with numeric kernel
+        """
+        engine = create(kernel='decimal')
+        self.assertEqual('decimal', engine.model.kernel)
+
+
+
+class Float32KernelTestCase(unittest.TestCase):
+    """
+    Single precision floats numeric kernels tests.
+    """
+    def setUp(self):
+        """
+        Create decompression model.
+        """
+        self.model = create().model
+
+
+    def _check(self, name):
+        """
+        Check results of single precision floats numeric kernel.
+
+        :param name: Name of numeric kernel.
+        """
+        model = self.model
+        data = model.init(1.01325)
+
+        model.set_kernel(name)
+        data_32 = model.init(1.01325)
+        self.assertEqual('f', data_32._tissues.typecode)
+
+        for abs_p, time, rate in ((4.0, 1.5, -1), (4.0, 20, 0), (2.5, 0.3, -1)):
+            model.set_kernel('python')
+            data = model.load(abs_p, time, AIR, rate, data)
+            model.set_kernel(name)
+            data_32 = model.load(abs_p, time, AIR, rate, data_32)
+            self.assertEqual('f', data_32._tissues.typecode)
+            for v1, v2 in zip(data._tissues, data_32._tissues):
+                self.assertAlmostEqual(v1, v2, 3)
+
+        model.set_kernel('python')
+        expected = model.gf_limit(0.3, data)
+        model.set_kernel(name)
+        for v1, v2 in zip(expected, model.gf_limit(0.3, data_32)):
+            self.assertAlmostEqual(v1, v2, 3)
+
+
+    def test_float32(self):
+        """
+        Test single precision floats storage numeric kernel
+        """
+        self._check('float32')
+
+
+    @unittest.skipIf(np is None, 'NumPy not installed')
+    def test_vector32(self):
+        """
+        Test single precision floats vectorized numeric kernel
+        """
+        self._check('vector32')
+        self.assertEqual(np.float32, self.model.load.__self__.dtype)
+
+
+    def test_reset(self):
+        """
+        Test resetting single precision floats numeric kernel
+        """
+        self.model.set_kernel('float32')
+        self.model.set_kernel('python')
+        self.assertEqual('d', self.model.typecode)
+        self.assertEqual('d', self.model.init(1.01325)._tissues.typecode)
+
+
+
+class DecimalKernelTestCase(unittest.TestCase):
+    """
+    Decimal numeric kernel tests.
+    """
+    def test_results(self):
+        """
+        Test decimal numeric kernel results
+        """
+        engine = create()
+        model = engine.model
+        kernel = DecimalKernel(model)
+
+        data = model.init(1.01325)
+        for args in ((4.0, 1.5, -1), (4.0, 20, 0), (2.5, 0.3, -1)):
+            abs_p, time, rate = args
+            expected = model.load(abs_p, time, AIR, rate, data)
+            result = kernel.load(abs_p, time, AIR, rate, data)
+            for v1, v2 in zip(expected._tissues, result._tissues):
+                self.assertAlmostEqual(v1, v2, 10)
+            self.assertIsInstance(result._tissues[0], float)
+            data = expected
+
+        for v1, v2 in zip(model.gf_limit(0.3, data), kernel.gf_limit(0.3, data)):
+            self.assertAlmostEqual(v1, v2, 10)
+
+
+# vim: sw=4:et:ai
@@ -0,0 +1,442 @@
+#
+# DecoTengu - dive decompression library.
+#
+# Copyright (C) 2013-2014 by Artur Wroblewski <wrobell@pld-linux.org>
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+
+"""
+Live dive tests.
+"""
+
+from decotengu.engine import Phase, DecoStop
+from decotengu.error import ConfigError, EngineError
+from decotengu.live import LiveDive, TTSCache
+
+from .tools import _step, _engine, AIR, EAN50
+
+import unittest
+from unittest import mock
+
+
+class LiveDiveTestCase(unittest.TestCase):
+    """
+    Live dive tests.
+    """
+    def setUp(self):
+        """
+        Create decompression engine and live dive.
+        """
+        self.engine = _engine(air=True)
+        self.engine.add_gas(22, 50)
+        self.dive = self.engine.live()
+
+
+    def test_live(self):
+        """
+        Test starting live dive
+        """
+        dive = self.dive
+        self.assertIsInstance(dive, LiveDive)
+        self.assertEqual(Phase.START, dive.step.phase)
+        self.assertEqual(1.0, dive.step.abs_p)
+        self.assertEqual(0, dive.step.time)
+        self.assertEqual(AIR, dive.step.gas)
+        self.assertEqual(0, dive.max_latency)
+
+
+    def test_live_no_gas(self):
+        """
+        Test starting live dive without gas mixes
+        """
+        engine = _engine()
+        self.assertRaises(ConfigError, engine.live)
+
+
+    def test_sample(self):
+        """
+        Test loading tissues with depth samples
+        """
+        model = self.engine.model
+        dive = self.dive
+
+        info = dive.sample(1.0, 20)
+        self.assertEqual(Phase.DESCENT, dive.step.phase)
+        info = dive.sample(5.0, 20)
+        self.assertEqual(Phase.CONST, dive.step.phase)
+        info = dive.sample(6.0, 10)
+        self.assertEqual(Phase.ASCENT, dive.step.phase)
+        self.assertEqual(6.0, info.time)
+        self.assertAlmostEqual(10, info.depth)
+        self.assertIs(dive.step.data, info.data)
+
+        data = model.init(1.0)
+        data = model.load(1.0, 1.0, AIR, 2.0, data)
+        data = model.load(3.0, 4.0, AIR, 0, data)
+        data = model.load(3.0, 1.0, AIR, -1.0, data)
+        self.assertEqual(data, info.data)
+        self.assertTrue(dive.max_latency > 0)
+
+
+    def test_sample_negative_depth(self):
+        """
+        Test depth sample with negative depth
+        """
+        info = self.dive.sample(0.1, -0.2)
+        self.assertEqual(0, info.depth)
+        self.assertEqual(0, info.tts)
+
+
+    def test_sample_time_error(self):
+        """
+        Test depth sample time error
+        """
+        self.dive.sample(1, 10)
+        self.assertRaises(EngineError, self.dive.sample, 1, 20)
+        self.assertRaises(EngineError, self.dive.sample, 0.5, 20)
+
+
+    def test_info_ndl(self):
+        """
+        Test live dive information within no decompression limit
+        """
+        engine = self.engine
+        engine._dive_ascent = mock.MagicMock()
+        engine.deco_table.append(3, 1)
+
+        info = self.dive.sample(1, 20)
+
+        self.assertEqual(0, info.ceiling)
+        self.assertTrue(info.ndl > 0)
+        self.assertIsNone(info.stop)
+        self.assertAlmostEqual(2, info.tts)
+        self.assertFalse(engine._dive_ascent.called)
+        self.assertEqual([], engine.deco_table)
+
+
+    def test_info_deco(self):
+        """
+        Test live dive information with decompression required
+        """
+        engine = self.engine
+        model = engine.model
+        model.ndl = mock.MagicMock(return_value=0)
+        model.ceiling_limit = mock.MagicMock(return_value=1.25)
+
+        def ascent(start, gas_list):
+            engine.deco_table.append(3, 2)
+            yield _step(Phase.ASCENT, 1.3, start.time + 1)
+            yield _step(Phase.ASCENT, 1.0, start.time + 4)
+
+        engine._dive_ascent = mock.MagicMock(side_effect=ascent)
+
+        # at 30m, EAN50 used for ascent
+        info = self.dive.sample(2, 30)
+        self.assertAlmostEqual(2.5, info.ceiling)
+        self.assertEqual(0, info.ndl)
+        self.assertEqual(DecoStop(3, 2), info.stop)
+        self.assertEqual(4, info.tts)
+
+        start, gas_list = engine._dive_ascent.call_args[0]
+        self.assertEqual(self.dive.step.abs_p, start.abs_p)
+        self.assertEqual(2, start.time)
+        self.assertEqual([AIR, EAN50], gas_list)
+
+
+    def test_info_deco_between_stops(self):
+        """
+        Test live dive information when diver is between decompression stops
+        """
+        engine = self.engine
+        model = engine.model
+        model.ndl = mock.MagicMock(return_value=0)
+        model.ceiling_limit = mock.MagicMock(return_value=1.25)
+        engine._dive_ascent = mock.MagicMock(return_value=[])
+
+        # at 2m, ceiling at 2.5m, so ascent from 3m
+        info = self.dive.sample(2, 2)
+        self.assertIsNone(info.stop)
+        self.assertEqual(0, info.tts)
+
+        start, gas_list = engine._dive_ascent.call_args[0]
+        self.assertAlmostEqual(1.3, start.abs_p)
+        self.assertEqual(2, start.time)
+        self.assertEqual(AIR, self.dive.step.gas)
+
+
+    def test_deco_start_stop(self):
+        """
+        Test live dive ascent start at the end of decompression stop
+        """
+        dive = self.dive
+        model = self.engine.model
+        model.ceiling_limit = mock.MagicMock(return_value=1.25)
+        dive._first_stop = 1.9  # 9m
+
+        # ascent to 3m possible with gf of 3m
+        data = self.engine.model.init(1.0)
+        step = _step(Phase.DECO_STOP, 1.6, 20, data=data)
+        start, stop = dive._deco_start(step, 1.5)
+        self.assertTrue(stop)
+        self.assertAlmostEqual(1.3, start.abs_p)
+        self.assertTrue(start.time > 20)
+        self.assertEqual(dive._gf(1.3), start.data.gf)
+        model.ceiling_limit.assert_called_once_with(step.data, dive._gf(1.3))
+
+
+    def test_deco_start_stop_not_finished(self):
+        """
+        Test live dive ascent start during decompression stop
+        """
+        dive = self.dive
+        model = self.engine.model
+        model.ceiling_limit = mock.MagicMock(return_value=1.35)
+        dive._first_stop = 1.9  # 9m
+
+        data = self.engine.model.init(1.0)
+        step = _step(Phase.DECO_STOP, 1.6, 20, data=data)
+        start, stop = dive._deco_start(step, 1.5)
+        self.assertTrue(stop)
+        self.assertEqual(1.6, start.abs_p)
+        self.assertEqual(20, start.time)
+        self.assertEqual(dive._gf(1.6), start.data.gf)
+
+
+    def test_deco_start_first_stop(self):
+        """
+        Test live dive ascent start before first decompression stop
+        """
+        dive = self.dive
+        data = self.engine.model.init(1.0)
+        step = _step(Phase.CONST, 3.1, 20, data=data)
+        start, stop = dive._deco_start(step, 1.9)
+        self.assertFalse(stop)
+        self.assertEqual(3.1, start.abs_p)
+        self.assertEqual(self.engine.model.gf_low, start.data.gf)
+
+
+    def test_ascent_start_gas_switch(self):
+        """
+        Test live dive ascent start with gas mix switch
+        """
+        dive = self.dive
+        step = _step(Phase.CONST, 2.2, 20) # 12m, EAN50 switch depth 22m
+        start, gas_list = dive._ascent_start(step)
+        self.assertEqual(Phase.GAS_SWITCH, start.phase)
+        self.assertEqual(EAN50, start.gas)
+        self.assertEqual([EAN50], gas_list)
+
+
+    def test_ascent_start_no_gas_switch(self):
+        """
+        Test live dive ascent start without gas mix switch
+        """
+        dive = self.dive
+        step = _step(Phase.CONST, 3.4, 20) # 24m, EAN50 switch depth 22m
+        start, gas_list = dive._ascent_start(step)
+        self.assertIs(step, start)
+        self.assertEqual([AIR, EAN50], gas_list)
+
+
+    def test_gf(self):
+        """
+        Test live dive gradient factor value at depth
+        """
+        dive = self.dive
+        model = self.engine.model
+        self.assertEqual(model.gf_low, dive._gf(1.6))
+
+        dive._first_stop = 1.9  # 9m
+        self.assertEqual(model.gf_low, dive._gf(2.2))
+        self.assertEqual(model.gf_low, dive._gf(1.9))
+        self.assertAlmostEqual(
+            model.gf_low + (model.gf_high - model.gf_low) / 3, dive._gf(1.6)
+        )
+        self.assertAlmostEqual(model.gf_high, dive._gf(1.0))
+
+
+class TTSCacheTestCase(unittest.TestCase):
+    """
+    Time to surface cache tests.
+    """
+    def setUp(self):
+        """
+        Create decompression engine, time to surface cache and starting
+        dive step at first decompression stop.
+        """
+        self.engine = engine = _engine(air=True)
+        self.cache = TTSCache(engine)
+
+        model = engine.model
+        data = model.init(1.0)
+        data = model.load(4.0, 30, AIR, 0, data)
+        limit = engine._ceil_pressure_3m(model.ceiling_limit(data))
+        self.start = _step(Phase.CONST, limit, 30, data=data)
+
+
+    def _stay(self, step, time):
+        """
+        Stay at depth of dive step for given amount of time.
+        """
+        data = self.engine._tissue_pressure_const(
+            step.abs_p, time, step.gas, step.data
+        )
+        return step._replace(time=step.time + time, data=data)
+
+
+    def test_fallback(self):
+        """
+        Test time to surface cache fallback to full ascent calculation
+        """
+        engine = self.engine
+        start = self.start
+        tts = self.cache(start, [AIR])
+
+        self.assertEqual(1, self.cache.calls)
+        self.assertEqual(1, self.cache.fallbacks)
+        self.assertTrue(len(engine.deco_table) > 1)
+
+        expected = list(engine.deco_table)
+        del engine.deco_table[:]
+        end = list(engine._dive_ascent(start, [AIR]))[-1]
+        self.assertEqual(expected, engine.deco_table)
+        self.assertAlmostEqual(end.time - start.time, tts)
+
+
+    def _full_ascent(self, start):
+        """
+        Calculate ascent to the surface without time to surface cache.
+        """
+        engine = self.engine
+        del engine.deco_table[:]
+        end = list(engine._dive_ascent(start, [AIR]))[-1]
+        return list(engine.deco_table), end.time - start.time
+
+
+    def test_predict(self):
+        """
+        Test time to surface cache predicting decompression stops length
+        """
+        engine = self.engine
+        self.cache(self.start, [AIR])
+        stops = self.cache.stops
+
+        start = self._stay(self.start, 2 / 60)
+        expected, expected_tts = self._full_ascent(start)
+
+        del engine.deco_table[:]
+        tts = self.cache(start, [AIR])
+
+        self.assertEqual(2, self.cache.calls)
+        self.assertEqual(1, self.cache.fallbacks)
+        self.assertEqual(2 * stops, self.cache.stops)
+        self.assertTrue(self.cache.hits > 0)
+        self.assertEqual(expected, engine.deco_table)
+        self.assertEqual(expected_tts, tts)
+
+
+    def test_predict_loadings(self):
+        """
+        Test time to surface cache reducing number of tissue loadings
+        """
+        engine = self.engine
+        self.cache(self.start, [AIR])
+        start = self._stay(self.start, 2 / 60)
+
+        engine._tissue_pressure_const = mock.MagicMock(
+            side_effect=engine._tissue_pressure_const
+        )
+        self._full_ascent(start)
+        n = engine._tissue_pressure_const.call_count
+
+        engine._tissue_pressure_const.reset_mock()
+        self.cache(start, [AIR])
+        self.assertTrue(engine._tissue_pressure_const.call_count < n)
+
+
+    def test_tts(self):
+        """
+        Test time to surface cache never below full ascent calculation
+        """
+        engine = self.engine
+        start = self.start
+        for k in range(60):
+            start = self._stay(start, 10 / 60)
+            expected, expected_tts = self._full_ascent(start)
+
+            del engine.deco_table[:]
+            tts = self.cache(start, [AIR])
+            self.assertTrue(tts >= expected_tts, 'time {}'.format(start.time))
+            self.assertEqual(expected, engine.deco_table)
+
+        self.assertTrue(self.cache.hits > self.cache.stops / 2)
+
+
+    def test_engine_restored(self):
+        """
+        Test time to surface cache restoring decompression stop calculation
+        """
+        engine = self.engine
+        self.cache(self.start, [AIR])
+        self.assertNotIn('_deco_stop', engine.__dict__)
+
+        deco_stop = engine._deco_stop = mock.MagicMock(
+            side_effect=engine._deco_stop
+        )
+        self.cache(self._stay(self.start, 2 / 60), [AIR])
+        self.assertIs(deco_stop, engine._deco_stop)
+        self.assertTrue(deco_stop.called)
+
+
+    def test_deco_stop_no_hint(self):
+        """
+        Test time to surface cache with deco stop override without hint
+        """
+        engine = self.engine
+        f = engine._deco_stop
+        engine._deco_stop = lambda step, time, gas, gf: f(step, time, gas, gf)
+        start = self._stay(self.start, 2 / 60)
+        expected, expected_tts = self._full_ascent(start)
+
+        self.cache(self.start, [AIR])
+        del engine.deco_table[:]
+        tts = self.cache(start, [AIR])
+        self.assertEqual(expected, engine.deco_table)
+        self.assertEqual(expected_tts, tts)
+
+
+    def test_gas(self):
+        """
+        Test time to surface cache when gas mix changes
+        """
+        self.cache(self.start, [AIR])
+        start = self._stay(self.start, 2 / 60)._replace(gas=EAN50)
+        self.cache(start, [EAN50])
+        self.assertEqual(2, self.cache.fallbacks)
+
+
+    def test_live_cache(self):
+        """
+        Test live dive with time to surface cache
+        """
+        dive = self.engine.live(cache=True)
+        self.assertIsInstance(dive.tts_cache, TTSCache)
+        self.assertIs(dive.tts_cache, dive._ascent)
+
+        dive = self.engine.live()
+        self.assertIsNone(dive.tts_cache)
+
+
+# vim: sw=4:et:ai
@@ -21,15 +21,109 @@
 DecoTengu calculator tests.
 """
 
-from decotengu.engine import Engine, Phase
+from decotengu.engine import Engine, Phase, GasMix
 from decotengu.error import EngineError
-from decotengu.model import eq_gf_limit, ZH_L16B_GF, Data, DecoModelValidator
+from decotengu.model import eq_gf_limit, ZH_L16B_GF, Data, DecoModelValidator, \
+    ExpCache, LoadPlan, _buffer
 
 from .tools import _engine, _step, AIR
 
+from array import array
+from decimal import Decimal
+import pickle
 import unittest
 from unittest import mock
 
+EAN32 = GasMix(0, 32, 68, 0)
+
+
+class DataTestCase(unittest.TestCase):
+    """
+    Decompression model data tests.
+    """
+    def test_buffer(self):
+        """
+        Test decompression model data flat buffer of floats
+        """
+        data = Data(((1.1, 0.1), (1.2, 0.2)), 0.3)
+        self.assertIsInstance(data._tissues, array)
+        self.assertEqual('d', data._tissues.typecode)
+        self.assertEqual([1.1, 0.1, 1.2, 0.2], data._tissues.tolist())
+        self.assertEqual(0.3, data.gf)
+
+
+    def test_buffer_float32(self):
+        """
+        Test decompression model data flat buffer of single precision floats
+        """
+        data = Data._from_buffer(_buffer((1.5, 0.25), typecode='f'), 0.3)
+        self.assertEqual('f', data._tissues.typecode)
+        self.assertEqual([1.5, 0.25], data._tissues.tolist())
+
+        tp = _buffer((2.5, 0.5), like=data._tissues)
+        self.assertEqual('f', tp.typecode)
+
+
+    def test_buffer_decimal(self):
+        """
+        Test decompression model data flat buffer of decimal numbers
+        """
+        tp = ((Decimal('1.1'), Decimal(0)), (Decimal('1.2'), Decimal(0)))
+        data = Data(tp, Decimal('0.3'))
+        self.assertEqual(
+            (Decimal('1.1'), Decimal(0), Decimal('1.2'), Decimal(0)),
+            data._tissues
+        )
+        self.assertEqual(tp, data.tissues)
+
+
+    def test_tissues(self):
+        """
+        Test decompression model data tissues gas loading pairs
+        """
+        data = Data([(1.1, 0.1), (1.2, 0.2)], 0.3)
+        self.assertEqual(((1.1, 0.1), (1.2, 0.2)), data.tissues)
+        self.assertEqual(1.2, data.tissues[1][0])
+
+
+    def test_replace(self):
+        """
+        Test decompression model data copy with replaced values
+        """
+        data = Data(((1.1, 0.1), (1.2, 0.2)), 0.3)
+
+        v = data._replace(gf=0.4)
+        self.assertEqual(0.4, v.gf)
+        self.assertIs(data._tissues, v._tissues)
+        self.assertEqual(0.3, data.gf)
+
+        v = data._replace(tissues=((1.0, 0.0),))
+        self.assertEqual(((1.0, 0.0),), v.tissues)
+        self.assertEqual(0.3, v.gf)
+
+
+    def test_eq(self):
+        """
+        Test decompression model data equality
+        """
+        d1 = Data(((1.1, 0.1), (1.2, 0.2)), 0.3)
+        d2 = Data(((1.1, 0.1), (1.2, 0.2)), 0.3)
+        d3 = Data(((1.1, 0.1), (1.2, 0.2)), 0.4)
+        self.assertEqual(d1, d2)
+        self.assertEqual(hash(d1), hash(d2))
+        self.assertNotEqual(d1, d3)
+
+
+    def test_pickle(self):
+        """
+        Test decompression model data pickling
+        """
+        data = Data(((1.1, 0.1), (1.2, 0.2)), 0.3)
+        v = pickle.loads(pickle.dumps(data))
+        self.assertEqual(data, v)
+
+
+
 
 class TissueLoadingTestCase(unittest.TestCase):
     """
@@ -37,7 +131,15 @@ class TissueLoadingTestCase(unittest.TestCase):
     """
     def setUp(self):
         self.model = ZH_L16B_GF()
-        self.k_const = self.model.n2_k_const
+        self.data = Data(((3, 0),) * self.model.NUM_COMPARTMENTS, 0.3)
+
+
+    def _load(self, gas, rate):
+        """
+        Load first tissue compartment with inert gas for 1 minute at 30m.
+        """
+        plan = LoadPlan(self.model, 4, gas, rate)
+        return plan.apply(1, self.data)._tissues[0]
 
 
     def test_air_ascent(self):
@@ -45,8 +147,7 @@ class TissueLoadingTestCase(unittest.TestCase):
         Test tissue compartment loading - ascent by 10m on air
         """
         # ascent, so rate == -1 bar/min
-        loader = self.model._tissue_loader(4, 0.79, -1, self.k_const)
-        v = loader(1, 3, 0)
+        v = self._load(AIR, -1)
         self.assertAlmostEqual(2.96198, v, 4)
 
 
@@ -55,8 +156,7 @@ class TissueLoadingTestCase(unittest.TestCase):
         Test tissue compartment loading - descent by 10m on air
         """
         # rate == 1 bar/min
-        loader = self.model._tissue_loader(4, 0.79, 1, self.k_const)
-        v = loader(1, 3, 0)
+        v = self._load(AIR, 1)
         self.assertAlmostEqual(3.06661, v, 4)
 
 
@@ -65,8 +165,7 @@ class TissueLoadingTestCase(unittest.TestCase):
         Test tissue compartment loading - ascent by 10m on EAN32
         """
         # ascent, so rate == -1 bar/min
-        loader = self.model._tissue_loader(4, 0.68, -1, self.k_const)
-        v = loader(1, 3, 0)
+        v = self._load(EAN32, -1)
         self.assertAlmostEqual(2.9132, v, 4)
 
 
@@ -75,11 +174,60 @@ class TissueLoadingTestCase(unittest.TestCase):
         Test tissues compartment loading - descent by 10m on EAN32
         """
         # rate == 1 bar/min
-        loader = self.model._tissue_loader(4, 0.68, 1, self.k_const)
-        v = loader(1, 3, 0)
+        v = self._load(EAN32, 1)
         self.assertAlmostEqual(3.00326, v, 4)
 
 
+    def test_load_plan_coeff(self):
+        """
+        Test tissue compartments loading plan constants
+        """
+        m = self.model
+        plan = LoadPlan(m, 4, EAN32, -1)
+        self.assertEqual(2 * m.NUM_COMPARTMENTS, len(plan._p_alv))
+        self.assertEqual(2 * m.NUM_COMPARTMENTS, len(plan._r))
+        self.assertEqual(2 * m.NUM_COMPARTMENTS, len(plan._r_k))
+
+        k = m.n2_k_const[1]
+        self.assertEqual(0.68 * (4 - m.water_vapour_pressure), plan._p_alv[2])
+        self.assertEqual(-0.68, plan._r[2])
+        self.assertEqual(-0.68 / k, plan._r_k[2])
+        self.assertEqual(1 / k, m._k_inv[2])
+
+        # no helium
+        self.assertEqual((0, 0, 0), (plan._p_alv[3], plan._r[3], plan._r_k[3]))
+
+
+    def test_load_plan_cache(self):
+        """
+        Test tissue compartments loading plan cache
+        """
+        m = self.model
+        plan = m.load_plan(4, AIR, 0)
+        self.assertIs(plan, m.load_plan(4, AIR, 0))
+        self.assertIsNot(plan, m.load_plan(4, AIR, -1))
+        self.assertIsNot(plan, m.load_plan(4, EAN32, 0))
+
+        m.water_vapour_pressure = 0.0493
+        self.assertIsNot(plan, m.load_plan(4, AIR, 0))
+
+
+    @mock.patch('decotengu.model.LOAD_PLAN_CACHE_SIZE', 2)
+    def test_load_plan_cache_size(self):
+        """
+        Test tissue compartments loading plan cache size limit
+        """
+        m = self.model
+        m.load_plan(4, AIR, 0)
+        m.load_plan(3, AIR, 0)
+        m.load_plan(4, AIR, 0)
+        m.load_plan(2, AIR, 0) # 3 bar is least recently used
+        p = m.water_vapour_pressure
+        self.assertEqual(
+            [(4, AIR, 0, p), (2, AIR, 0, p)], list(m._load_plans)
+        )
+
+
 
 class GradientFactorLimitTestCase(unittest.TestCase):
     """
@@ -118,6 +266,70 @@ class GradientFactorLimitTestCase(unittest.TestCase):
 
 
 
+class ExpCacheTestCase(unittest.TestCase):
+    """
+    Exponential function values cache tests.
+    """
+    def setUp(self):
+        """
+        Create decompression model and exponential function values cache.
+        """
+        self.model = ZH_L16B_GF()
+        self.cache = ExpCache(self.model, size=2)
+
+
+    def test_values(self):
+        """
+        Test exponential function values cache values
+        """
+        m = self.model
+        v = self.cache(1.5)
+        self.assertEquals(2 * m.NUM_COMPARTMENTS, len(v))
+        self.assertEquals(m._exp(1.5, m.n2_k_const[3]), v[6])
+        self.assertEquals(m._exp(1.5, m.he_k_const[3]), v[7])
+
+
+    def test_hits(self):
+        """
+        Test exponential function values cache hits and misses
+        """
+        v1 = self.cache(1.5)
+        v2 = self.cache(1.5)
+        self.assertIs(v1, v2)
+        self.assertEquals(1, self.cache.hits)
+        self.assertEquals(1, self.cache.misses)
+
+
+    def test_lru(self):
+        """
+        Test exponential function values cache size limit
+        """
+        cache = self.cache
+        cache(1)
+        cache(2)
+        cache(1)
+        cache(3) # time 2 is least recently used
+        self.assertEquals(2, len(cache))
+        self.assertEquals([1, 3], list(cache._cache))
+
+        cache(2)
+        self.assertEquals(4, cache.misses)
+
+
+    def test_clear(self):
+        """
+        Test exponential function values cache clearing
+        """
+        cache = self.cache
+        cache(1)
+        cache(1)
+        cache.clear()
+        self.assertEquals(0, len(cache))
+        self.assertEquals(0, cache.hits)
+        self.assertEquals(0, cache.misses)
+
+
+
 class ZH_L16_GFTestCase(unittest.TestCase):
     """
     Buhlmann ZH-L16 decompression model with gradient factors tests.
@@ -147,6 +359,116 @@ class ZH_L16_GFTestCase(unittest.TestCase):
         tissues = result.tissues
         self.assertTrue(all(v[0] > 0.79 for v in tissues), tissues)
         self.assertTrue(all(v[1] == 0 for v in tissues), tissues)
+        self.assertIsInstance(result._tissues, array)
+        self.assertEqual(2 * n, len(result._tissues))
+
+
+    def test_tissues_load_cache(self):
+        """
+        Test deco model tissue compartments loading with cached exp values
+        """
+        m = ZH_L16B_GF()
+        data = m.init(1.01325)
+        m.load(4, 1, AIR, 0, data)
+        m.load(3, 1, AIR, 0, data)
+        self.assertEquals(1, m._exp_cache.misses)
+        self.assertEquals(1, m._exp_cache.hits)
+
+
+    def test_tissues_load_many(self):
+        """
+        Test deco model tissue compartments loading of multiple data
+        """
+        m = ZH_L16B_GF()
+        n = m.NUM_COMPARTMENTS
+
+        d1 = Data([(0.79, 0.0)] * n, 0.3)
+        d2 = Data([(1.5, 0.5)] * n, 0.4)
+        result = m.load_many((4, 3), (1, 2), (AIR, AIR), (-1, 0), (d1, d2))
+
+        self.assertEqual(2, len(result))
+        self.assertEqual(m.load(4, 1, AIR, -1, d1), result[0])
+        self.assertEqual(m.load(3, 2, AIR, 0, d2), result[1])
+
+
+    def _ndl_check(self, gas, abs_p, ndl, rate=-1):
+        """
+        Check NDL value by loading tissues with inert gas at depth and
+        during ascent to the surface.
+        """
+        m = ZH_L16B_GF()
+        surface = 1.01325
+        t_a = (abs_p - surface) / -rate
+        data = m.init(surface)
+        can_ascend = lambda t: surface >= m.ceiling_limit(
+            m.load(abs_p, t_a, gas, rate, m.load(abs_p, t, gas, 0, data)),
+            m.gf_high
+        )
+        self.assertTrue(can_ascend(ndl))
+        self.assertFalse(can_ascend(ndl + 1))
+
+
+    def test_ndl_nitrox(self):
+        """
+        Test NDL calculation for nitrox
+        """
+        m = ZH_L16B_GF()
+        data = m.init(1.01325)
+        v = m.ndl(data, 4.0, AIR, rate=-1)
+        self.assertEquals(14, v)
+        self._ndl_check(AIR, 4.0, v)
+
+
+    def test_ndl_trimix(self):
+        """
+        Test NDL calculation for trimix
+        """
+        m = ZH_L16B_GF()
+        data = m.init(1.01325)
+        gas = GasMix(0, 18, 37, 45)
+        v = m.ndl(data, 4.0, gas, rate=-1)
+        self.assertTrue(0 < v < 30, v)
+        self._ndl_check(gas, 4.0, v)
+
+
+    def test_ndl_instant_ascent(self):
+        """
+        Test NDL calculation without ascent to the surface
+        """
+        m = ZH_L16B_GF()
+        data = m.init(1.01325)
+        v = m.ndl(data, 4.0, AIR)
+        self.assertTrue(0 < v < 30, v)
+
+
+    def test_ndl_inf(self):
+        """
+        Test NDL calculation at shallow depth
+        """
+        m = ZH_L16B_GF()
+        data = m.init(1.01325)
+        v = m.ndl(data, 1.5, AIR, rate=-1)
+        self.assertEquals(float('inf'), v)
+
+
+    def test_ndl_zero(self):
+        """
+        Test NDL calculation when ascent to the surface is not possible
+        """
+        m = ZH_L16B_GF()
+        data = m.load(4.0, 30, AIR, 0, m.init(1.01325))
+        v = m.ndl(data, 4.0, AIR, rate=-1)
+        self.assertEquals(0, v)
+
+
+    def test_ndl_oxygen(self):
+        """
+        Test NDL calculation when breathing oxygen after trimix dive
+        """
+        m = ZH_L16B_GF()
+        data = m.load(2.0, 30, GasMix(0, 18, 37, 45), 0, m.init(1.01325))
+        v = m.ndl(data, 1.6, GasMix(6, 100, 0, 0), rate=-1)
+        self.assertEquals(float('inf'), v)
 
 
     def test_exp(self):
@@ -158,7 +480,7 @@ class ZH_L16_GFTestCase(unittest.TestCase):
         self.assertAlmostEqual(0.88692043, v)
 
 
-    @mock.patch('decotengu.model.eq_gf_limit')
+    @mock.patch.object(ZH_L16B_GF, 'gf_limit')
     def test_ceiling_limit(self, f):
         """
         Test calculation of pressure limit (default gf)
@@ -168,16 +490,16 @@ class ZH_L16_GFTestCase(unittest.TestCase):
             ((1.5, 0.0), (2.5, 0.), (2.0, 0.0), (2.9, 0.0), (2.6, 0.0)),
             0.3
         )
-        limit = (1.0, 2.0, 1.5, 2.4, 2.1)
-        f.side_effect = limit
+        f.return_value = (1.0, 2.0, 1.5, 2.4, 2.1)
 
         m.gf_low = 0.1
 
         v = m.ceiling_limit(data)
         self.assertEquals(2.4, v)
+        f.assert_called_once_with(None, data)
 
 
-    @mock.patch('decotengu.model.eq_gf_limit')
+    @mock.patch.object(ZH_L16B_GF, 'gf_limit')
     def test_ceiling_limit_gf(self, f):
         """
         Test calculation of pressure limit (with gf)
@@ -187,46 +509,57 @@ class ZH_L16_GFTestCase(unittest.TestCase):
             ((1.5, 0.0), (2.5, 0.), (2.0, 0.0), (2.9, 0.0), (2.6, 0.0)),
             0.3
         )
-        limit = (1.0, 2.0, 1.5, 2.4, 2.1)
-        f.side_effect = limit
+        f.return_value = (1.0, 2.0, 1.5, 2.4, 2.1)
 
         v = m.ceiling_limit(data, gf=0.2)
         self.assertEquals(2.4, v)
+        f.assert_called_once_with(0.2, data)
+
+
+    @mock.patch.object(ZH_L16B_GF, 'gf_limit')
+    def test_leading_tissue(self, f):
+        """
+        Test finding leading tissue compartment
+        """
+        m = ZH_L16B_GF()
+        data = Data(((1.5, 0.0),) * 5, 0.3)
+        f.return_value = (1.0, 2.4, 1.5, 2.4, 2.1)
+
+        v = m.leading_tissue(data, gf=0.2)
+        self.assertEquals((2.4, 1), v)
+        f.assert_called_once_with(0.2, data)
 
 
-    @mock.patch('decotengu.model.eq_gf_limit')
-    def test_gf_limit(self, f):
+    def test_gf_limit_coeff(self):
+        """
+        Test deco model Buhlmann coefficients preparation
+        """
+        m = ZH_L16B_GF()
+        self.assertEquals(m.NUM_COMPARTMENTS, len(m._gf_coeff))
+        self.assertEquals(
+            (m.N2_A[3], m.N2_B[3], m.HE_A[3], m.HE_B[3]), m._gf_coeff[3]
+        )
+
+
+    def test_gf_limit(self):
         """
         Test deco model gradient factor limit calculation
 
-        Check if appropriate parameters are passed from ZH_L16B_GF.gf_limit
-        to eq_gf_limit function.
+        Check if results of ZH_L16B_GF.gf_limit are the same as results of
+        eq_gf_limit function.
         """
-        f.side_effect = list(range(1, 17))
         m = ZH_L16B_GF()
         data = Data(
-            tuple((v, 0.1) for v in range(1, 17)),
+            tuple((v, 0.1 * v) for v in range(1, 17)),
             0.3
         )
 
         v = m.gf_limit(0.3, data)
-        self.assertEquals(v, tuple(range(1, 17)))
-        self.assertEquals(m.NUM_COMPARTMENTS, f.call_count)
-
-        result = tuple(t[0][0] for t in f.call_args_list)
-        self.assertEquals(tuple([0.3]) * 16, result)
-        result = tuple(t[0][1] for t in f.call_args_list)
-        self.assertEquals(tuple(range(1, 17)), result)
-        result = tuple(t[0][2] for t in f.call_args_list)
-        self.assertEquals(tuple([0.1]) * 16, result)
-        result = tuple(t[0][3] for t in f.call_args_list)
-        self.assertEquals(m.N2_A, result)
-        result = tuple(t[0][4] for t in f.call_args_list)
-        self.assertEquals(m.N2_B, result)
-        result = tuple(t[0][5] for t in f.call_args_list)
-        self.assertEquals(m.HE_A, result)
-        result = tuple(t[0][6] for t in f.call_args_list)
-        self.assertEquals(m.HE_B, result)
+        expected = tuple(
+            eq_gf_limit(0.3, p, 0.1 * p, m.N2_A[i], m.N2_B[i], m.HE_A[i], m.HE_B[i])
+            for i, p in enumerate(range(1, 17))
+        )
+        self.assertEquals(expected, v)
 
 
 
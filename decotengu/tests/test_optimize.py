@@ -0,0 +1,264 @@
+#
+# DecoTengu - dive decompression library.
+#
+# Copyright (C) 2013-2014 by Artur Wroblewski <wrobell@pld-linux.org>
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+
+"""
+Dive plan optimizer tests.
+"""
+
+from decotengu import create
+from decotengu.optimize import optimize_switch_depths, gf_frontier, \
+    _candidates, _evaluate_chunk
+from decotengu.table import engine_config
+from decotengu.error import ConfigError, EngineError
+
+import math
+import unittest
+
+DECO_GAS = ((35, 25), (50, 0), (80, 0), (100, 0))
+
+
+class SwitchDepthsTestCase(unittest.TestCase):
+    """
+    Gas mix switch depths optimizer tests.
+    """
+    def setUp(self):
+        """
+        Create template decompression engine.
+        """
+        self.engine = create()
+        self.engine.add_gas(0, 18, 45)
+
+
+    def _plan(self, depth, time, gas):
+        """
+        Calculate dive plan summary with decompression engine.
+        """
+        engine = create()
+        engine.add_gas(0, 18, 45)
+        for args in gas:
+            engine.add_gas(*args)
+        return engine.plan(depth, time)
+
+
+    def test_candidates(self):
+        """
+        Test gas mix switch depths candidates
+        """
+        candidates = _candidates(
+            self.engine, 45, ((100, 0), (50, 0)), (1.0, 1.6)
+        )
+        expected = [
+            ((21, 50, 0), (6, 100, 0)),
+            ((21, 50, 0), (3, 100, 0)),
+            ((18, 50, 0), (6, 100, 0)),
+            ((18, 50, 0), (3, 100, 0)),
+            ((15, 50, 0), (6, 100, 0)),
+            ((15, 50, 0), (3, 100, 0)),
+            ((12, 50, 0), (6, 100, 0)),
+            ((12, 50, 0), (3, 100, 0)),
+        ]
+        self.assertEqual(expected, candidates)
+
+
+    def test_candidates_depth(self):
+        """
+        Test gas mix switch depths candidates limited by dive depth
+        """
+        candidates = _candidates(self.engine, 17, ((50, 0),), (1.0, 1.6))
+        self.assertEqual([((15, 50, 0),), ((12, 50, 0),)], candidates)
+
+
+    def test_candidates_order(self):
+        """
+        Test gas mix switch depths candidates with richer gas mix shallower
+        """
+        candidates = _candidates(
+            self.engine, 45, ((50, 0), (80, 0)), (0.5, 1.6)
+        )
+        self.assertTrue(candidates)
+        self.assertTrue(all(c[0][0] > c[1][0] for c in candidates))
+
+
+    def test_optimize(self):
+        """
+        Test gas mix switch depths optimization
+        """
+        result = optimize_switch_depths(
+            self.engine, 70, 25, DECO_GAS, ppo2=(0.9, 1.6)
+        )
+
+        candidates = _candidates(self.engine, 70, DECO_GAS, (0.9, 1.6))
+        totals = [self._plan(70, 25, c).deco_table.total for c in candidates]
+        self.assertEqual(min(totals), result.plan.deco_table.total)
+        self.assertEqual(candidates[totals.index(min(totals))], result.gas)
+
+        plan = self._plan(70, 25, result.gas)
+        self.assertEqual(plan.deco_table, result.plan.deco_table)
+        self.assertEqual(plan.time, result.plan.time)
+
+        self.assertEqual(len(candidates), result.stats.candidates)
+        self.assertTrue(0 < result.stats.pruned < len(candidates))
+
+
+    def test_optimize_pool(self):
+        """
+        Test gas mix switch depths optimization with pool of processes
+        """
+        expected = optimize_switch_depths(
+            self.engine, 70, 25, DECO_GAS, ppo2=(0.9, 1.6)
+        )
+        result = optimize_switch_depths(
+            self.engine, 70, 25, DECO_GAS, ppo2=(0.9, 1.6), processes=2
+        )
+        self.assertEqual(expected.gas, result.gas)
+        self.assertEqual(expected.plan.deco_table, result.plan.deco_table)
+
+
+    def test_evaluate_chunk(self):
+        """
+        Test evaluation of chunk of gas mix switch depths candidates
+        """
+        engine = self.engine
+        abs_p = engine._to_pressure(60)
+        *_, step = engine._dive_descent(abs_p, engine._gas_list)
+        bottom = engine._step_next(step, 20 - step.time, engine._gas_list[0])
+        config = engine_config(engine)
+        base = ((0, 18, 45),)
+
+        candidates = list(enumerate([((12, 50, 0),), ((21, 50, 0),)]))
+        chunk = config, base, bottom, math.inf, candidates
+        (i, gas, plan), pruned = _evaluate_chunk(chunk)
+        self.assertEqual(1, i)
+        self.assertEqual(((21, 50, 0),), gas)
+        self.assertEqual(self._plan(60, 20, gas).deco_table, plan.deco_table)
+        self.assertEqual(0, pruned)
+
+        # all candidates pruned with bound of the best candidate
+        chunk = config, base, bottom, plan.deco_table.total, candidates
+        (i, gas, plan), pruned = _evaluate_chunk(chunk)
+        self.assertIsNone(plan)
+        self.assertEqual(2, pruned)
+
+
+    def test_optimize_no_candidates(self):
+        """
+        Test gas mix switch depths optimization without candidates
+        """
+        self.assertRaises(
+            ConfigError, optimize_switch_depths, self.engine, 40, 20,
+            ((100, 0),), ppo2=(1.4, 1.5)
+        )
+
+
+    def test_optimize_bottom_time_error(self):
+        """
+        Test gas mix switch depths optimization bottom time error
+        """
+        self.assertRaises(
+            EngineError, optimize_switch_depths, self.engine, 100, 5,
+            ((50, 0),)
+        )
+
+
+
+class GFFrontierTestCase(unittest.TestCase):
+    """
+    Gradient factors frontier tests.
+    """
+    def setUp(self):
+        """
+        Create decompression engine.
+        """
+        self.engine = self._engine()
+
+
+    def _engine(self, gf_low=0.3, gf_high=0.85):
+        """
+        Create decompression engine with gradient factors.
+        """
+        engine = create()
+        engine.model.gf_low = gf_low
+        engine.model.gf_high = gf_high
+        engine.add_gas(0, 21)
+        engine.add_gas(21, 50)
+        engine.add_gas(6, 100)
+        return engine
+
+
+    def test_frontier(self):
+        """
+        Test gradient factors frontier
+        """
+        frontier = gf_frontier(self.engine, 60, 30, 60)
+        self.assertEqual(
+            [0.1, 0.2, 0.3, 0.4, 0.5, 0.6, 0.7, 0.8, 0.9],
+            [p.gf_low for p in frontier]
+        )
+
+        for p in frontier:
+            engine = self._engine(p.gf_low, p.gf_high)
+            plan = engine.plan(60, 30)
+            self.assertEqual(plan.deco_table, p.plan.deco_table)
+            self.assertTrue(plan.deco_table.total <= 60)
+
+            # lower gradient factor high exceeds the target time
+            gf_high = round(p.gf_high - 0.01, 2)
+            if gf_high >= max(0.5, p.gf_low):
+                engine = self._engine(p.gf_low, gf_high)
+                plan = engine.plan(60, 30)
+                self.assertTrue(plan.deco_table.total > 60, p)
+
+        # few dozen ascents instead of evaluating whole grid
+        self.assertTrue(frontier.ascents < 50, frontier.ascents)
+
+
+    def test_frontier_gf_restored(self):
+        """
+        Test gradient factors frontier restores engine gradient factors
+        """
+        gf_frontier(self.engine, 60, 30, 60)
+        self.assertEqual(0.3, self.engine.model.gf_low)
+        self.assertEqual(0.85, self.engine.model.gf_high)
+
+
+    def test_frontier_gf_high(self):
+        """
+        Test gradient factors frontier with gradient factor high range
+        """
+        frontier = gf_frontier(
+            self.engine, 60, 30, 60, gf_low=(0.2, 0.3), gf_high=(0.5, 0.6)
+        )
+        self.assertEqual([], frontier)
+
+        frontier = gf_frontier(
+            self.engine, 60, 30, 60, gf_low=(0.5, 0.7), gf_high=(0.6, 0.9)
+        )
+        self.assertEqual([(0.5, 0.6), (0.7, 0.7)], [p[:2] for p in frontier])
+
+
+    def test_frontier_no_solution(self):
+        """
+        Test gradient factors frontier without solution
+        """
+        frontier = gf_frontier(self.engine, 60, 30, 20)
+        self.assertEqual([], frontier)
+        self.assertEqual(0.3, self.engine.model.gf_low)
+
+
+# vim: sw=4:et:ai
@@ -0,0 +1,195 @@
+#
+# DecoTengu - dive decompression library.
+#
+# Copyright (C) 2013-2014 by Artur Wroblewski <wrobell@pld-linux.org>
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+
+"""
+Decompression tables generator tests.
+"""
+
+from decotengu import create
+from decotengu.table import generate, TableKey, _shard, _cost, \
+    engine_config, create_engine
+from decotengu.alt.solver import DecoStopSolver, solver_engine
+
+import unittest
+from unittest import mock
+
+
+class TableGeneratorTestCase(unittest.TestCase):
+    """
+    Decompression tables generator tests.
+    """
+    def setUp(self):
+        """
+        Create template decompression engine.
+        """
+        self.engine = create()
+        self.engine.add_gas(0, 21)
+        self.engine.add_gas(22, 50)
+
+
+    def _check(self, tables):
+        """
+        Check decompression tables against results of decompression
+        engine.
+        """
+        for key, table in tables.items():
+            engine = create()
+            engine.model.gf_low = key.gf_low
+            engine.model.gf_high = key.gf_high
+            for args in key.gas:
+                engine.add_gas(*args)
+            list(engine.calculate(key.depth, key.time))
+            self.assertEqual(engine.deco_table, table, key)
+
+
+    def test_engine_config(self):
+        """
+        Test configuration of template engine
+        """
+        self.engine.add_gas(0, 36, travel=True)
+        self.engine.model.gf_low = 0.2
+        self.engine.last_stop_6m = True
+        setup = mock.MagicMock()
+        config = engine_config(self.engine, setup)
+
+        self.assertEqual(
+            ((0, 36, 0, True), (0, 21, 0), (22, 50, 0)), config.gas
+        )
+        self.assertEqual((0.2, 0.85), config.gf)
+        self.assertTrue(config.last_stop_6m)
+        self.assertIs(setup, config.setup)
+
+
+    def test_create_engine(self):
+        """
+        Test creating decompression engine from template engine configuration
+        """
+        self.engine.model.gf_low = 0.2
+        self.engine.last_stop_6m = True
+        setup = mock.MagicMock()
+        config = engine_config(self.engine, setup)
+
+        engine = create_engine(config)
+        self.assertEqual(self.engine._gas_list, engine._gas_list)
+        self.assertEqual(0.2, engine.model.gf_low)
+        self.assertEqual(0.85, engine.model.gf_high)
+        self.assertTrue(engine.last_stop_6m)
+        setup.assert_called_once_with(engine)
+
+        engine = create_engine(config, ((0, 32),), (0.3, 0.75))
+        self.assertEqual(1, len(engine._gas_list))
+        self.assertEqual(32, engine._gas_list[0].o2)
+        self.assertEqual(0.3, engine.model.gf_low)
+        self.assertEqual(0.75, engine.model.gf_high)
+
+
+    def test_shard(self):
+        """
+        Test sharding units of decompression tables grid
+        """
+        units = [
+            (None, None, None, depth, [20, 30])
+            for depth in (10, 20, 30, 40, 50, 60)
+        ]
+        chunks = _shard(units, 3)
+
+        self.assertEqual(3, len(chunks))
+        self.assertEqual(
+            sorted(u[3] for u in units),
+            sorted(u[3] for c in chunks for u in c)
+        )
+        costs = [sum(_cost(u) for u in c) for c in chunks]
+        self.assertTrue(max(costs) - min(costs) <= _cost(units[0]), costs)
+
+
+    def test_shard_empty(self):
+        """
+        Test sharding grid into more chunks than units
+        """
+        units = [(None, None, None, 30, [20])]
+        self.assertEqual([units], _shard(units, 4))
+
+
+    def test_generate(self):
+        """
+        Test generating decompression tables
+        """
+        tables = generate(
+            self.engine, (30, 40), (25, 15, 20),
+            gf=((0.3, 0.85), (0.2, 0.9)), processes=1
+        )
+        gas = ((0, 21, 0), (22, 50, 0))
+        keys = [
+            TableKey(gas, gf_low, gf_high, depth, time)
+            for gf_low, gf_high in ((0.3, 0.85), (0.2, 0.9))
+            for depth in (30, 40) for time in (15, 20, 25)
+        ]
+        self.assertEqual(keys, list(tables))
+        self.assertEqual(12, tables.stats.tables)
+        self.assertEqual(0, tables.stats.errors)
+        self._check(tables)
+
+
+    def test_generate_pool(self):
+        """
+        Test generating decompression tables with pool of processes
+        """
+        tables = generate(
+            self.engine, (30, 40, 50, 60), (20, 30),
+            gas=(((0, 21),), ((0, 21), (22, 50))), processes=2
+        )
+        self.assertEqual(16, len(tables))
+        self.assertEqual(16, tables.stats.tables)
+        self.assertTrue(tables.stats.throughput > 0)
+        self._check(tables)
+
+
+    def test_generate_errors(self):
+        """
+        Test generating decompression tables with dives, which cannot be
+        calculated
+        """
+        # 5min to descent to 100m at 20m/min
+        tables = generate(
+            self.engine, (30, 100), (4, 40), gas=(((0, 21),),), processes=1
+        )
+        self.assertEqual(
+            [(30, 4), (30, 40), (100, 40)],
+            [(k.depth, k.time) for k in tables]
+        )
+        self.assertEqual(
+            [(100, 4)], [(k.depth, k.time) for k in tables.errors]
+        )
+        self.assertEqual(1, tables.stats.errors)
+
+
+    def test_generate_setup(self):
+        """
+        Test generating decompression tables with engine setup function
+        """
+        setup = mock.MagicMock(side_effect=solver_engine)
+        tables = generate(self.engine, (40,), (30,), processes=1, setup=setup)
+
+        engine = setup.call_args[0][0]
+        self.assertIsInstance(engine._deco_stop, DecoStopSolver)
+        self.assertEqual(1, len(tables))
+        self._check(tables)
+
+
+# vim: sw=4:et:ai
@@ -0,0 +1,220 @@
+#
+# DecoTengu - dive decompression library.
+#
+# Copyright (C) 2013-2014 by Artur Wroblewski <wrobell@pld-linux.org>
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+
+"""
+Tracing tests.
+"""
+
+from decotengu import trace
+from decotengu.engine import Phase
+from decotengu.ft import bisect_find, recurse_while
+from decotengu.alt.tab import TabExp
+
+from .tools import _step, _engine, AIR, EAN50
+
+import unittest
+from unittest import mock
+
+
+class TraceTestCase(unittest.TestCase):
+    """
+    Tracing tests.
+    """
+    def setUp(self):
+        """
+        Create decompression engine and trace events collector.
+        """
+        self.engine = _engine()
+        self.events = []
+
+
+    def tearDown(self):
+        """
+        Check that no subscribers are left.
+        """
+        self.assertEqual([], trace.subscribers)
+
+
+    def test_subscribed(self):
+        """
+        Test subscribing to trace events within context
+        """
+        f = mock.MagicMock()
+        with trace.subscribed(f, self.events.append):
+            self.assertEqual([f, self.events.append], trace.subscribers)
+            trace.emit(1)
+        trace.emit(2)
+        f.assert_called_once_with(1)
+        self.assertEqual([1], self.events)
+
+
+    def test_subscribed_error(self):
+        """
+        Test unsubscribing from trace events on error
+        """
+        with self.assertRaises(ValueError):
+            with trace.subscribed(self.events.append):
+                raise ValueError()
+
+
+    def test_no_subscribers(self):
+        """
+        Test trace events not created without subscribers
+        """
+        with mock.patch('decotengu.trace.CeilingCheck') as f:
+            self.engine._can_ascend(3.1, 0.3, self.engine.model.init(1.0))
+            self.assertFalse(f.called)
+
+
+    def test_ceiling_check(self):
+        """
+        Test ascent ceiling limit check event
+        """
+        data = self.engine.model.init(1.0)
+        with trace.subscribed(self.events.append):
+            self.engine._can_ascend(3.1, 0.3, data, 0.4)
+
+        event, = self.events
+        self.assertIsInstance(event, trace.CeilingCheck)
+        self.assertAlmostEqual(2.8, event.abs_p)
+        self.assertEqual(self.engine.model.ceiling_limit(data, 0.4), event.limit)
+        self.assertEqual(0.4, event.gf)
+
+
+    def test_gas_switch(self):
+        """
+        Test gas mix switch event
+        """
+        step = _step(Phase.ASCENT, 3.2, 20)
+        with trace.subscribed(self.events.append):
+            self.engine._switch_gas(step, EAN50)
+
+        self.assertEqual([trace.GasSwitch(3.2, 20, EAN50)], self.events)
+
+
+    def test_stop_probe(self):
+        """
+        Test decompression stop length probe events
+        """
+        engine = self.engine
+        data = engine.model.load(4.0, 30, AIR, 0, engine.model.init(1.0))
+        start = _step(Phase.ASCENT, 1.9, 20, data=data)
+        with trace.subscribed(self.events.append):
+            step = engine._deco_stop(start, 0.3, AIR, 0.4)
+
+        probes = [e for e in self.events if isinstance(e, trace.StopProbe)]
+        self.assertEqual(1, probes[0].time)
+        self.assertTrue(all(p.abs_p == 1.9 and p.gf == 0.4 for p in probes))
+
+        # the stop lasts until the shortest probe, which allows ascent
+        time = min(p.time for p in probes if not p.stay)
+        self.assertEqual(start.time + time, step.time)
+        self.assertTrue(all(p.stay for p in probes if p.time < time))
+
+
+    def test_stop_search(self):
+        """
+        Test decompression stop length search result event
+        """
+        engine = self.engine
+        data = engine.model.load(4.0, 30, AIR, 0, engine.model.init(1.0))
+        start = _step(Phase.ASCENT, 1.9, 20, data=data)
+        with trace.subscribed(self.events.append):
+            step = engine._deco_stop(start, 0.3, AIR, 0.4)
+
+        event, = [e for e in self.events if isinstance(e, trace.StopSearch)]
+        self.assertEqual(
+            trace.StopSearch(1.9, step.time - start.time, AIR, 0.4), event
+        )
+
+
+    def test_bisect_probe(self):
+        """
+        Test binary search probe events
+        """
+        with trace.subscribed(self.events.append):
+            k = bisect_find(10, lambda k: k < 4)
+
+        self.assertEqual(3, k)
+        self.assertEqual(
+            [(1, 6, 11), (1, 3, 6), (4, 5, 6), (4, 4, 5)], self.events
+        )
+        self.assertTrue(
+            all(isinstance(e, trace.BisectProbe) for e in self.events)
+        )
+
+
+    def test_recurse_step(self):
+        """
+        Test linear search step events
+        """
+        with trace.subscribed(self.events.append):
+            recurse_while(lambda k: k < 3, lambda k: k + 1, 0)
+
+        expected = [trace.RecurseStep((k,)) for k in (2, 3)]
+        self.assertEqual(expected, self.events)
+
+
+    def test_exp_split(self):
+        """
+        Test exponential function time split event of tabular kernel
+        """
+        exp = TabExp([0.1], [0.2])
+        with trace.subscribed(self.events.append):
+            exp(2.3, 0.1)
+        self.assertEqual([trace.ExpSplit(2.3, 2, 3)], self.events)
+
+
+    def test_log_format(self):
+        """
+        Test log messages of all trace events
+        """
+        events = [
+            trace.CeilingCheck(1.9, 1.6, 0.4),
+            trace.StopProbe(1.9, 3, 0.4, True),
+            trace.StopSearch(1.9, 3, AIR, 0.4),
+            trace.GasSwitch(3.2, 20, EAN50),
+            trace.BisectProbe(1, 5, 11),
+            trace.RecurseStep((2,)),
+            trace.ExpSplit(2.3, 2, 3),
+        ]
+        for event in events:
+            fmt = trace.LOG_FORMAT[type(event)]
+            self.assertTrue(fmt.format(**event._asdict()))
+
+
+    def test_log_subscriber(self):
+        """
+        Test logging trace events
+        """
+        event = trace.StopProbe(1.9, 3, 0.4, True)
+        with mock.patch('decotengu.trace.logger') as logger:
+            logger.isEnabledFor.return_value = True
+            trace.log_subscriber(event)
+            logger.debug.assert_called_once_with(
+                'deco stop: probe 3min at 1.9000bar, next gf=0.4000, stay=True'
+            )
+
+            logger.reset_mock()
+            logger.isEnabledFor.return_value = False
+            trace.log_subscriber(event)
+            self.assertFalse(logger.debug.called)
+
+
+# vim: sw=4:et:ai
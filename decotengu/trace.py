@@ -0,0 +1,211 @@
+#
+# DecoTengu - dive decompression library.
+#
+# Copyright (C) 2013-2014 by Artur Wroblewski <wrobell@pld-linux.org>
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+
+"""
+Tracing
+-------
+DecoTengu decompression engine emits trace events during dive profile
+calculation
+
+- ascent ceiling limit check (:py:class:`CeilingCheck`)
+- decompression stop length probe (:py:class:`StopProbe`)
+- decompression stop length search result (:py:class:`StopSearch`)
+- gas mix switch (:py:class:`GasSwitch`)
+- binary search probe (:py:class:`BisectProbe`)
+- linear search step (:py:class:`RecurseStep`)
+- exponential function time split of tabular numeric kernel
+  (:py:class:`ExpSplit`)
+
+A trace event is a named tuple. The events are sent to subscribers - a
+subscriber is a function accepting an event. The events are created only
+when there is at least one subscriber, so tracing costs a check of
+subscribers list otherwise.
+
+The events can be logged with :py:func:`log_subscriber` subscriber, which
+logs them with debug level. For example, to log the events of a dive
+
+    >>> import decotengu
+    >>> from decotengu import trace
+    >>> engine = decotengu.create()
+    >>> engine.add_gas(0, 21)
+    >>> with trace.subscribed(trace.log_subscriber):
+    ...     profile = list(engine.calculate(40, 35))
+
+Or to count decompression stop length probes
+
+    >>> from collections import Counter
+    >>> events = Counter()
+    >>> with trace.subscribed(lambda event: events.update([type(event)])):
+    ...     profile = list(engine.calculate(40, 35))
+    >>> events[trace.StopProbe]
+    28
+"""
+
+from collections import namedtuple
+from contextlib import contextmanager
+import logging
+
+logger = logging.getLogger(__name__)
+
+CeilingCheck = namedtuple('CeilingCheck', 'abs_p limit gf')
+CeilingCheck.__doc__ = """
+Ascent ceiling limit check event.
+
+:var abs_p: Absolute pressure of depth checked against ascent ceiling
+    limit [bar].
+:var limit: Absolute pressure of ascent ceiling limit [bar].
+:var gf: Gradient factor value used to calculate ascent ceiling limit,
+    null for decompression model default.
+"""
+
+StopProbe = namedtuple('StopProbe', 'abs_p time gf stay')
+StopProbe.__doc__ = """
+Decompression stop length probe event.
+
+:var abs_p: Absolute pressure of decompression stop depth [bar].
+:var time: Probed length of decompression stop [min].
+:var gf: Gradient factor value of next decompression stop.
+:var stay: True if diver has to stay at decompression stop after the
+    probed length of decompression stop.
+"""
+
+StopSearch = namedtuple('StopSearch', 'abs_p time gas gf')
+StopSearch.__doc__ = """
+Decompression stop length search result event.
+
+:var abs_p: Absolute pressure of decompression stop depth [bar].
+:var time: Length of decompression stop [min].
+:var gas: Gas mix configuration.
+:var gf: Gradient factor value of next decompression stop.
+"""
+
+GasSwitch = namedtuple('GasSwitch', 'abs_p time gas')
+GasSwitch.__doc__ = """
+Gas mix switch event.
+
+:var abs_p: Absolute pressure of gas mix switch depth [bar].
+:var time: Time of gas mix switch [min].
+:var gas: Gas mix configuration.
+"""
+
+BisectProbe = namedtuple('BisectProbe', 'lo k hi')
+BisectProbe.__doc__ = """
+Binary search probe event (see :py:func:`decotengu.ft.bisect_find`).
+
+:var lo: Lower bound of search range.
+:var k: Probed value.
+:var hi: Upper bound of search range.
+"""
+
+RecurseStep = namedtuple('RecurseStep', 'result')
+RecurseStep.__doc__ = """
+Linear search step event (see :py:func:`decotengu.ft.recurse_while`).
+
+:var result: Result of the step, tuple of arguments of next step.
+"""
+
+ExpSplit = namedtuple('ExpSplit', 'time n1 n2')
+ExpSplit.__doc__ = """
+Exponential function time split event of tabular numeric kernel (see
+:py:class:`decotengu.alt.tab.TabExp`).
+
+:var time: Time of exposure [min].
+:var n1: Number of 1 minute periods.
+:var n2: Number of 6 seconds periods.
+"""
+
+# log messages of trace events
+LOG_FORMAT = {
+    CeilingCheck: 'ceiling check: {abs_p:.4f}bar vs. limit {limit:.4f}bar'
+        ' (gf={gf})',
+    StopProbe: 'deco stop: probe {time}min at {abs_p:.4f}bar, next'
+        ' gf={gf:.4f}, stay={stay}',
+    StopSearch: 'deco stop: search completed {time}min at {abs_p:.4f}bar,'
+        ' gas mix {gas}, next gf={gf:.4f}',
+    GasSwitch: 'switched to gas mix {gas} at {abs_p:.4f}bar ({time}min)',
+    BisectProbe: 'bisect range: {lo} <= {k} <= {hi}',
+    RecurseStep: 'next result: {result}',
+    ExpSplit: 'tab exp: time {time}min, n1={n1}, n2={n2}',
+}
+
+# list of subscribers of trace events
+subscribers = []
+
+
+def subscribe(f):
+    """
+    Subscribe function to trace events.
+
+    :param f: Function accepting trace event.
+    """
+    subscribers.append(f)
+
+
+def unsubscribe(f):
+    """
+    Unsubscribe function from trace events.
+
+    :param f: Function accepting trace event.
+    """
+    subscribers.remove(f)
+
+
+@contextmanager
+def subscribed(*f):
+    """
+    Context manager subscribing functions to trace events within its
+    context.
+
+    :param f: Functions accepting trace event.
+    """
+    for s in f:
+        subscribe(s)
+    try:
+        yield
+    finally:
+        for s in f:
+            unsubscribe(s)
+
+
+def emit(event):
+    """
+    Send trace event to all subscribers.
+
+    Check if there are any subscribers before creating an event, i.e.::
+
+        if trace.subscribers:
+            trace.emit(trace.GasSwitch(abs_p, time, gas))
+
+    :param event: Trace event.
+    """
+    for f in subscribers:
+        f(event)
+
+
+def log_subscriber(event):
+    """
+    Log trace event with debug level.
+
+    :param event: Trace event.
+    """
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug(LOG_FORMAT[type(event)].format(**event._asdict()))
+
+
+# vim: sw=4:et:ai